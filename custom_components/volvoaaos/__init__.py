@@ -2,58 +2,71 @@
 
 from __future__ import annotations
 
+import asyncio
+import shutil
+from functools import partial
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, CONF_USERNAME, CONF_ACCESS_TOKEN, CONF_PASSWORD
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .charging_history import history_dir
+from .const import DOMAIN, LOGGER
+from .fleet import VolvoFleet
+from .services import async_setup_services
+from .snapshot_store import VolvoSnapshotStore
+from .vehicle_info import VehicleInfoCache
+
+PLATFORMS = [Platform.SENSOR, Platform.LOCK, Platform.BINARY_SENSOR, Platform.DEVICE_TRACKER, Platform.BUTTON, Platform.IMAGE]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-from .const import DOMAIN, LOGGER, CONF_VCC_API_KEY, CONF_VIN, CONF_REFRESH_TOKEN, CONF_ALL_RECHARGE_AVAILABLE
-from .volvo import Auth, Energy, ConnectedVehicle, Location
-from .coordinator import VolvoUpdateCoordinator, VolvoData, update_energy
 
-PLATFORMS = [Platform.SENSOR, Platform.LOCK, Platform.BINARY_SENSOR, Platform.DEVICE_TRACKER, Platform.BUTTON]
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services, once for every config entry."""
+
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Setup Volvo AAOS from config entry."""
-
-    coordinator = VolvoUpdateCoordinator(hass, entry)
-    session = async_get_clientsession(hass)
-
-    # Exchange reauth token else auth from username and password
-
-    auth = Auth(session=session)
-    try:
-        reauth = await auth.reauth(refresh_token=entry.data[CONF_REFRESH_TOKEN])
-        new_data = {**entry.data, CONF_ACCESS_TOKEN: reauth.access_token, CONF_REFRESH_TOKEN: reauth.refresh_token}
-        hass.config_entries.async_update_entry(entry, data=new_data)
-        LOGGER.debug('Refresh token still valid. Updated access token.')
-    except Exception as e:
-        LOGGER.debug(e)
-        LOGGER.debug('Refresh token invalid - retry login using username and password')
-        try:
-            authenticate = await auth.authenticate(username=entry.data[CONF_USERNAME], password=entry.data[CONF_PASSWORD])
-            new_data = {**entry.data, CONF_ACCESS_TOKEN: authenticate.access_token, CONF_REFRESH_TOKEN: authenticate.refresh_token}
-            hass.config_entries.async_update_entry(entry, data=new_data)
-            LOGGER.debug('Logged in using username and password.')
-        except Exception as e:
-            LOGGER.debug(e)
-            LOGGER.debug('Could not login. Try reinstall the component.')
-
-    energy = Energy(session=session, access_token=entry.data[CONF_ACCESS_TOKEN], vcc_api_key=entry.data[CONF_VCC_API_KEY], vin=entry.data[CONF_VIN])
-    energy_data = await update_energy(energy=energy, all_recharge_available=entry.data[CONF_ALL_RECHARGE_AVAILABLE])
-
-    connected_vehicle = ConnectedVehicle(session=session, access_token=entry.data[CONF_ACCESS_TOKEN], vcc_api_key=entry.data[CONF_VCC_API_KEY], vin=entry.data[CONF_VIN])
-    connected_vehicle_door_status_data = await connected_vehicle.get_door_status()
-    connected_vehicle_window_status_data = await connected_vehicle.get_window_status()
-
-    location = Location(session=session, access_token=entry.data[CONF_ACCESS_TOKEN], vcc_api_key=entry.data[CONF_VCC_API_KEY], vin=entry.data[CONF_VIN])
-    location_data = await location.get_location()
-
-    coordinator.async_set_updated_data(VolvoData(energy=energy_data, connected_vehicle_door_status=connected_vehicle_door_status_data, connected_vehicle_window_status=connected_vehicle_window_status_data, location=location_data))
-
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    """Setup Volvo AAOS from config entry.
+
+    With a stored snapshot of every vehicle the entities are created from it
+    right away and the live refresh runs in the background.
+    """
+
+    fleet = VolvoFleet(hass, entry)
+
+    await fleet.vehicle_info.async_load()
+    fleet.create_coordinators()
+    fleet.setup_geofence()
+
+    if await fleet.async_restore_snapshots():
+        LOGGER.debug('Starting from stored snapshot, refreshing in the background')
+        entry.async_create_background_task(hass, fleet.async_start_live(), f"{DOMAIN} live refresh")
+    else:
+        await asyncio.gather(fleet.async_login(), fleet.async_prewarm())
+        if await fleet.async_discover_vehicles():
+            fleet.create_coordinators()
+        await fleet.async_probe_capabilities(only_missing=True)
+
+        failed = await fleet.async_first_refresh()
+        if len(failed) == len(fleet.coordinators):
+            fleet.remove_listeners()
+            raise ConfigEntryNotReady(f"Could not fetch initial data from Volvo: {failed}")
+        for vin, err in failed.items():
+            LOGGER.warning("Could not fetch initial data for %s, skipping vehicle: %s", vin, err)
+            fleet.coordinators.pop(vin)
+
+        fleet.start()
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = fleet
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    fleet.enable_fetch_planning()
 
     return True
 
@@ -61,5 +74,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Volvo AAOS config entry."""
 
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        del hass.data[DOMAIN][entry.entry_id]
+        fleet: VolvoFleet = hass.data[DOMAIN].pop(entry.entry_id)
+        fleet.remove_listeners()
+        await fleet.snapshot_store.async_save()
+        await fleet.async_flush_histories()
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored snapshot, charging histories, vehicle details and images of a removed entry."""
+
+    await VolvoSnapshotStore(hass, entry).async_remove()
+    await VehicleInfoCache(hass, entry).async_remove()
+    await hass.async_add_executor_job(partial(shutil.rmtree, history_dir(hass, entry.entry_id), ignore_errors=True))
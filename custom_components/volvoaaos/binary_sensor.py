@@ -20,12 +20,14 @@ from .const import DOMAIN, LOGGER
 from .coordinator import VolvoData, VolvoUpdateCoordinator
 
 from .entity import VolvoEntity
+from .fleet import VolvoFleet
 
 @dataclass
 class VolvoBinarySensorEntityMixin:
     """Mixin values for Volvo binary sensor entities."""
 
     value_fn: Callable[[VolvoData], float]
+    data_key: tuple[str, str | None]
     attr_name: str | None
     attr_fn: Callable[[VolvoData], float | None]
 
@@ -39,6 +41,7 @@ BINARY_SENSORS = [
         name="Front left door",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.front_left_door.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "front_left_door"),
         attr_name=None,
         attr_fn=None
     ),
@@ -47,6 +50,7 @@ BINARY_SENSORS = [
         name="Front right door",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.front_right_door.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "front_right_door"),
         attr_name=None,
         attr_fn=None
     ),
@@ -55,6 +59,7 @@ BINARY_SENSORS = [
         name="Rear left door",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.rear_left_door.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "rear_left_door"),
         attr_name=None,
         attr_fn=None
     ),
@@ -63,6 +68,7 @@ BINARY_SENSORS = [
         name="Rear right door",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.rear_right_door.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "rear_right_door"),
         attr_name=None,
         attr_fn=None
     ),
@@ -71,6 +77,7 @@ BINARY_SENSORS = [
         name="Hood",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.hood.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "hood"),
         attr_name=None,
         attr_fn=None
     ),
@@ -79,6 +86,7 @@ BINARY_SENSORS = [
         name="Tail gate",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.tailgate.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "tailgate"),
         attr_name=None,
         attr_fn=None
     ),
@@ -87,6 +95,7 @@ BINARY_SENSORS = [
         name="Tank lid",
         device_class=BinarySensorDeviceClass.DOOR,
         value_fn=lambda x: False if x.connected_vehicle_door_status.data.tank_lid.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_door_status", "tank_lid"),
         attr_name=None,
         attr_fn=None
     ),
@@ -95,6 +104,7 @@ BINARY_SENSORS = [
         name="Front left window",
         device_class=BinarySensorDeviceClass.WINDOW,
         value_fn=lambda x: False if x.connected_vehicle_window_status.data.front_left_window.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_window_status", "front_left_window"),
         attr_name=None,
         attr_fn=None
     ),
@@ -103,6 +113,7 @@ BINARY_SENSORS = [
         name="Front right window",
         device_class=BinarySensorDeviceClass.WINDOW,
         value_fn=lambda x: False if x.connected_vehicle_window_status.data.front_right_window.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_window_status", "front_right_window"),
         attr_name=None,
         attr_fn=None
     ),
@@ -111,6 +122,7 @@ BINARY_SENSORS = [
         name="Rear left window",
         device_class=BinarySensorDeviceClass.WINDOW,
         value_fn=lambda x: False if x.connected_vehicle_window_status.data.rear_left_window.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_window_status", "rear_left_window"),
         attr_name=None,
         attr_fn=None
     ),
@@ -119,6 +131,7 @@ BINARY_SENSORS = [
         name="Rear right window",
         device_class=BinarySensorDeviceClass.WINDOW,
         value_fn=lambda x: False if x.connected_vehicle_window_status.data.rear_right_window.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_window_status", "rear_right_window"),
         attr_name=None,
         attr_fn=None
     ),
@@ -127,23 +140,115 @@ BINARY_SENSORS = [
         name="Sunroof",
         device_class=BinarySensorDeviceClass.WINDOW,
         value_fn=lambda x: False if x.connected_vehicle_window_status.data.sunroof.value == 'CLOSED' else True,
+        data_key=("connected_vehicle_window_status", "sunroof"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="tyre_pressure",
+        name="Tyre pressure",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_tyre_status, "front_left", "front_right", "rear_left", "rear_right"),
+        data_key=("connected_vehicle_tyre_status", None),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="brake_fluid",
+        name="Brake fluid",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_brake_status, "brake_fluid_level_warning"),
+        data_key=("connected_vehicle_brake_status", "brake_fluid_level_warning"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="washer_fluid",
+        name="Washer fluid",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_diagnostics, "washer_fluid_level_warning"),
+        data_key=("connected_vehicle_diagnostics", "washer_fluid_level_warning"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="service",
+        name="Service",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_diagnostics, "service_warning"),
+        data_key=("connected_vehicle_diagnostics", "service_warning"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="oil_level",
+        name="Oil level",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_engine_diagnostics, "oil_level_warning"),
+        data_key=("connected_vehicle_engine_diagnostics", "oil_level_warning"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="coolant_level",
+        name="Coolant level",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_engine_diagnostics, "engine_coolant_level_warning"),
+        data_key=("connected_vehicle_engine_diagnostics", "engine_coolant_level_warning"),
+        attr_name=None,
+        attr_fn=None
+    ),
+    VolvoBinarySensorEntityDescription(
+        key="bulb_failure",
+        name="Bulb failure",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda x: _any_warning(x.connected_vehicle_warnings, *_bulb_warnings(x.connected_vehicle_warnings)),
+        data_key=("connected_vehicle_warnings", None),
         attr_name=None,
         attr_fn=None
     ),
 ]
 
+# Status values of warnings that are no problem
+NO_WARNING_VALUES = ("NO_WARNING", "UNSPECIFIED")
+# Parts of the warnings keys of lamps, e.g. brakeLightLeftWarning or turnIndicationFrontLeftWarning
+BULB_WARNING_MARKERS = ("Light", "Beam", "turnIndication")
+
+def _bulb_warnings(model) -> list[str]:
+    """Return the keys of the lamp warnings of the warnings model."""
+    data = getattr(model, "data", None)
+    if data is None:
+        return []
+    return [name for name in data if any(marker in name for marker in BULB_WARNING_MARKERS)]
+
+def _any_warning(model, *attributes: str) -> bool | None:
+    """Return True if a status of an optional low-frequency tier model warns.
+
+    None while the model was not fetched or has none of the statuses.
+    """
+    data = getattr(model, "data", None)
+    if data is None:
+        return None
+    statuses = [data.get(name) if isinstance(data, dict) else getattr(data, name, None) for name in attributes]
+    values = [status.value for status in statuses if status is not None]
+    if not values:
+        return None
+    return any(value not in NO_WARNING_VALUES for value in values)
+
 async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Setup Volvo binary sensors from config entry."""
 
-    volvo_coordinator: VolvoUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
         VolvoBinarySensorEntity(
             coordinator=volvo_coordinator,
             description=description
         )
+        for volvo_coordinator in fleet.coordinators.values()
         for description in BINARY_SENSORS
+        if volvo_coordinator.supports(description.data_key)
     )
 
 class VolvoBinarySensorEntity(VolvoEntity,BinarySensorEntity):
@@ -153,10 +258,10 @@ class VolvoBinarySensorEntity(VolvoEntity,BinarySensorEntity):
 
     def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoBinarySensorEntityDescription) -> None:
         """Initiate Volvo binary sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, description.data_key)
 
         self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+        self._attr_unique_id = self.unique_id_for(description.key)
 
     @property
     def is_on(self) -> bool:
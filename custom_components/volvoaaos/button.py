@@ -18,9 +18,11 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, LOGGER
 
+from .command_queue import CommandSupersededError
 from .coordinator import VolvoData, VolvoUpdateCoordinator
 
-from .entity import VolvoEntity
+from .entity import VolvoEntity, NO_DATA_KEY
+from .fleet import VolvoFleet
 from .volvo import ConnectedVehicle
 
 @dataclass
@@ -28,6 +30,7 @@ class VolvoButtonEntityMixin:
     """Mixin values for Volvo binary sensor entities."""
 
     button_fn: Callable[[ConnectedVehicle], Awaitable[Any]]
+    command: str
 
 @dataclass
 class VolvoButtonEntityDescription(ButtonEntityDescription, VolvoButtonEntityMixin):
@@ -38,11 +41,13 @@ BUTTONS = [
         key="start_cliamte",
         name="Start climate",
         button_fn=lambda client: client.set_climate_start(),
+        command="climatization-start",
     ),
     VolvoButtonEntityDescription(
         key="stop_cliamte",
         name="Stop climate",
         button_fn=lambda client: client.set_climate_stop(),
+        command="climatization-stop",
     ),
 
 ]
@@ -51,13 +56,14 @@ async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Setup Volvo binary sensors from config entry."""
 
-    volvo_coordinator: VolvoUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
         VolvoButtonEntity(
             coordinator=volvo_coordinator,
             description=description
         )
+        for volvo_coordinator in fleet.coordinators.values()
         for description in BUTTONS
     )
 
@@ -68,11 +74,14 @@ class VolvoButtonEntity(VolvoEntity,ButtonEntity):
 
     def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoButtonEntityDescription) -> None:
         """Initiate Volvo binary sensor."""
-        super().__init__(coordinator)
+        # Buttons have no state, only availability changes concern them
+        super().__init__(coordinator, NO_DATA_KEY)
 
         self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+        self._attr_unique_id = self.unique_id_for(description.key)
 
     async def async_press(self) -> None:
-        self.coordinator.set_tokens()
-        await self.entity_description.button_fn(self.coordinator.connected_vehicle)
\ No newline at end of file
+        try:
+            await self.coordinator.async_send_command(self.entity_description.command, self.entity_description.button_fn)
+        except CommandSupersededError as err:
+            LOGGER.debug("%s", err)
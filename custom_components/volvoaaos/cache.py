@@ -0,0 +1,148 @@
+"""Response cache for Volvo AAOS API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp.hdrs import ETAG, IF_MODIFIED_SINCE, IF_NONE_MATCH, LAST_MODIFIED
+
+# Seconds a GET response is served without asking the backend, by URL path.
+# Kept below the poll interval so scheduled polls still see fresh data, the
+# cache mostly catches overlapping calls such as a lock press during a poll.
+ENDPOINT_TTLS = [
+    (re.compile(r"/vehicles$"), 3600),
+    (re.compile(r"/vehicles/[^/]+$"), 86400),
+    (re.compile(r"/recharge-status$"), 20),
+    (re.compile(r"/battery-charge-level$"), 20),
+    (re.compile(r"/doors$"), 10),
+    (re.compile(r"/windows$"), 10),
+    (re.compile(r"/location$"), 20),
+]
+
+# Cached endpoints whose value a command changes
+COMMAND_INVALIDATES = {
+    "lock": ("doors",),
+    "unlock": ("doors",),
+    "climatization-start": ("recharge-status", "battery-charge-level"),
+    "climatization-stop": ("recharge-status", "battery-charge-level"),
+}
+
+Fetch = Callable[[dict[str, str]], Awaitable[tuple[int, Any, Any]]]
+
+
+def endpoint_ttl(url: str) -> int:
+    """Return the cache TTL in seconds for a URL."""
+    path = url.split("?", 1)[0]
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return 0
+
+
+@dataclass
+class CacheEntry:
+    """Cached response body and its validators."""
+
+    payload: Any
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ResponseCache:
+    """Per-endpoint TTL cache with conditional revalidation and request coalescing.
+
+    Concurrent identical GETs share one in-flight request. Expired entries
+    that carry an ETag or Last-Modified are revalidated with If-None-Match /
+    If-Modified-Since, and a 304 reuses the cached body.
+    """
+
+    def __init__(self) -> None:
+        """Initialize cache."""
+
+        self._entries: dict[str, CacheEntry] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self._generation = 0
+
+    async def async_get(self, url: str, fetch: Fetch) -> Any:
+        """Return the body for url from cache, an in-flight request or fetch."""
+
+        entry = self._entries.get(url)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self.hits += 1
+            return entry.payload
+
+        if (in_flight := self._in_flight.get(url)) is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        # Taken now, the task may only start after an invalidation
+        task = asyncio.ensure_future(self._async_fetch(url, entry, fetch, self._generation))
+        self._in_flight[url] = task
+        task.add_done_callback(lambda _: self._in_flight.get(url) is task and self._in_flight.pop(url))
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, url: str, entry: CacheEntry | None, fetch: Fetch, generation: int) -> Any:
+        validators = {}
+        if entry is not None:
+            if entry.etag:
+                validators[IF_NONE_MATCH] = entry.etag
+            if entry.last_modified:
+                validators[IF_MODIFIED_SINCE] = entry.last_modified
+
+        status, payload, headers = await fetch(validators)
+        ttl = endpoint_ttl(url)
+
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            entry.expires_at = time.monotonic() + ttl
+            return entry.payload
+
+        self.misses += 1
+        if generation != self._generation:
+            # Invalidated while in flight, the body may predate a command
+            return payload
+
+        etag = headers.get(ETAG)
+        last_modified = headers.get(LAST_MODIFIED)
+        if ttl or etag or last_modified:
+            self._entries[url] = CacheEntry(payload, time.monotonic() + ttl, etag, last_modified)
+        else:
+            self._entries.pop(url, None)
+        return payload
+
+    def invalidate(self, vin: str, *endpoints: str) -> None:
+        """Drop cached entries of a VIN, all of them if no endpoints are given.
+
+        Requests in flight for the VIN are detached, so later callers do not
+        join a request that may have been answered before the change.
+        """
+
+        self._generation += 1
+        for url in [url for url in self._in_flight if f"/{vin}/" in url]:
+            del self._in_flight[url]
+        for url in list(self._entries):
+            path = url.split("?", 1)[0]
+            if f"/{vin}/" not in path:
+                continue
+            if not endpoints or path.rsplit("/", 1)[-1] in endpoints:
+                del self._entries[url]
+
+    def invalidate_command(self, vin: str, command: str) -> None:
+        """Drop the cached entries a command changes, all of the VIN for unknown commands."""
+
+        self.invalidate(vin, *COMMAND_INVALIDATES.get(command, ()))
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+
+        self._entries.clear()
@@ -0,0 +1,94 @@
+"""Endpoint capability probing of Volvo AAOS vehicles."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import timedelta
+
+from aiohttp import ClientResponseError
+
+from .const import LOGGER
+from .volvo import SNAPSHOT_CONCURRENCY, VolvoApiClient
+
+# Vehicle data endpoints probed per VIN, commands cannot be probed without acting
+PROBED_ENDPOINTS = (
+    "get_recharge_status",
+    "get_battery_charge_level",
+    "get_door_status",
+    "get_window_status",
+    "get_location",
+    "get_odometer",
+    "get_tyre_status",
+    "get_engine_status",
+    "get_engine_diagnostics",
+    "get_brake_status",
+    "get_diagnostics",
+    "get_warnings",
+    "get_fuel_status",
+    "get_statistics",
+)
+
+# Statuses meaning the VIN, its model year or the API key cannot use an endpoint
+UNSUPPORTED_STATUSES = frozenset({403, 404})
+
+# Endpoints that only count as supported after answering once. Polling the
+# full recharge status of a car without it fails every poll, the battery
+# charge level is the fallback
+FAIL_CLOSED_ENDPOINTS = frozenset({"get_recharge_status"})
+
+# Vehicles gain endpoints with software updates and scope changes
+REPROBE_INTERVAL = timedelta(days=1)
+
+
+async def probe_endpoint(client: VolvoApiClient, name: str) -> bool | None:
+    """Return True if an endpoint answers, False if it is unsupported, None if unknown.
+
+    Only UNSUPPORTED_STATUSES count as unsupported, timeouts, 5xx and open
+    circuits say nothing about the vehicle.
+    """
+
+    try:
+        await getattr(client, name)()
+    except ClientResponseError as err:
+        if err.status in UNSUPPORTED_STATUSES:
+            return False
+        LOGGER.debug("Could not probe %s of %s: %s", name, client.vin, err)
+        return None
+    except Exception as err:
+        LOGGER.debug("Could not probe %s of %s: %s", name, client.vin, err)
+        return None
+    return True
+
+
+async def async_probe_capabilities(
+    clients: Iterable[VolvoApiClient],
+    previous: dict[str, bool] | None = None,
+    concurrency: int = SNAPSHOT_CONCURRENCY,
+) -> dict[str, bool]:
+    """Probe every PROBED_ENDPOINTS of a VIN and return {endpoint name: supported}.
+
+    `clients` are the API clients of one VIN, each endpoint is called on the
+    client that has it. Endpoints that could not be probed keep their
+    previous result, or count as supported unless in FAIL_CLOSED_ENDPOINTS.
+    """
+
+    by_name = {name: client for client in clients for name in client.endpoints if name in PROBED_ENDPOINTS}
+    previous = previous or {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(name: str) -> bool | None:
+        async with semaphore:
+            return await probe_endpoint(by_name[name], name)
+
+    names = [name for name in PROBED_ENDPOINTS if name in by_name]
+    results = await asyncio.gather(*(probe(name) for name in names))
+    return {
+        name: previous.get(name, name not in FAIL_CLOSED_ENDPOINTS) if supported is None else supported
+        for name, supported in zip(names, results)
+    }
+
+
+def unsupported(capabilities: dict[str, bool]) -> frozenset[str]:
+    """Return the endpoints a capability matrix marks unsupported."""
+    return frozenset(name for name, supported in capabilities.items() if not supported)
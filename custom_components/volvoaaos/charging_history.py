@@ -0,0 +1,255 @@
+"""Charging history and charge rate estimation for Volvo AAOS vehicles."""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import statistics
+import struct
+from array import array
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+
+from .compact import NO_TIMESTAMP, timestamp_to_ms
+from .const import DOMAIN, LOGGER
+
+# Epoch ms of the reading, battery level in percent, charging state code
+RECORD = struct.Struct("<qfb3x")
+FLOAT32 = struct.Struct("<f")
+
+# Readings kept in memory for the estimation, the file keeps more
+WINDOW_SIZE = 512
+# The file is cut to its newest half beyond this, about 4 years of daily charging
+MAX_FILE_RECORDS = 65536
+
+STATE_UNKNOWN = -1
+STATE_NOT_CHARGING = 0
+STATE_CHARGING = 1
+
+# Readings used for the rate, the charging curve flattens over a session
+RATE_WINDOW_MS = 60 * 60 * 1000
+# Shortest span of readings a rate is computed from
+MIN_RATE_SPAN_MS = 5 * 60 * 1000
+# Readings further apart do not belong to one charging session
+MAX_SESSION_GAP_MS = 2 * 60 * 60 * 1000
+# Without a charging status, charging is assumed over once the level stopped rising this long
+INFERRED_CHARGING_TIMEOUT_MS = 60 * 60 * 1000
+
+FULL_LEVEL = 100.0
+
+
+def history_dir(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the directory of the charging history files of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.charging")
+
+
+def charging_state(energy_data) -> int:
+    """Return the charging state code of recharge or battery level data."""
+
+    status = getattr(energy_data, "charging_system_status", None)
+    if status is None or status.value is None:
+        return STATE_UNKNOWN
+    return STATE_CHARGING if status.value == "CHARGING_SYSTEM_CHARGING" else STATE_NOT_CHARGING
+
+
+def read_records(path: str, count: int) -> list[tuple[int, float, int]]:
+    """Return the newest `count` records of a history file, blocking.
+
+    The file is memory mapped, only its tail is read. A partly written
+    last record is ignored.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size // RECORD.size * RECORD.size
+            if not size:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start = max(size - count * RECORD.size, 0)
+                return list(RECORD.iter_unpack(mapped[start:size]))
+    except FileNotFoundError:
+        return []
+
+
+def append_records(path: str, data: bytes) -> None:
+    """Append packed records to a history file, blocking.
+
+    A file grown beyond MAX_FILE_RECORDS is replaced by its newest half.
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as file:
+        size = file.tell()
+        if size % RECORD.size:
+            # Drop a record cut short by a crash before appending behind it
+            file.truncate(size - size % RECORD.size)
+        file.write(data)
+        size = file.tell()
+
+    if size > MAX_FILE_RECORDS * RECORD.size:
+        keep = read_records(path, MAX_FILE_RECORDS // 2)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(b"".join(RECORD.pack(*record) for record in keep))
+        os.replace(temporary, path)
+
+
+class ChargingHistory:
+    """Append-only battery level and charging state readings of one vehicle.
+
+    Readings are appended to a file of fixed size records when the level or
+    the charging state changes, the newest WINDOW_SIZE are kept in arrays for
+    charge_rate and estimated_full.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize history."""
+
+        self.hass = hass
+        self.path = path
+        self.timestamps = array("q")
+        self.levels = array("f")
+        self.states = array("b")
+        self._pending = bytearray()
+        self._write_lock = asyncio.Lock()
+        self._write_task: asyncio.Task | None = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        """Return the number of readings kept in memory."""
+        return len(self.timestamps)
+
+    async def async_load(self) -> None:
+        """Read the newest readings of the file, before the ones added since."""
+
+        records = await self.hass.async_add_executor_job(read_records, self.path, WINDOW_SIZE)
+        timestamps, levels, states = self.timestamps, self.levels, self.states
+        self.timestamps, self.levels, self.states = array("q"), array("f"), array("b")
+        for timestamp, level, state in records:
+            self._add(timestamp, level, state)
+        for timestamp, level, state in zip(timestamps, levels, states):
+            self._add(timestamp, level, state)
+        self.loaded = True
+
+    def add_energy(self, energy) -> bool:
+        """Record the battery level of a recharge or battery level model, or a view of one."""
+
+        data = getattr(energy, "data", None)
+        battery = getattr(data, "battery_charge_level", None)
+        if battery is None or battery.value is None:
+            return False
+        timestamp = timestamp_to_ms(battery.timestamp)
+        if timestamp == NO_TIMESTAMP:
+            return False
+        return self.add(timestamp, float(battery.value), charging_state(data))
+
+    def add(self, timestamp_ms: int, level: float, state: int) -> bool:
+        """Record a reading, return False if it is not newer or nothing changed."""
+
+        if not self._add(timestamp_ms, level, state):
+            return False
+
+        self._pending += RECORD.pack(timestamp_ms, level, state)
+        if self._write_task is None or self._write_task.done():
+            self._write_task = self.hass.async_create_background_task(self.async_flush(), f"{self.path} write")
+        return True
+
+    def _add(self, timestamp_ms: int, level: float, state: int) -> bool:
+        # As stored, or levels like 80.3 would never compare equal
+        level = FLOAT32.unpack(FLOAT32.pack(level))[0]
+        if self.timestamps:
+            if timestamp_ms <= self.timestamps[-1]:
+                return False
+            if level == self.levels[-1] and state == self.states[-1]:
+                return False
+
+        self.timestamps.append(timestamp_ms)
+        self.levels.append(level)
+        self.states.append(state)
+        if len(self.timestamps) > 2 * WINDOW_SIZE:
+            del self.timestamps[:-WINDOW_SIZE], self.levels[:-WINDOW_SIZE], self.states[:-WINDOW_SIZE]
+        return True
+
+    async def async_flush(self) -> None:
+        """Append the pending readings to the file."""
+
+        async with self._write_lock:
+            while self._pending:
+                data = bytes(self._pending)
+                self._pending.clear()
+                try:
+                    await self.hass.async_add_executor_job(append_records, self.path, data)
+                except OSError as err:
+                    LOGGER.warning("Could not write charging history %s: %s", self.path, err)
+                    return
+
+    def session_start(self, now_ms: int | None = None) -> int | None:
+        """Return the index of the first reading of the running charging session.
+
+        With a charging status the session is the trailing run of charging
+        readings. Without one it is the trailing run of rising levels, over
+        once the level has not risen for INFERRED_CHARGING_TIMEOUT_MS.
+        """
+
+        count = len(self.timestamps)
+        if not count:
+            return None
+        last = count - 1
+        if self.states[last] == STATE_NOT_CHARGING:
+            return None
+        if self.states[last] == STATE_UNKNOWN:
+            now_ms = now_ms if now_ms is not None else int(dt_util.utcnow().timestamp() * 1000)
+            if now_ms - self.timestamps[last] > INFERRED_CHARGING_TIMEOUT_MS:
+                return None
+
+        start = last
+        while start > 0 and self.timestamps[start] - self.timestamps[start - 1] <= MAX_SESSION_GAP_MS:
+            state = self.states[start - 1]
+            if state == STATE_NOT_CHARGING:
+                break
+            if state == STATE_UNKNOWN and self.levels[start - 1] >= self.levels[start]:
+                break
+            start -= 1
+        return start
+
+    def charge_rate(self, now_ms: int | None = None) -> float | None:
+        """Return the charge rate of the running session in percent per hour.
+
+        A least squares line through the readings of the last RATE_WINDOW_MS,
+        None while not charging or with too few readings.
+        """
+
+        start = self.session_start(now_ms)
+        if start is None:
+            return None
+        end = len(self.timestamps)
+        window_start = self.timestamps[-1] - RATE_WINDOW_MS
+        while start < end - 2 and self.timestamps[start] < window_start:
+            start += 1
+        if end - start < 2 or self.timestamps[-1] - self.timestamps[start] < MIN_RATE_SPAN_MS:
+            return None
+
+        first = self.timestamps[start]
+        hours = [(timestamp - first) / 3600000 for timestamp in self.timestamps[start:end]]
+        slope, _ = statistics.linear_regression(hours, self.levels[start:end])
+        return slope if slope > 0 else None
+
+    def estimated_full(self, now_ms: int | None = None) -> datetime | None:
+        """Return when the battery is full at the current charge rate."""
+
+        if (rate := self.charge_rate(now_ms)) is None:
+            return None
+        hours = (FULL_LEVEL - self.levels[-1]) / rate
+        return dt_util.utc_from_timestamp(self.timestamps[-1] / 1000 + hours * 3600)
+
+    def as_dict(self) -> dict:
+        """Return a summary for diagnostics."""
+        return {
+            "readings": len(self.timestamps),
+            "charge_rate": self.charge_rate(),
+            "estimated_full": (full := self.estimated_full()) and full.isoformat(),
+        }
@@ -0,0 +1,129 @@
+"""Per-vehicle command queue for Volvo AAOS."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+# Commands in one group conflict, they are sent one at a time
+COMMAND_GROUPS = {
+    "lock": "lock",
+    "unlock": "lock",
+    "climatization-start": "climatization",
+    "climatization-stop": "climatization",
+}
+
+# Seconds a completed command answers repeats of itself without a new POST
+COALESCE_WINDOW = 10
+
+
+class CommandSupersededError(Exception):
+    """Raised to the callers of a queued command replaced before it was sent."""
+
+    def __init__(self, command: str, superseded_by: str) -> None:
+        """Initialize error."""
+        super().__init__(f"{command} was superseded by {superseded_by} before it was sent")
+        self.command = command
+        self.superseded_by = superseded_by
+
+
+@dataclass
+class _QueuedCommand:
+    command: str
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+
+
+class CommandQueue:
+    """Serialize, coalesce and supersede the commands of one vehicle.
+
+    Per conflict group one command is in flight and at most one waits. A
+    command equal to the one in flight or waiting shares its result, as does
+    a repeat within COALESCE_WINDOW of its completion. A different command
+    replaces the waiting one, whose callers get CommandSupersededError.
+    """
+
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW) -> None:
+        """Initialize queue."""
+
+        self.coalesce_window = coalesce_window
+        self._in_flight: dict[str, _QueuedCommand] = {}
+        self._waiting: dict[str, _QueuedCommand] = {}
+        self._completed: dict[str, tuple[str, float, Any]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.sent = 0
+        self.coalesced = 0
+        self.superseded = 0
+
+    async def async_run(self, command: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a command through the queue and return its result."""
+
+        group = COMMAND_GROUPS.get(command, command)
+
+        waiting = self._waiting.get(group)
+        if waiting is not None and waiting.command != command:
+            del self._waiting[group]
+            self.superseded += 1
+            waiting.future.set_exception(CommandSupersededError(waiting.command, command))
+            waiting = None
+
+        in_flight = self._in_flight.get(group)
+        shared = waiting or (in_flight if in_flight is not None and in_flight.command == command else None)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared.future)
+
+        if in_flight is None and (completed := self._completed.get(group)) is not None:
+            completed_command, completed_at, result = completed
+            if completed_command == command and time.monotonic() - completed_at < self.coalesce_window:
+                self.coalesced += 1
+                return result
+
+        queued = _QueuedCommand(command, run, asyncio.get_running_loop().create_future())
+        # Callers may be gone by the time it fails, do not warn about that
+        queued.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        if in_flight is None:
+            self._start(group, queued)
+        else:
+            self._waiting[group] = queued
+        return await asyncio.shield(queued.future)
+
+    def _start(self, group: str, queued: _QueuedCommand) -> None:
+        self._in_flight[group] = queued
+        task = asyncio.create_task(self._async_send(group, queued))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_send(self, group: str, queued: _QueuedCommand) -> None:
+        self.sent += 1
+        try:
+            result = await queued.run()
+        except asyncio.CancelledError:
+            queued.future.cancel()
+            raise
+        except Exception as err:
+            self._completed.pop(group, None)
+            queued.future.set_exception(err)
+        else:
+            self._completed[group] = (queued.command, time.monotonic(), result)
+            queued.future.set_result(result)
+        finally:
+            del self._in_flight[group]
+            if (waiting := self._waiting.pop(group, None)) is not None:
+                self._start(group, waiting)
+
+    def cancel(self) -> None:
+        """Cancel every command in flight or waiting."""
+
+        for waiting in self._waiting.values():
+            waiting.future.cancel()
+        self._waiting.clear()
+        for task in self._tasks:
+            task.cancel()
+
+    def as_dict(self) -> dict:
+        """Return counters for diagnostics."""
+        return {"sent": self.sent, "coalesced": self.coalesced, "superseded": self.superseded}
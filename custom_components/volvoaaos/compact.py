@@ -0,0 +1,553 @@
+"""Compact per-vehicle snapshots of Volvo AAOS responses."""
+
+from __future__ import annotations
+
+import re
+import sys
+import types
+import typing
+from array import array
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel
+
+from homeassistant.util import dt as dt_util
+
+from .decode import PYDANTIC_V2
+
+STATUS_FIELDS = frozenset({"value", "unit", "timestamp"})
+
+KIND_NONE = 0
+# Enum-like string, stored as its code in VALUE_CODES
+KIND_CODE = 1
+KIND_FLOAT = 2
+KIND_INT = 3
+# Numeric strings the API sends for readings, e.g. "80.0", stored as numbers
+KIND_FLOAT_TEXT = 4
+KIND_INT_TEXT = 5
+# Any other string, kept in the snapshot itself
+KIND_TEXT = 6
+
+# Strings interned in VALUE_CODES, status names and units. Readings and
+# free text are not, the shared table would grow with every new value.
+ENUM_VALUE = re.compile(r"[A-Za-z_]{1,64}")
+
+# Stored for missing and unparsable timestamps
+NO_TIMESTAMP = -(2**63)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MILLISECOND = timedelta(milliseconds=1)
+
+CHILD_STATUS = 0
+CHILD_MODEL = 1
+CHILD_SCALAR = 2
+
+
+class ValueCodes:
+    """Intern table mapping status strings to small ints, shared by all vehicles.
+
+    Known API values get fixed codes, other ENUM_VALUE strings are added on
+    first sight. Their number is bounded by the API's enums and units.
+    """
+
+    def __init__(self, known: list[str]) -> None:
+        """Initialize table."""
+
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+        for value in known:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        """Return the code of a value, adding it if new."""
+
+        if (code := self.codes.get(value)) is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def value(self, code: int) -> str:
+        """Return the value of a code."""
+        return self.values[code]
+
+
+VALUE_CODES = ValueCodes(
+    [
+        "OPEN", "CLOSED", "AJAR", "UNSPECIFIED", "LOCKED", "UNLOCKED", "NO_WARNING",
+        "CHARGING_SYSTEM_CHARGING", "CHARGING_SYSTEM_IDLE", "CHARGING_SYSTEM_FAULT", "CHARGING_SYSTEM_UNSPECIFIED",
+        "CONNECTION_STATUS_CONNECTED_AC", "CONNECTION_STATUS_CONNECTED_DC", "CONNECTION_STATUS_DISCONNECTED",
+        "CONNECTION_STATUS_UNSPECIFIED", "percentage", "kilometers", "minutes", "km",
+    ]
+)
+
+
+def timestamp_to_ms(timestamp: str | None) -> int:
+    """Return an ISO 8601 API timestamp as epoch milliseconds, sub-millisecond digits dropped."""
+
+    if timestamp is None:
+        return NO_TIMESTAMP
+    if (moment := dt_util.parse_datetime(timestamp)) is None:
+        return NO_TIMESTAMP
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - EPOCH) // MILLISECOND
+
+
+def ms_to_timestamp(milliseconds: int) -> str | None:
+    """Return epoch milliseconds in the API's timestamp format, e.g. 2024-01-20T10:15:42.123Z."""
+
+    if milliseconds == NO_TIMESTAMP:
+        return None
+    moment = EPOCH + milliseconds * MILLISECOND
+    return f"{moment:%Y-%m-%dT%H:%M:%S}.{moment.microsecond // 1000:03d}Z"
+
+
+def _field_names(model: type[BaseModel]) -> list[str]:
+    return list(model.model_fields if PYDANTIC_V2 else model.__fields__)
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType) and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _is_status(model: type[BaseModel]) -> bool:
+    names = set(_field_names(model))
+    return {"value", "timestamp"} <= names <= STATUS_FIELDS
+
+
+class Layout:
+    """Where the statuses and other values of a model class sit in a snapshot.
+
+    Status objects ({value, unit, timestamp}) take one slot in the status
+    arrays, everything else not a model one slot in the scalar tuple.
+    """
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        """Build the layout from the model's type hints."""
+
+        self.model = model
+        self.children: dict[str, tuple[int, Any, int]] = {}
+        self.statuses = 0
+        self.scalars = 0
+
+        hints = typing.get_type_hints(model)
+        for name in _field_names(model):
+            annotation = _unwrap_optional(hints[name])
+            if _is_model(annotation) and _is_status(annotation):
+                self.children[name] = (CHILD_STATUS, annotation, self.statuses)
+                self.statuses += 1
+            elif _is_model(annotation):
+                child = layout_of(annotation)
+                self.children[name] = (CHILD_MODEL, child, (self.statuses, self.scalars))
+                self.statuses += child.statuses
+                self.scalars += child.scalars
+            else:
+                self.children[name] = (CHILD_SCALAR, None, self.scalars)
+                self.scalars += 1
+
+        # Properties instead of __getattr__, entity updates read these a lot
+        self.view: type[ModelView] = type(
+            f"{model.__name__}View",
+            (ModelView,),
+            {
+                "__slots__": (),
+                **{name: _child_property(kind, child, offset) for name, (kind, child, offset) in self.children.items()},
+            },
+        )
+
+
+def _child_property(kind: int, child: Any, offset: Any) -> property:
+    """Return the property reading one child of a model view."""
+
+    if kind == CHILD_STATUS:
+
+        def get(view: ModelView) -> StatusView | None:
+            index = view._status + offset
+            if view._snapshot._kinds[index] == KIND_NONE:
+                return None
+            return StatusView(view._snapshot, index, child)
+
+    elif kind == CHILD_MODEL:
+        statuses, scalars = offset
+
+        def get(view: ModelView) -> ModelView:
+            return child.view(view._snapshot, child, view._status + statuses, view._scalar + scalars)
+
+    else:
+
+        def get(view: ModelView) -> Any:
+            return view._snapshot._extras[view._scalar + offset]
+
+    return property(get)
+
+
+@cache
+def layout_of(model: type[BaseModel]) -> Layout:
+    """Return the layout of a model class, built once."""
+    return Layout(model)
+
+
+class _Builder:
+    """Accumulates the arrays of a snapshot."""
+
+    def __init__(self) -> None:
+        self.kinds = array("b")
+        self.values = array("d")
+        self.units = array("i")
+        self.timestamps = array("q")
+        self.raw_timestamps: dict[int, str] = {}
+        self.texts: dict[int, str] = {}
+        self.raw_units: dict[int, str] = {}
+        self.extras: list[Any] = []
+
+    def add_status(self, status: Any) -> None:
+        if status is None:
+            self.kinds.append(KIND_NONE)
+            self.values.append(0.0)
+            self.units.append(-1)
+            self.timestamps.append(NO_TIMESTAMP)
+            return
+
+        value = status.value
+        if isinstance(value, str):
+            self.add_text(value)
+        elif isinstance(value, bool) or not isinstance(value, int | float):
+            raise TypeError(f"Cannot store status value {value!r}")
+        elif isinstance(value, int):
+            self.kinds.append(KIND_INT)
+            self.values.append(value)
+        else:
+            self.kinds.append(KIND_FLOAT)
+            self.values.append(value)
+
+        unit = getattr(status, "unit", None)
+        if unit is None:
+            self.units.append(-1)
+        elif ENUM_VALUE.fullmatch(unit):
+            self.units.append(VALUE_CODES.code(unit))
+        else:
+            self.raw_units[len(self.units)] = unit
+            self.units.append(-1)
+
+        milliseconds = timestamp_to_ms(status.timestamp)
+        # Timestamps in another format than the API's usual one are kept as sent
+        if status.timestamp is not None and ms_to_timestamp(milliseconds) != status.timestamp:
+            self.raw_timestamps[len(self.timestamps)] = status.timestamp
+        self.timestamps.append(milliseconds)
+
+    def add_text(self, value: str) -> None:
+        if ENUM_VALUE.fullmatch(value):
+            self.kinds.append(KIND_CODE)
+            self.values.append(VALUE_CODES.code(value))
+            return
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if number is not None and repr(number) == value:
+            self.kinds.append(KIND_FLOAT_TEXT)
+            self.values.append(number)
+        elif number is not None and number.is_integer() and abs(number) < 2**53 and str(int(number)) == value:
+            self.kinds.append(KIND_INT_TEXT)
+            self.values.append(number)
+        else:
+            self.kinds.append(KIND_TEXT)
+            self.values.append(0.0)
+            self.texts[len(self.kinds) - 1] = value
+
+    def add_model(self, model: BaseModel, layout: Layout) -> None:
+        for name, (kind, child, _) in layout.children.items():
+            value = getattr(model, name)
+            if kind == CHILD_STATUS:
+                self.add_status(value)
+            elif kind == CHILD_MODEL:
+                self.add_model(value, child)
+            elif isinstance(value, str):
+                self.extras.append(sys.intern(value))
+            elif isinstance(value, list):
+                self.extras.append(tuple(value))
+            else:
+                self.extras.append(value)
+
+    def add_view(self, view: ModelView) -> None:
+        source = view._snapshot
+        start, end = view._status, view._status + view._layout.statuses
+        for index in range(start, end):
+            for copied, raw in ((self.raw_timestamps, source._raw_timestamps), (self.texts, source._texts), (self.raw_units, source._raw_units)):
+                if index in raw:
+                    copied[len(self.timestamps) + index - start] = raw[index]
+        self.kinds.extend(source._kinds[start:end])
+        self.values.extend(source._values[start:end])
+        self.units.extend(source._units[start:end])
+        self.timestamps.extend(source._timestamps[start:end])
+        self.extras.extend(source._extras[view._scalar:view._scalar + view._layout.scalars])
+
+
+@cache
+def _snapshot_class(layouts: tuple[tuple[str, Layout | None], ...]) -> type[VehicleSnapshot]:
+    """Return the snapshot subclass with a property per field, shared by equal layouts."""
+
+    offsets = {}
+    properties = {}
+    statuses = scalars = 0
+    for name, layout in layouts:
+        offsets[name] = (layout, statuses, scalars)
+        properties[name] = _field_property(layout, statuses, scalars)
+        if layout is not None:
+            statuses += layout.statuses
+            scalars += layout.scalars
+    return type("VehicleSnapshot", (VehicleSnapshot,), {"__slots__": (), "_fields": offsets, **properties})
+
+
+def _field_property(layout: Layout | None, statuses: int, scalars: int) -> property:
+    """Return the property reading one field of a snapshot."""
+
+    def get(snapshot: VehicleSnapshot) -> ModelView | None:
+        if layout is None:
+            return None
+        return layout.view(snapshot, layout, statuses, scalars)
+
+    return property(get)
+
+
+class VehicleSnapshot:
+    """Flat, immutable copy of one vehicle's response models.
+
+    Status values are stored as codes of VALUE_CODES or numbers, units as
+    codes and timestamps as epoch milliseconds, in typed arrays. Strings
+    that are neither enum-like nor numeric are kept per snapshot. Fields are
+    read through ModelView and StatusView, which mirror the attribute paths
+    of the pydantic models, e.g. snapshot.energy.data.battery_charge_level.value.
+    Instances get a subclass per field layout with a property per field.
+    """
+
+    __slots__ = ("_kinds", "_values", "_units", "_timestamps", "_raw_timestamps", "_texts", "_raw_units", "_extras")
+
+    def __init__(self, fields: dict[str, BaseModel | ModelView | None]) -> None:
+        """Build a snapshot from models, or views of another snapshot."""
+
+        builder = _Builder()
+        layouts = []
+        for name, value in fields.items():
+            if value is None:
+                layouts.append((name, None))
+            elif isinstance(value, ModelView):
+                layouts.append((name, value._layout))
+                builder.add_view(value)
+            else:
+                layout = layout_of(type(value))
+                layouts.append((name, layout))
+                builder.add_model(value, layout)
+
+        self.__class__ = _snapshot_class(tuple(layouts))
+        self._kinds = builder.kinds
+        self._values = builder.values
+        self._units = builder.units
+        self._timestamps = builder.timestamps
+        self._raw_timestamps = builder.raw_timestamps
+        self._texts = builder.texts
+        self._raw_units = builder.raw_units
+        self._extras = tuple(builder.extras)
+
+    _fields: dict[str, tuple[Layout | None, int, int]] = {}
+
+    def field_names(self) -> list[str]:
+        """Return the names of the fields."""
+        return list(self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if every field equals that of the other snapshot."""
+        if not isinstance(other, VehicleSnapshot):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name, None) for name in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return the fields like a dataclass repr."""
+        return f"VehicleSnapshot({', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)})"
+
+    def status(self, index: int) -> tuple[str | float | int | None, str | None, int]:
+        """Return value, unit and epoch ms timestamp of a status slot."""
+
+        kind = self._kinds[index]
+        if kind == KIND_NONE:
+            return None, None, NO_TIMESTAMP
+        unit = self._units[index]
+        unit = self._raw_units.get(index) if unit < 0 else VALUE_CODES.value(unit)
+        return _status_value(self, index, kind), unit, self._timestamps[index]
+
+
+def _status_value(snapshot: VehicleSnapshot, index: int, kind: int) -> str | float | int | None:
+    """Return the value of a status slot as the API sent it."""
+
+    value = snapshot._values[index]
+    if kind == KIND_CODE:
+        return VALUE_CODES.values[int(value)]
+    if kind == KIND_FLOAT:
+        return value
+    if kind == KIND_INT:
+        return int(value)
+    if kind == KIND_FLOAT_TEXT:
+        return repr(value)
+    if kind == KIND_INT_TEXT:
+        return str(int(value))
+    if kind == KIND_TEXT:
+        return snapshot._texts[index]
+    return None
+
+
+class StatusView:
+    """Read-only {value, unit, timestamp} status of a snapshot."""
+
+    __slots__ = ("_snapshot", "_index", "_model")
+
+    def __init__(self, snapshot: VehicleSnapshot, index: int, model: type[BaseModel]) -> None:
+        """Initialize view."""
+        self._snapshot = snapshot
+        self._index = index
+        self._model = model
+
+    @property
+    def value(self) -> str | float | int | None:
+        """Return the status value."""
+
+        snapshot = self._snapshot
+        return _status_value(snapshot, self._index, snapshot._kinds[self._index])
+
+    @property
+    def unit(self) -> str | None:
+        """Return the unit, if any."""
+        return self._snapshot.status(self._index)[1]
+
+    @property
+    def timestamp_ms(self) -> int | None:
+        """Return the timestamp as epoch milliseconds."""
+        milliseconds = self._snapshot._timestamps[self._index]
+        return None if milliseconds == NO_TIMESTAMP else milliseconds
+
+    @property
+    def timestamp(self) -> str | None:
+        """Return the timestamp as the API formats it."""
+        if (raw := self._snapshot._raw_timestamps.get(self._index)) is not None:
+            return raw
+        return ms_to_timestamp(self._snapshot._timestamps[self._index])
+
+    def _key(self) -> tuple:
+        return (*self._snapshot.status(self._index), self._snapshot._raw_timestamps.get(self._index))
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if value, unit and timestamp equal those of the other status."""
+        if not isinstance(other, StatusView):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return the status like its model's repr."""
+        return f"{self._model.__name__}(value={self.value!r}, unit={self.unit!r}, timestamp={self.timestamp!r})"
+
+    def to_model(self) -> BaseModel:
+        """Return the status as its pydantic model."""
+
+        values = {"value": self.value, "timestamp": self.timestamp}
+        if "unit" in _field_names(self._model):
+            values["unit"] = self.unit
+        return _construct(self._model, values)
+
+
+class ModelView:
+    """Read-only view of a model stored in a snapshot, attribute compatible with it.
+
+    Each Layout subclasses it with a property per model field.
+    """
+
+    __slots__ = ("_snapshot", "_layout", "_status", "_scalar")
+
+    def __init__(self, snapshot: VehicleSnapshot, layout: Layout, status: int, scalar: int) -> None:
+        """Initialize view."""
+        self._snapshot = snapshot
+        self._layout = layout
+        self._status = status
+        self._scalar = scalar
+
+    @property
+    def model(self) -> type[BaseModel]:
+        """Return the pydantic model class the view stands for."""
+        return self._layout.model
+
+    def attributes(self) -> dict[str, Any]:
+        """Return the attributes like the model's __dict__."""
+        return {name: getattr(self, name) for name in self._layout.children}
+
+    def _key(self) -> tuple:
+        snapshot = self._snapshot
+        start, end = self._status, self._status + self._layout.statuses
+        return (
+            self._layout.model,
+            snapshot._kinds[start:end],
+            snapshot._values[start:end],
+            snapshot._units[start:end],
+            snapshot._timestamps[start:end],
+            snapshot._extras[self._scalar:self._scalar + self._layout.scalars],
+            *(
+                {index - start: raw for index, raw in mapping.items() if start <= index < end}
+                for mapping in (snapshot._raw_timestamps, snapshot._texts, snapshot._raw_units)
+            ),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the stored values equal those of the other view."""
+        if not isinstance(other, ModelView):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return the view like its model's repr."""
+        return f"{self._layout.model.__name__}({', '.join(f'{name}={value!r}' for name, value in self.attributes().items())})"
+
+    def to_model(self) -> BaseModel:
+        """Return the view as its pydantic model, e.g. to serialize it."""
+
+        values = {}
+        for name, value in self.attributes().items():
+            if isinstance(value, ModelView | StatusView):
+                value = value.to_model()
+            elif isinstance(value, tuple):
+                value = list(value)
+            values[name] = value
+        return _construct(self._layout.model, values)
+
+
+def _construct(model: type[BaseModel], values: dict[str, Any]) -> BaseModel:
+    """Create a model from trusted values keyed by field name."""
+    if PYDANTIC_V2:
+        return model.model_construct(**values)
+    return model.construct(**values)
+
+
+def model_attributes(model: Any) -> dict[str, Any]:
+    """Return the attributes of a pydantic model or a view of one."""
+
+    if isinstance(model, ModelView):
+        return model.attributes()
+    return getattr(model, "__dict__", {})
+
+
+def to_model(model: Any) -> Any:
+    """Return the pydantic model of a view, other values unchanged."""
+
+    if isinstance(model, ModelView):
+        return model.to_model()
+    return model
@@ -2,18 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
 from typing import Any
 import voluptuous as vol
 
+from aiohttp import ClientSession
+
 from homeassistant import config_entries
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN, CONF_NAME
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers import selector
 
-from .const import DOMAIN, LOGGER, CONF_VIN, CONF_REFRESH_TOKEN, CONF_VCC_API_KEY, CONF_ALL_RECHARGE_AVAILABLE
+from .const import DOMAIN, LOGGER, CONF_VIN, CONF_REFRESH_TOKEN, CONF_VCC_API_KEY, CONF_ALL_RECHARGE_AVAILABLE, CONF_FLEET, CONF_VEHICLES, CONF_CAPABILITIES, CONF_DISCOVER, CONF_API_URL, CONF_AUTH_URL, API_URL, AUTH_URL
 
-from .volvo import Auth, ConnectedVehicle, Energy
+from .capabilities import async_probe_capabilities
+from .fleet import vehicles_from_entry
+from .models import GetVehicleData
+from .vehicle_info import model_name
+from .volvo import SNAPSHOT_CONCURRENCY, Auth, ConnectedVehicle, Energy, Location
 
 SETUP_SCHEMA = vol.Schema(
     {
@@ -23,6 +31,14 @@ SETUP_SCHEMA = vol.Schema(
     }
 )
 
+# Shown in advanced mode, e.g. to run the flow against devtools.standin
+ADVANCED_SETUP_SCHEMA = SETUP_SCHEMA.extend(
+    {
+        vol.Optional(CONF_AUTH_URL, default=AUTH_URL): selector.TextSelector(),
+        vol.Optional(CONF_API_URL, default=API_URL): selector.TextSelector(),
+    }
+)
+
 SELECT_NAME_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_NAME): selector.TextSelector(),
@@ -44,7 +60,11 @@ class VolvoaaosConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     refresh_token: str = None
     vin: str = None
     name: str = None
-    all_recharge_available: bool = None
+    vins: list[str] = None
+    selected_vins: list[str] = None
+    vehicle_data: dict[str, GetVehicleData | None] = None
+    auth_url: str = AUTH_URL
+    api_url: str = API_URL
 
     def __init__(self) -> None:
         """Initialize Volvo AAOS flow."""
@@ -61,9 +81,11 @@ class VolvoaaosConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             self.username = user_input[CONF_USERNAME]
             self.password = user_input[CONF_PASSWORD]
             self.vcc_api_key = user_input[CONF_VCC_API_KEY]
+            self.auth_url = user_input.get(CONF_AUTH_URL, AUTH_URL)
+            self.api_url = user_input.get(CONF_API_URL, API_URL)
             session = async_get_clientsession(self.hass)
 
-            auth = Auth(session=session)
+            auth = Auth(session=session, auth_url=self.auth_url)
 
             response = await auth.authenticate(
                 username=self.username, password=self.password
@@ -75,37 +97,52 @@ class VolvoaaosConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             return await self.async_step_select_vin()
 
         return self.async_show_form(
-            step_id="user", data_schema=SETUP_SCHEMA, errors=errors
+            step_id="user", data_schema=ADVANCED_SETUP_SCHEMA if self.show_advanced_options else SETUP_SCHEMA, errors=errors
         )
 
     async def async_step_select_vin(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Select which car to setup."""
+        """Select which cars to setup, one or several at once."""
 
         errors = {}
 
         if user_input is not None:
-            self.vin = user_input[CONF_VIN]
-
-
-
-            return await self.async_step_set_name()
+            selected = user_input[CONF_VIN]
+            if not selected:
+                errors[CONF_VIN] = "no_vehicle"
+            elif CONF_FLEET in selected:
+                self.vin = CONF_FLEET
+                self.selected_vins = self._unconfigured_vins()
+                return await self.async_step_set_name()
+            else:
+                self.selected_vins = selected
+                self.vin = selected[0] if len(selected) == 1 else CONF_FLEET
+                return await self.async_step_set_name()
 
         session = async_get_clientsession(self.hass)
 
-        connected_vehicle = ConnectedVehicle(session=session, access_token=self.access_token, vcc_api_key=self.vcc_api_key)
+        if self.vins is None:
+            connected_vehicle = ConnectedVehicle(session=session, access_token=self.access_token, vcc_api_key=self.vcc_api_key, api_url=self.api_url)
 
-        response = await connected_vehicle.list_vehicles()
+            response = await connected_vehicle.list_vehicles()
 
-        list_of_vins = []
-        for item in response.data:
-            list_of_vins.append(item.vin)
+            self.vins = [item.vin for item in response.data]
+            self.vehicle_data = await async_fetch_vehicle_data(session, self.access_token, self.vcc_api_key, self.vins, self.api_url)
 
+        available = self._unconfigured_vins()
+        if not available:
+            return self.async_abort(reason="already_configured")
+
+        options = [selector.SelectOptionDict(value=vin, label=vehicle_label(vin, self.vehicle_data.get(vin))) for vin in available]
+        if len(available) > 1:
+            options.append(selector.SelectOptionDict(value=CONF_FLEET, label="All vehicles (fleet mode)"))
 
         SELECT_VIN_SCHEMA = vol.Schema(
             {
-                vol.Required(CONF_VIN): selector.SelectSelector(selector.SelectSelectorConfig(options=list_of_vins))
+                vol.Required(CONF_VIN): selector.SelectSelector(
+                    selector.SelectSelectorConfig(options=options, multiple=True)
+                )
             }
         )
         return self.async_show_form(
@@ -114,26 +151,22 @@ class VolvoaaosConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_set_name(self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Set name for car"""
+        """Set name for car, or for the entry of several cars."""
 
         errors = {}
 
         if user_input is not None:
             self.name = user_input[CONF_NAME]
 
-            session = async_get_clientsession(self.hass)
-            energy = Energy(session=session, access_token=self.access_token, vcc_api_key=self.vcc_api_key, vin=self.vin)
+            # Another flow may have added one of the cars meanwhile
+            if set(self.selected_vins) - set(self._unconfigured_vins()):
+                return self.async_abort(reason="already_configured")
 
-            try:
-                response = await energy.get_recharge_status()
-                self.all_recharge_available = True
-                LOGGER.debug(response)
-                LOGGER.debug('All recharge status endpoints is available')
-            except Exception as e:
-                self.all_recharge_available = False
-                LOGGER.debug('Can NOT get all recharge endpoints. Battery percentage is available')
-                LOGGER.debug(e)
+            session = async_get_clientsession(self.hass)
+            capabilities = await async_probe_vehicles(session, self.access_token, self.vcc_api_key, self.selected_vins, self.api_url)
 
+            if self.vin == CONF_FLEET:
+                return await self._async_create_fleet_entry(capabilities)
 
             data = {
                 CONF_USERNAME: self.username,
@@ -143,13 +176,122 @@ class VolvoaaosConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_REFRESH_TOKEN: self.refresh_token,
                 CONF_VIN:self.vin,
                 CONF_NAME: self.name,
-                CONF_ALL_RECHARGE_AVAILABLE: self.all_recharge_available
+                CONF_ALL_RECHARGE_AVAILABLE: capabilities[self.vin].get("get_recharge_status", False),
+                CONF_CAPABILITIES: capabilities[self.vin],
+                **self._url_data(),
             }
 
             await self.async_set_unique_id(self.vin)
+            self._abort_if_unique_id_configured()
 
             return self.async_create_entry(title=f"Volvo - {self.name}", data=data)
 
+        if self.vin == CONF_FLEET:
+            suggested_name = "Fleet"
+        else:
+            suggested_name = vehicle_names([self.vin], self.vehicle_data)[self.vin]
+
         return self.async_show_form(
-            step_id="set_name", data_schema=SELECT_NAME_SCHEMA, errors=errors
-        )
\ No newline at end of file
+            step_id="set_name",
+            data_schema=self.add_suggested_values_to_schema(SELECT_NAME_SCHEMA, {CONF_NAME: suggested_name}),
+            errors=errors,
+        )
+
+    async def _async_create_fleet_entry(self, capabilities: dict[str, dict[str, bool]]) -> FlowResult:
+        """Create one entry serving the selected VINs of the Volvo ID.
+
+        With every VIN selected through fleet mode, cars added to the account
+        later are picked up too.
+        """
+
+        every_vehicle = set(self.selected_vins) == set(self.vins)
+        names = vehicle_names(self.selected_vins, self.vehicle_data)
+        data = {
+            CONF_USERNAME: self.username,
+            CONF_PASSWORD: self.password,
+            CONF_VCC_API_KEY: self.vcc_api_key,
+            CONF_ACCESS_TOKEN: self.access_token,
+            CONF_REFRESH_TOKEN: self.refresh_token,
+            CONF_NAME: self.name,
+            CONF_FLEET: True,
+            CONF_DISCOVER: every_vehicle,
+            CONF_VEHICLES: {
+                vin: {
+                    CONF_NAME: names[vin],
+                    CONF_ALL_RECHARGE_AVAILABLE: capabilities[vin].get("get_recharge_status", False),
+                    CONF_CAPABILITIES: capabilities[vin],
+                }
+                for vin in self.selected_vins
+            },
+            **self._url_data(),
+        }
+
+        if every_vehicle:
+            await self.async_set_unique_id(f"{CONF_FLEET}_{self.username}")
+        else:
+            await self.async_set_unique_id(f"{CONF_FLEET}_{self.username}_{'_'.join(sorted(self.selected_vins))}")
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(title=f"Volvo - {self.name}", data=data)
+
+    def _unconfigured_vins(self) -> list[str]:
+        """Return the VINs of the Volvo ID that no entry serves yet."""
+
+        configured = {vin for entry in self._async_current_entries(include_ignore=False) for vin in vehicles_from_entry(entry)}
+        return [vin for vin in self.vins if vin not in configured]
+
+    def _url_data(self) -> dict[str, str]:
+        """Return the entry data of the URLs that differ from the Volvo ones."""
+
+        urls = {CONF_AUTH_URL: (self.auth_url, AUTH_URL), CONF_API_URL: (self.api_url, API_URL)}
+        return {key: url for key, (url, default) in urls.items() if url != default}
+
+
+async def async_fetch_vehicle_data(session: ClientSession, access_token: str, vcc_api_key: str, vins: list[str], api_url: str = API_URL) -> dict[str, GetVehicleData | None]:
+    """Fetch the details of every VIN concurrently, None where it failed."""
+
+    semaphore = asyncio.Semaphore(SNAPSHOT_CONCURRENCY)
+
+    async def fetch(vin: str) -> GetVehicleData | None:
+        async with semaphore:
+            try:
+                response = await ConnectedVehicle(session=session, access_token=access_token, vcc_api_key=vcc_api_key, vin=vin, api_url=api_url).get_vehicle_data()
+            except Exception as e:
+                LOGGER.debug('Could not get details of %s: %s', vin, e)
+                return None
+        return response.data
+
+    return dict(zip(vins, await asyncio.gather(*(fetch(vin) for vin in vins))))
+
+
+async def async_probe_vehicles(session: ClientSession, access_token: str, vcc_api_key: str, vins: list[str], api_url: str = API_URL) -> dict[str, dict[str, bool]]:
+    """Probe the endpoint capabilities of every VIN concurrently."""
+
+    matrices = await asyncio.gather(
+        *(
+            async_probe_capabilities(
+                [client(session=session, access_token=access_token, vcc_api_key=vcc_api_key, vin=vin, api_url=api_url) for client in (Energy, ConnectedVehicle, Location)]
+            )
+            for vin in vins
+        )
+    )
+    return dict(zip(vins, matrices))
+
+
+def vehicle_label(vin: str, vehicle_data: GetVehicleData | None) -> str:
+    """Return the selector label of a VIN, e.g. "XC40 2023 Sage Green (YV1...)"."""
+
+    if vehicle_data is None:
+        return vin
+    return f"{vehicle_data.descriptions.model} {vehicle_data.model_year} {vehicle_data.external_colour} ({vin})"
+
+
+def vehicle_names(vins: list[str], vehicle_data: dict[str, GetVehicleData | None]) -> dict[str, str]:
+    """Return a name per VIN like "XC40 2023", the VIN's last digits added to names taken twice."""
+
+    names = {
+        vin: model_name(data) if (data := vehicle_data.get(vin)) is not None else vin
+        for vin in vins
+    }
+    taken = Counter(names.values())
+    return {vin: f"{name} {vin[-4:]}" if taken[name] > 1 else name for vin, name in names.items()}
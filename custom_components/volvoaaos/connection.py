@@ -0,0 +1,149 @@
+"""Pooled connections to the Volvo API hosts."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, fields
+from ssl import SSLContext
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector, TraceConfig
+
+from .const import LOGGER
+from .metrics import LatencyHistogram
+
+
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """Limits and lifetimes of the connection pool.
+
+    keepalive_timeout outlasts the gap between two polls of a vehicle, so
+    polls reuse the connection instead of paying a new TLS handshake.
+    """
+
+    # Connections in the pool at once, and to one host
+    limit: int = 20
+    limit_per_host: int = 10
+    # Seconds an idle connection is kept open
+    keepalive_timeout: float = 75.0
+    # Seconds a resolved address is reused
+    dns_ttl: int = 300
+    # Connections opened to the API host at setup, about one poll's worth
+    prewarm: int = 4
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any] | None) -> ConnectionSettings:
+        """Return settings from a dict, defaults for missing and unknown keys ignored."""
+
+        names = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in (values or {}).items() if key in names})
+
+
+class ConnectionMetrics:
+    """Connection reuse, pool waits and DNS cache use of a session, from aiohttp trace hooks."""
+
+    def __init__(self) -> None:
+        """Initialize counters and trace hooks."""
+
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        self.dns_hits = 0
+        self.dns_misses = 0
+        self.prewarmed = 0
+        # Time to open a connection, TCP and TLS, in ms
+        self.connect = LatencyHistogram()
+        self.trace_config = TraceConfig()
+        self.trace_config.on_connection_create_start.append(self._on_create_start)
+        self.trace_config.on_connection_create_end.append(self._on_create_end)
+        self.trace_config.on_connection_reuseconn.append(self._on_reuse)
+        self.trace_config.on_connection_queued_start.append(self._on_queued)
+        self.trace_config.on_dns_cache_hit.append(self._on_dns_hit)
+        self.trace_config.on_dns_cache_miss.append(self._on_dns_miss)
+
+    async def _on_create_start(self, _session, context, _params) -> None:
+        context.connect_start = asyncio.get_running_loop().time()
+
+    async def _on_create_end(self, _session, context, _params) -> None:
+        self.created += 1
+        self.connect.add((asyncio.get_running_loop().time() - context.connect_start) * 1000)
+
+    async def _on_reuse(self, _session, _context, _params) -> None:
+        self.reused += 1
+
+    async def _on_queued(self, _session, _context, _params) -> None:
+        self.queued += 1
+
+    async def _on_dns_hit(self, _session, _context, _params) -> None:
+        self.dns_hits += 1
+
+    async def _on_dns_miss(self, _session, _context, _params) -> None:
+        self.dns_misses += 1
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        """Return the share of requests sent on an open connection."""
+
+        total = self.created + self.reused
+        return self.reused / total if total else None
+
+    def as_dict(self) -> dict:
+        """Return the counters for diagnostics."""
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_ratio": self.reuse_ratio,
+            "queued": self.queued,
+            "dns_cache_hits": self.dns_hits,
+            "dns_cache_misses": self.dns_misses,
+            "prewarmed": self.prewarmed,
+            "connect_latency": self.connect.as_dict(),
+        }
+
+
+def create_session(
+    settings: ConnectionSettings | None = None,
+    metrics: ConnectionMetrics | None = None,
+    ssl: SSLContext | bool = True,
+    headers: dict[str, str] | None = None,
+) -> ClientSession:
+    """Return a session with its own pooled connector for the Volvo hosts.
+
+    The caller owns the session and closes it.
+    """
+
+    settings = settings or ConnectionSettings()
+    connector = TCPConnector(
+        limit=settings.limit,
+        limit_per_host=settings.limit_per_host,
+        keepalive_timeout=settings.keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=settings.dns_ttl,
+        ssl=ssl,
+    )
+    return ClientSession(
+        connector=connector,
+        headers=headers,
+        trace_configs=[metrics.trace_config] if metrics is not None else None,
+    )
+
+
+async def async_prewarm(session: ClientSession, url: str, connections: int, metrics: ConnectionMetrics | None = None) -> int:
+    """Open up to `connections` keep-alive connections to the host of url, return how many opened.
+
+    Sends concurrent HEAD requests to the URL and ignores their status,
+    only the connection and its TLS session matter.
+    """
+
+    async def open_connection() -> bool:
+        try:
+            async with session.head(url, allow_redirects=False, timeout=ClientTimeout(total=10)):
+                return True
+        except (ClientError, asyncio.TimeoutError) as err:
+            LOGGER.debug("Could not pre-warm a connection to %s: %s", url, err)
+            return False
+
+    opened = sum(await asyncio.gather(*(open_connection() for _ in range(connections))))
+    if metrics is not None:
+        metrics.prewarmed += opened
+    return opened
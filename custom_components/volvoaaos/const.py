@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import logging
 
+from datetime import timedelta
+
 ### Home Assistant constants ###
 DOMAIN = "volvoaaos"
 
@@ -13,8 +15,21 @@ CONF_VCC_API_KEY = "vcc_api_key"
 CONF_VIN = "vin"
 CONF_REFRESH_TOKEN = "refresh_token"
 CONF_ALL_RECHARGE_AVAILABLE = "all_recharge_available"
+CONF_FLEET = "fleet"
+CONF_VEHICLES = "vehicles"
+CONF_CAPABILITIES = "capabilities"
+# False for fleet entries of selected VINs, which do not pick up new cars
+CONF_DISCOVER = "discover"
+# Set by the config flow in advanced mode, lets development setups point at devtools/standin.py
+CONF_API_URL = "api_url"
+CONF_AUTH_URL = "auth_url"
+# Optional ConnectionSettings overrides, not set by the config flow either
+CONF_CONNECTION = "connection"
+
+POLL_INTERVAL = timedelta(seconds=60)
 
 
 ### Volvo constants ###
 AUTH_URL = "https://volvoid.eu.volvocars.com/as/token.oauth2"
+API_URL = "https://api.volvocars.com"
 REFRESH_TOKEN = "refresh_token"
@@ -1,91 +1,418 @@
-"""Data update coordinator for Volvo AAOS"""
+"""Data update coordinator for Volvo AAOS."""
 
-from dataclasses import dataclass
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import MISSING, dataclass, fields
+from typing import Any
 
-from datetime import timedelta, datetime
+from aiohttp.client import ClientSession
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ACCESS_TOKEN
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, LOGGER, CONF_VCC_API_KEY, CONF_VIN, CONF_REFRESH_TOKEN, CONF_ALL_RECHARGE_AVAILABLE
+from .const import DOMAIN, LOGGER, CONF_VCC_API_KEY, CONF_FLEET, CONF_API_URL, API_URL
 
-from .models import RechargeModel, ConnectedVehicleModel, GetDoorModel, GetWindowModel, LocationModel, BatteryChargeLevelModel
-from .volvo import Auth, Energy, ConnectedVehicle, Location
+from .models import (
+    RechargeModel,
+    GetDoorModel,
+    GetWindowModel,
+    LocationModel,
+    BatteryChargeLevelModel,
+    BrakeModel,
+    DiagnosticsModel,
+    EngineModel,
+    OdometerModel,
+    TyreModel,
+    WarningsModel,
+)
+from .cache import ResponseCache
+from .command_queue import CommandQueue
+from .charging_history import ChargingHistory, history_dir
+from .compact import VehicleSnapshot, model_attributes
+from .location_history import LocationHistory
+from .metrics import VolvoMetrics
+from .planner import FetchPlanner
+from .polling import COMMAND_FOLLOW_UP_DEADLINE, COMMAND_FOLLOW_UP_DELAYS, COMMAND_FOLLOW_UPS, AdaptivePollPolicy, CommandFollowUp
+from .resilience import CircuitOpenError
+from .token_manager import TokenManager
+from .vehicle_info import VehicleInfo
+from .volvo import Energy, ConnectedVehicle, Location
+
+# Listener context of entities showing metrics instead of VolvoData
+METRICS_KEY = ("metrics", None)
 
 @dataclass
 class VolvoData:
-    """Volvo data stored in DataUpdateCoordinator"""
+    """Volvo data stored in DataUpdateCoordinator.
+
+    The coordinator holds it compacted into a VehicleSnapshot with the same
+    attributes, see compact_volvo_data.
+    """
 
     energy: RechargeModel
     connected_vehicle_door_status: GetDoorModel
     connected_vehicle_window_status: GetWindowModel
     location: LocationModel
+    # Low-frequency tier, None until fetched or where the vehicle has no such endpoint
+    connected_vehicle_odometer: OdometerModel | None = None
+    connected_vehicle_tyre_status: TyreModel | None = None
+    connected_vehicle_brake_status: BrakeModel | None = None
+    connected_vehicle_diagnostics: DiagnosticsModel | None = None
+    connected_vehicle_engine_diagnostics: EngineModel | None = None
+    connected_vehicle_warnings: WarningsModel | None = None
+
+# VolvoData fields fetched together with ConnectedVehicle.get_snapshot, by snapshot field
+SNAPSHOT_KEYS = {
+    "connected_vehicle_odometer": "odometer",
+    "connected_vehicle_tyre_status": "tyre_status",
+    "connected_vehicle_brake_status": "brake_status",
+    "connected_vehicle_diagnostics": "diagnostics",
+    "connected_vehicle_engine_diagnostics": "engine_diagnostics",
+    "connected_vehicle_warnings": "warnings",
+}
+
+# Endpoints behind each VolvoData field, the field is supported if any of them is
+DATA_ENDPOINTS = {
+    "energy": ("get_recharge_status", "get_battery_charge_level"),
+    "connected_vehicle_door_status": ("get_door_status",),
+    "connected_vehicle_window_status": ("get_window_status",),
+    "location": ("get_location",),
+    **{key: (f"get_{name}",) for key, name in SNAPSHOT_KEYS.items()},
+}
 
 class VolvoUpdateCoordinator(DataUpdateCoordinator[VolvoData]):
-    """Class to manage fetching data for Volvo AAOS."""
+    """Class to manage fetching data for one vehicle of a Volvo AAOS account."""
 
     config_entry = ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize coordinator."""
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, session: ClientSession, token_manager: TokenManager, vin: str, vehicle_name: str, all_recharge_available: bool, cache: ResponseCache | None = None, capabilities: dict[str, bool] | None = None) -> None:
+        """Initialize coordinator.
+
+        capabilities is the probed {endpoint name: supported} of the vehicle,
+        endpoints missing from it count as supported.
+        """
 
         self.hass = hass
         self.config_entry = entry
-        self.listeners = []
-        self.session = async_get_clientsession(hass)
-        self.energy = Energy(session=self.session)
-        self.auth = Auth(session=self.session)
-        self.connected_vehicle = ConnectedVehicle(session=self.session)
-        self.location = Location(session=self.session)
-
-        self.listeners.append(
-            async_track_time_interval(self.hass, self.update_coordinator_data, timedelta(seconds=60))
-        )
-
-        self.listeners.append(
-            async_track_time_interval(self.hass, self.update_access_token, timedelta(minutes=7))
-        )
+        self.session = session
+        self.vin = vin
+        self.vehicle_name = vehicle_name
+        self.capabilities = capabilities or {}
+        self.all_recharge_available = self.capabilities.get("get_recharge_status", all_recharge_available)
+        self.token_manager = token_manager
+        vcc_api_key = entry.data[CONF_VCC_API_KEY]
+        api_url = entry.data.get(CONF_API_URL, API_URL)
+        self.metrics = VolvoMetrics()
+        self.energy = Energy(session=self.session, token_manager=token_manager, cache=cache, vcc_api_key=vcc_api_key, vin=vin, api_url=api_url, metrics=self.metrics)
+        self.connected_vehicle = ConnectedVehicle(session=self.session, token_manager=token_manager, cache=cache, vcc_api_key=vcc_api_key, vin=vin, api_url=api_url, metrics=self.metrics)
+        self.location = Location(session=self.session, token_manager=token_manager, cache=cache, vcc_api_key=vcc_api_key, vin=vin, api_url=api_url, metrics=self.metrics)
+        self.poll_policy = AdaptivePollPolicy()
+        self.planner = FetchPlanner()
+        self.commands = CommandQueue()
+        self.location_history = LocationHistory()
+        self.charging_history = ChargingHistory(hass, os.path.join(history_dir(hass, entry.entry_id), f"{vin}.bin"))
+        # Running command follow-ups by VolvoData field
+        self._follow_ups: dict[str, asyncio.Task] = {}
+        # True while data is a snapshot restored from disk
+        self.stale = False
+        # Cached metadata and images, set by the fleet
+        self.vehicle_info: VehicleInfo | None = None
 
         super().__init__(
             hass,
             LOGGER,
-            name=f"{DOMAIN}",
+            name=f"{DOMAIN}_{vin}",
             update_interval=None,
             update_method=None
         )
 
-    def set_tokens(self):
-        self.energy.access_token = self.config_entry.data[CONF_ACCESS_TOKEN]
-        self.energy.vcc_api_key = self.config_entry.data[CONF_VCC_API_KEY]
-        self.energy.vin = self.config_entry.data[CONF_VIN]
-        self.connected_vehicle.access_token = self.config_entry.data[CONF_ACCESS_TOKEN]
-        self.connected_vehicle.vcc_api_key = self.config_entry.data[CONF_VCC_API_KEY]
-        self.connected_vehicle.vin = self.config_entry.data[CONF_VIN]
-        self.location.access_token = self.config_entry.data[CONF_ACCESS_TOKEN]
-        self.location.vcc_api_key = self.config_entry.data[CONF_VCC_API_KEY]
-        self.location.vin = self.config_entry.data[CONF_VIN]
+    @property
+    def fleet_mode(self) -> bool:
+        """Return True if the vehicle belongs to a fleet config entry."""
+        return self.config_entry.data.get(CONF_FLEET, False)
+
+    @property
+    def api_available(self) -> bool:
+        """Return False while the circuit breaker of the API host is open."""
+        return self.connected_vehicle.breaker(self.connected_vehicle.api_url).available
+
+    def supports(self, data_key: tuple[str, str | None] | None) -> bool:
+        """Return True if the vehicle has the endpoint behind an entity's (field, attribute).
+
+        Without the full recharge status the energy data only holds the
+        battery charge level.
+        """
+        if not data_key:
+            return True
+        key, attribute = data_key
+        if key == "energy" and attribute is not None and not self.all_recharge_available and attribute != "battery_charge_level":
+            return False
+        return any(self.capabilities.get(name, True) for name in DATA_ENDPOINTS.get(key, ()))
+
+    def unsupported_keys(self) -> set[str]:
+        """Return the VolvoData fields none of whose endpoints the vehicle has."""
+        return {key for key in DATA_ENDPOINTS if not self.supports((key, None))}
+
+    def skipped_keys(self) -> set[str]:
+        """Return the VolvoData fields not polled: unsupported or read by no enabled entity."""
+        return self.unsupported_keys() | (DATA_ENDPOINTS.keys() - self.planner.plan(DATA_ENDPOINTS))
+
+    @callback
+    def async_add_demand(self, data_key: tuple[str, str | None] | None) -> CALLBACK_TYPE:
+        """Poll the VolvoData field of an entity's data_key until the returned callable is called.
+
+        A field not fetched yet is made due right away.
+        """
+        if not data_key or data_key[0] not in DATA_ENDPOINTS:
+            return lambda: None
+        key = data_key[0]
+        if self.data is not None and getattr(self.data, key) is None and key in self.poll_policy.next_due:
+            self.poll_policy.next_due[key] = 0.0
+        return self.planner.add(key)
+
+    def endpoint_calls(self) -> dict[str, Callable[[], Awaitable[Any]]]:
+        """Return the per-poll endpoint calls keyed by VolvoData field, unsupported ones left out."""
+        calls = {
+            "energy": lambda: update_energy(energy=self.energy, all_recharge_available=self.all_recharge_available),
+            "connected_vehicle_door_status": self.connected_vehicle.get_door_status,
+            "connected_vehicle_window_status": self.connected_vehicle.get_window_status,
+            "location": lambda: update_location(self.location),
+            **{
+                key: getattr(self.connected_vehicle, f"get_{name}")
+                for key, name in SNAPSHOT_KEYS.items()
+            },
+        }
+        for key in self.unsupported_keys():
+            del calls[key]
+        return calls
+
+    async def fetch_snapshot(self, only_due: bool = False) -> tuple[VolvoData, dict[str, Exception]]:
+        """Fetch endpoints and merge them over the current data.
+
+        Only the fields the planner has demand for are fetched, the others
+        are None. With only_due, endpoints the poll policy does not consider
+        due are skipped and keep their current value. The low-frequency SNAPSHOT_KEYS
+        are only fetched when due, in one bounded get_snapshot next to the
+        other calls. Their failures are not returned, they keep their value
+        and wait for their next due time like a success, so an endpoint the
+        vehicle lacks is not retried every poll.
+        Raises ValueError if an endpoint failed and there is no previous value.
+        """
+        skipped = self.skipped_keys()
+        calls = {key: call for key, call in self.endpoint_calls().items() if key not in skipped}
+        due = self.poll_policy.due(calls)
+        calls = {key: call for key, call in calls.items() if key in due or not (only_due or key in SNAPSHOT_KEYS)}
+        if not calls and self.data is not None:
+            return self.data, {}
+
+        bulk = {key: SNAPSHOT_KEYS[key] for key in calls if key in SNAPSHOT_KEYS}
+        calls = {key: call for key, call in calls.items() if key not in bulk}
+
+        previous = self.data
+        start = time.monotonic()
+        if bulk:
+            (results, errors), snapshot = await asyncio.gather(
+                fetch_endpoints(calls), self.connected_vehicle.get_snapshot(bulk.values())
+            )
+            for key, name in bulk.items():
+                if (err := snapshot.errors.get(name)) is None:
+                    results[key] = getattr(snapshot, name)
+                else:
+                    LOGGER.debug("Fetching %s for %s failed, keeping previous value: %s", key, self.vin, err)
+        else:
+            results, errors = await fetch_endpoints(calls)
+        self.metrics.record_poll((time.monotonic() - start) * 1000)
+        self.async_update_metrics_listeners()
+        data = merge_volvo_data(previous, results, skipped)
+        self.poll_policy.record(previous, data, [*results, *bulk])
+        return data, errors
+
+    async def update_coordinator_data(self, datetime, only_due: bool = False):
+        """Poll the Volvo API and publish the snapshot, only the due endpoints if only_due."""
+        try:
+            data, errors = await self.fetch_snapshot(only_due=only_due)
+        except ValueError as err:
+            self.async_set_update_error(err)
+            return
+
+        if data is self.data:
+            return
+
+        if open_circuit := next((err for err in errors.values() if isinstance(err, CircuitOpenError)), None):
+            # The API host is down, go unavailable instead of showing old values
+            self.async_set_update_error(open_circuit)
+            return
+
+        for key, err in errors.items():
+            LOGGER.warning("Fetching %s for %s failed, keeping previous value: %s", key, self.vin, err)
+
+        self.async_set_changed_data(data)
+
+    async def async_send_command(self, command: str, send: Callable[[ConnectedVehicle], Awaitable[Any]]) -> asyncio.Task | None:
+        """Send a command through the vehicle's queue and follow it up in the background.
+
+        Only the endpoint the command changes is re-polled, in short steps
+        until the car reports the expected state or the deadline passes.
+        Returns the follow-up task, which results in True once confirmed.
+        Callers coalesced into one command share its follow-up. Raises
+        CommandSupersededError if a conflicting command replaced it in the queue.
+        """
+
+        return await self.commands.async_run(command, lambda: self._async_send_and_follow_up(command, send))
+
+    async def _async_send_and_follow_up(self, command: str, send: Callable[[ConnectedVehicle], Awaitable[Any]]) -> asyncio.Task | None:
+        start = time.monotonic()
+        await send(self.connected_vehicle)
+
+        follow_up = COMMAND_FOLLOW_UPS.get(command)
+        if follow_up is None or follow_up.key in self.unsupported_keys():
+            await self.update_coordinator_data(datetime=None)
+            return None
+
+        if (running := self._follow_ups.get(follow_up.key)) is not None:
+            running.cancel()
+        task = self._follow_ups[follow_up.key] = self.config_entry.async_create_background_task(
+            self.hass, self._async_follow_up(command, follow_up, start), f"{self.name} {command} follow-up"
+        )
+        task.add_done_callback(lambda _: self._follow_ups.get(follow_up.key) is task and self._follow_ups.pop(follow_up.key))
+        return task
+
+    async def _async_follow_up(self, command: str, follow_up: CommandFollowUp, start: float) -> bool:
+        call = self.endpoint_calls()[follow_up.key]
+        for delay in COMMAND_FOLLOW_UP_DELAYS:
+            if time.monotonic() + delay - start > COMMAND_FOLLOW_UP_DEADLINE:
+                break
+            await asyncio.sleep(delay)
+
+            if self.connected_vehicle.cache is not None:
+                # Cached bodies would hide the change until their TTL runs out
+                self.connected_vehicle.cache.invalidate_command(self.vin, command)
+            try:
+                result = await call()
+            except Exception as err:
+                LOGGER.debug("Follow-up of %s for %s failed: %s", command, self.vin, err)
+                continue
+
+            data = merge_volvo_data(self.data, {follow_up.key: result})
+            self.poll_policy.record(self.data, data, [follow_up.key])
+            self.async_set_changed_data(data)
+            if follow_up.confirmed is None or follow_up.confirmed(data):
+                self.metrics.record_command(command, (time.monotonic() - start) * 1000)
+                self.async_update_metrics_listeners()
+                return True
+
+        LOGGER.warning("Volvo did not confirm %s for %s within %s s", command, self.vin, COMMAND_FOLLOW_UP_DEADLINE)
+        self.metrics.record_command(command, None)
+        self.async_update_metrics_listeners()
+        return False
 
     @callback
-    async def update_coordinator_data(self, datetime):
-        self.set_tokens()
-        energy_data = await update_energy(energy=self.energy, all_recharge_available=self.config_entry.data[CONF_ALL_RECHARGE_AVAILABLE])
-        connected_vehicle = await update_connected_vehicle(self.connected_vehicle)
-        location = await update_location(self.location)
-        self.async_set_updated_data(VolvoData(energy=energy_data, connected_vehicle_door_status=connected_vehicle['door_status'], connected_vehicle_window_status=connected_vehicle['window_status'], location=location))
+    def async_update_metrics_listeners(self) -> None:
+        """Notify the entities showing metrics, they change on every poll."""
+
+        for update_callback, context in list(self._listeners.values()):
+            if context == METRICS_KEY:
+                update_callback()
 
     @callback
-    async def update_access_token(self, datetime):
-        auth_update = await self.auth.reauth(refresh_token=self.config_entry.data[CONF_REFRESH_TOKEN])
-        new_data = {**self.config_entry.data, CONF_ACCESS_TOKEN: auth_update.access_token, CONF_REFRESH_TOKEN:auth_update.refresh_token}
-        self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
-        LOGGER.debug("Access and refresh token updated")
+    def async_set_changed_data(self, data: VolvoData) -> None:
+        """Store data and notify only the entities whose part of it changed.
+
+        Nothing is written when the snapshot equals the previous one. After a
+        failed update or a restored snapshot every entity is notified, as
+        availability or staleness changes. Live positions and battery levels
+        go to the location and charging histories.
+        """
+
+        self.location_history.add_location(data.location)
+        self.charging_history.add_energy(data.energy)
+
+        if self.data is None or not self.last_update_success or self.stale:
+            self.stale = False
+            self.async_set_updated_data(data)
+            return
+
+        changed = changed_data_keys(self.data, data)
+        self.data = data
+        if not changed:
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed:
+                update_callback()
+
 
+def changed_data_keys(previous: VolvoData, data: VolvoData) -> set[tuple[str, str | None]]:
+    """Return the entity contexts affected by the difference of two snapshots.
+
+    A changed field yields (field, None) plus (field, attribute) for every
+    attribute of its data model that differs.
+    """
+
+    changed = set()
+    for item in fields(VolvoData):
+        old = getattr(previous, item.name)
+        new = getattr(data, item.name)
+        if old == new:
+            continue
+
+        changed.add((item.name, None))
+        old_values = model_attributes(getattr(old, "data", None))
+        for attribute, value in model_attributes(getattr(new, "data", None)).items():
+            if old_values.get(attribute) != value:
+                changed.add((item.name, attribute))
+
+    return changed
+
+async def fetch_endpoints(calls: dict[str, Callable[[], Awaitable[Any]]]) -> tuple[dict[str, Any], dict[str, Exception]]:
+    """Fire all endpoint calls at once and split results from failures.
+
+    Returns when the slowest call has finished. A failing call never cancels
+    the others.
+    """
+    responses = await asyncio.gather(*(call() for call in calls.values()), return_exceptions=True)
+
+    results = {}
+    errors = {}
+    for key, response in zip(calls, responses):
+        if isinstance(response, Exception):
+            errors[key] = response
+        else:
+            results[key] = response
+
+    return results, errors
+
+def compact_volvo_data(data: VolvoData | VehicleSnapshot) -> VehicleSnapshot:
+    """Return VolvoData as a compact snapshot, snapshots unchanged."""
+    if isinstance(data, VehicleSnapshot):
+        return data
+    return VehicleSnapshot({item.name: getattr(data, item.name) for item in fields(VolvoData)})
+
+def merge_volvo_data(previous: VolvoData | VehicleSnapshot | None, results: dict[str, Any], skipped: Iterable[str] = ()) -> VehicleSnapshot:
+    """Build the compact snapshot of a poll, keeping previous values for failed endpoints.
+
+    Fields with a default take it when never fetched, skipped fields are None.
+    """
+    values = {}
+    for item in fields(VolvoData):
+        if item.name in skipped:
+            values[item.name] = None
+        elif item.name in results:
+            values[item.name] = results[item.name]
+        elif previous is not None:
+            values[item.name] = getattr(previous, item.name)
+        elif item.default is not MISSING:
+            values[item.name] = item.default
+        else:
+            raise ValueError(f"No data available for {item.name}")
+
+    return VehicleSnapshot(values)
 
 async def update_energy(energy: Energy, all_recharge_available: bool) -> RechargeModel | BatteryChargeLevelModel:
+    """Return the recharge status if the car supports it, else the battery charge level."""
     energy_call = energy
     if all_recharge_available is True:
         energy_data = await energy_call.get_recharge_status()
@@ -94,14 +421,8 @@ async def update_energy(energy: Energy, all_recharge_available: bool) -> Recharg
 
     return energy_data
 
-async def update_connected_vehicle(connected_vehicle: ConnectedVehicle) -> ConnectedVehicleModel:
-    connected_vehicle_call = connected_vehicle
-    door_status = await connected_vehicle_call.get_door_status()
-    window_status = await connected_vehicle_call.get_window_status()
-
-    return {'door_status': door_status, 'window_status': window_status}
-
 async def update_location(location: Location) -> LocationModel:
+    """Return the location of the car."""
     location_call = location
     location_data = await location_call.get_location()
-    return location_data
\ No newline at end of file
+    return location_data
@@ -0,0 +1,86 @@
+"""Decode Volvo AAOS response bodies straight from bytes into models."""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import Any
+
+import pydantic
+
+from .const import LOGGER
+
+PYDANTIC_V2 = pydantic.VERSION.startswith("2.")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKEND_PYDANTIC = "pydantic"
+BACKEND_ORJSON = "orjson"
+BACKEND_MSGSPEC = "msgspec"
+
+# orjson ships with Home Assistant and parses these small bodies faster than
+# pydantic-core, see devtools/bench_decode.py
+_backend = BACKEND_ORJSON if orjson is not None else BACKEND_PYDANTIC
+
+
+def available_backends() -> list[str]:
+    """Return the JSON backends usable in this environment."""
+
+    backends = [BACKEND_PYDANTIC]
+    if orjson is not None:
+        backends.append(BACKEND_ORJSON)
+    if msgspec is not None:
+        backends.append(BACKEND_MSGSPEC)
+    return backends
+
+
+def set_json_backend(backend: str) -> None:
+    """Select the JSON parser used before validation.
+
+    pydantic validates the bytes in one pass in pydantic-core. orjson and
+    msgspec parse to Python objects first and validate those.
+    """
+
+    global _backend
+    if backend not in available_backends():
+        LOGGER.warning("JSON backend %s is not installed, keeping %s", backend, _backend)
+        return
+    _backend = backend
+
+
+@cache
+def _adapter(model: Any) -> pydantic.TypeAdapter:
+    """Return a TypeAdapter built once per type."""
+    return pydantic.TypeAdapter(model)
+
+
+def decode_model(model: Any, body: bytes) -> Any:
+    """Validate a response body into model without an intermediate dict.
+
+    model can be a BaseModel subclass or any type pydantic accepts, e.g.
+    list[LocationModel].
+    """
+
+    if not PYDANTIC_V2:
+        return pydantic.parse_raw_as(model, body)
+
+    if _backend == BACKEND_ORJSON:
+        return _adapter(model).validate_python(orjson.loads(body))
+    if _backend == BACKEND_MSGSPEC:
+        return _adapter(model).validate_python(msgspec.json.decode(body))
+    return _adapter(model).validate_json(body)
+
+
+def encode_model(model: Any) -> str:
+    """Serialize a model to compact JSON using its aliases, see decode_model."""
+
+    if not PYDANTIC_V2:
+        return model.json(by_alias=True)
+    return model.model_dump_json(by_alias=True)
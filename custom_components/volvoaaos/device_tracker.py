@@ -18,12 +18,14 @@ from .const import DOMAIN, LOGGER
 from .coordinator import VolvoData, VolvoUpdateCoordinator
 
 from .entity import VolvoEntity
+from .fleet import VolvoFleet
 
 @dataclass
 class VolvoDeviceTrackerEntityMixin:
     """Mixin values for Volvo device tracker entities."""
     key="location"
     name=None
+    data_key=("location", None)
     longtitude_fn: Callable[[VolvoData], float]
     latitude_fn: Callable[[VolvoData], float]
 
@@ -43,14 +45,16 @@ async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Setup Volvo device tracker from config entry."""
 
-    volvo_coordinator: VolvoUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
         VolvoDeviceTrackerEntity(
             coordinator=volvo_coordinator,
             description=description
         )
+        for volvo_coordinator in fleet.coordinators.values()
         for description in DEVICE_TRACKER
+        if volvo_coordinator.supports(description.data_key)
     )
 
 class VolvoDeviceTrackerEntity(VolvoEntity, TrackerEntity):
@@ -60,10 +64,10 @@ class VolvoDeviceTrackerEntity(VolvoEntity, TrackerEntity):
 
     def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoDeviceTrackerEntityDescription) -> None:
         """Initiate Volvo device tracker."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, description.data_key)
 
         self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+        self._attr_unique_id = self.unique_id_for(description.key)
 
     @property
     def latitude(self) -> float | None:
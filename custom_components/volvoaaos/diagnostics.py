@@ -0,0 +1,79 @@
+"""Diagnostics support for Volvo AAOS."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_NAME, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_REFRESH_TOKEN, CONF_VCC_API_KEY, CONF_VEHICLES, CONF_VIN
+from .fleet import VolvoFleet
+from .resilience import BREAKERS
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_ACCESS_TOKEN,
+    CONF_REFRESH_TOKEN,
+    CONF_VCC_API_KEY,
+    CONF_VIN,
+    CONF_NAME,
+    CONF_VEHICLES,
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return API, poll and cache metrics of a config entry.
+
+    Vehicles are numbered instead of keyed by VIN or name, which may be the VIN.
+    """
+
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
+
+    vehicles = {}
+    for number, coordinator in enumerate(fleet.coordinators.values(), start=1):
+        vehicles[f"vehicle_{number}"] = {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "api_available": coordinator.api_available,
+            "poll_intervals_s": {
+                key: coordinator.poll_policy.interval(key, coordinator.data).total_seconds()
+                for key in coordinator.poll_policy.schedules
+            },
+            "metrics": coordinator.metrics.as_dict(),
+            "command_queue": coordinator.commands.as_dict(),
+            "location_history": coordinator.location_history.as_dict(),
+            "charging_history": coordinator.charging_history.as_dict(),
+            "skipped_data": sorted(coordinator.skipped_keys()),
+            "unsupported_endpoints": sorted(name for name, supported in coordinator.capabilities.items() if not supported),
+        }
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "vehicles": vehicles,
+        "token": {
+            "refresh_count": fleet.token_manager.refresh_count,
+            "expired": fleet.token_manager.expired,
+        },
+        "cache": {
+            "hits": fleet.cache.hits,
+            "misses": fleet.cache.misses,
+            "revalidated": fleet.cache.revalidated,
+            "coalesced": fleet.cache.coalesced,
+        },
+        "connections": fleet.connection_metrics.as_dict(),
+        "vehicle_info": fleet.vehicle_info.as_dict(),
+        "geofence": {
+            "zones": len(fleet.geofence.index.zones),
+            "grid_cells": len(fleet.geofence.index.cells),
+            "large_zones": len(fleet.geofence.index.large),
+            "vehicles_in_zones": sum(bool(inside) for inside in fleet.geofence.inside.values()),
+        },
+        "circuit_breakers": {
+            breaker.host: {"state": breaker.state, "failures": breaker.failures, "open_count": breaker.open_count}
+            for breaker in BREAKERS
+        },
+    }
@@ -0,0 +1,92 @@
+"""Declarative registry of Volvo AAOS API endpoints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from aiohttp.hdrs import METH_GET, METH_POST
+from pydantic import BaseModel
+
+from .models import (
+    BatteryChargeLevelConnectedVehicleModel,
+    BrakeModel,
+    DiagnosticsModel,
+    EngineModel,
+    EngineStatusModel,
+    FuelModel,
+    GetDoorModel,
+    GetVehicleModel,
+    GetVinModel,
+    GetWindowModel,
+    LocationModel,
+    LockModel,
+    OdometerModel,
+    RechargeModel,
+    StartClimateModel,
+    StatisticsModel,
+    StopClimateModel,
+    TyreModel,
+    UnlockModel,
+    WarningsModel,
+)
+
+VEHICLEDATA_CONTENT_TYPE = "application/vnd.volvocars.api.connected-vehicle.vehicledata.v1+json"
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One API call, client methods are generated from these."""
+
+    name: str
+    description: str
+    path: str
+    model: type[BaseModel]
+    scope: str | None
+    method: str = METH_GET
+    # None uses the content type of the client
+    content_type: str | None = None
+
+    @property
+    def is_command(self) -> bool:
+        """Return True for calls that change the car."""
+        return self.method == METH_POST
+
+    @property
+    def command(self) -> str:
+        """Return the last path segment, e.g. lock for commands/lock."""
+        return self.path.rsplit("/", 1)[-1]
+
+
+ENERGY_ENDPOINTS = [
+    Endpoint("get_recharge_status", "Get recharge status", "/energy/v1/vehicles/{vin}/recharge-status", RechargeModel, "energy:recharge_status"),
+    Endpoint("get_battery_charge_level", "Get battery charge state.", "/connected-vehicle/v1/vehicles/{vin}/battery-charge-level", BatteryChargeLevelConnectedVehicleModel, "energy:battery_charge_level", content_type=VEHICLEDATA_CONTENT_TYPE),
+]
+
+CONNECTED_VEHICLE_ENDPOINTS = [
+    Endpoint("list_vehicles", "Get list of vehicles in relation to Volvo-id.", "/connected-vehicle/v2/vehicles", GetVinModel, "conve:vehicle_relation"),
+    Endpoint("get_vehicle_data", "Get data of vehicle based on VIN", "/connected-vehicle/v2/vehicles/{vin}", GetVehicleModel, "conve:vehicle_relation"),
+    Endpoint("get_door_status", "Get status of doors", "/connected-vehicle/v2/vehicles/{vin}/doors", GetDoorModel, "conve:doors_status"),
+    Endpoint("get_window_status", "Get status of windows.", "/connected-vehicle/v2/vehicles/{vin}/windows", GetWindowModel, "conve:windows_status"),
+    Endpoint("get_odometer", "Get odometer", "/connected-vehicle/v2/vehicles/{vin}/odometer", OdometerModel, "conve:odometer_status"),
+    Endpoint("get_tyre_status", "Get tyre pressure warnings", "/connected-vehicle/v2/vehicles/{vin}/tyres", TyreModel, "conve:tyre_status"),
+    Endpoint("get_engine_status", "Get engine running status", "/connected-vehicle/v2/vehicles/{vin}/engine-status", EngineStatusModel, "conve:engine_status"),
+    Endpoint("get_engine_diagnostics", "Get engine oil and coolant warnings", "/connected-vehicle/v2/vehicles/{vin}/engine", EngineModel, "conve:diagnostics_engine_status"),
+    Endpoint("get_brake_status", "Get brake fluid warning", "/connected-vehicle/v2/vehicles/{vin}/brakes", BrakeModel, "conve:brake_status"),
+    Endpoint("get_diagnostics", "Get service and washer fluid diagnostics", "/connected-vehicle/v2/vehicles/{vin}/diagnostics", DiagnosticsModel, "conve:diagnostics_workshop"),
+    Endpoint("get_warnings", "Get bulb and other warnings", "/connected-vehicle/v2/vehicles/{vin}/warnings", WarningsModel, "conve:warnings"),
+    Endpoint("get_fuel_status", "Get fuel amount", "/connected-vehicle/v2/vehicles/{vin}/fuel", FuelModel, "conve:fuel_status"),
+    Endpoint("get_statistics", "Get trip statistics", "/connected-vehicle/v2/vehicles/{vin}/statistics", StatisticsModel, "conve:trip_statistics"),
+    Endpoint("lock_car", "Lock the car.", "/connected-vehicle/v2/vehicles/{vin}/commands/lock", LockModel, "conve:lock", method=METH_POST),
+    Endpoint("unlock_car", "Unlock the car.", "/connected-vehicle/v2/vehicles/{vin}/commands/unlock", UnlockModel, "conve:unlock", method=METH_POST),
+    Endpoint("set_climate_start", "Start climatization", "/connected-vehicle/v2/vehicles/{vin}/commands/climatization-start", StartClimateModel, "conve:climatization_start_stop", method=METH_POST),
+    Endpoint("set_climate_stop", "Stop climatization", "/connected-vehicle/v2/vehicles/{vin}/commands/climatization-stop", StopClimateModel, "conve:climatization_start_stop", method=METH_POST),
+]
+
+LOCATION_ENDPOINTS = [
+    Endpoint("get_location", "Get location", "/location/v1/vehicles/{vin}/location", LocationModel, "location:read"),
+]
+
+ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in ENERGY_ENDPOINTS + CONNECTED_VEHICLE_ENDPOINTS + LOCATION_ENDPOINTS
+}
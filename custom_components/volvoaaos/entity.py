@@ -2,22 +2,73 @@
 
 from __future__ import annotations
 
-from homeassistant.const import CONF_NAME
+from typing import Any
+
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import VolvoUpdateCoordinator
+from .coordinator import DATA_ENDPOINTS, SNAPSHOT_KEYS, VolvoUpdateCoordinator
+
+# Listener context of entities that only care about availability
+NO_DATA_KEY = ()
+
+def device_identifier(coordinator: VolvoUpdateCoordinator) -> tuple[str, str]:
+    """Return the device registry identifier of a vehicle, its VIN in fleet mode."""
+    if coordinator.fleet_mode:
+        return (DOMAIN, coordinator.vin)
+    return (DOMAIN, coordinator.vehicle_name)
+
 
 class VolvoEntity(CoordinatorEntity[VolvoUpdateCoordinator]):
     """Defines a Volvo AAOS entity."""
 
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator: VolvoUpdateCoordinator) -> None:
-        """Initialize Volvo AAOS entity."""
-        super().__init__(coordinator)
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.config_entry.data[CONF_NAME])},
-            manufacturer="Volvo"
-        )
+    def __init__(self, coordinator: VolvoUpdateCoordinator, data_key: tuple[str, str | None] | None = None) -> None:
+        """Initialize Volvo AAOS entity.
+
+        data_key is the (VolvoData field, attribute of its data) the entity
+        reads, with attribute None for the whole field. The coordinator only
+        notifies the entity when that part of the snapshot changed.
+        """
+        super().__init__(coordinator, context=data_key)
+        if coordinator.fleet_mode:
+            self._attr_device_info = DeviceInfo(
+                identifiers={device_identifier(coordinator)},
+                name=coordinator.vehicle_name,
+                manufacturer="Volvo"
+            )
+        else:
+            self._attr_device_info = DeviceInfo(
+                identifiers={device_identifier(coordinator)},
+                manufacturer="Volvo"
+            )
+        if coordinator.vehicle_info is not None:
+            self._attr_device_info["model"] = coordinator.vehicle_info.model
+
+    async def async_added_to_hass(self) -> None:
+        """Have the coordinator poll the data of the entity while it is in Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_demand(self.coordinator_context))
+
+    @property
+    def available(self) -> bool:
+        """Return False while the update failed, the Volvo API is down or the data was not fetched yet."""
+        if not (super().available and self.coordinator.api_available):
+            return False
+        key = self.coordinator_context[0] if self.coordinator_context else None
+        return key not in DATA_ENDPOINTS or getattr(self.coordinator.data, key, None) is not None or key in SNAPSHOT_KEYS
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag values restored from disk that are not confirmed by Volvo yet."""
+        if self.coordinator.stale:
+            return {"stale": True}
+        return None
+
+    def unique_id_for(self, key: str) -> str:
+        """Return unique id for key, prefixed with the VIN in fleet mode."""
+        if self.coordinator.fleet_mode:
+            return f"{self.coordinator.vin}_{key}"
+        return f"{key}"
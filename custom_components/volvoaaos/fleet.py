@@ -0,0 +1,483 @@
+"""Shared token, session and poll scheduler for the vehicles of one Volvo ID."""
+
+from __future__ import annotations
+
+import asyncio
+
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_NAME, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    CONF_VCC_API_KEY,
+    CONF_VIN,
+    CONF_REFRESH_TOKEN,
+    CONF_ALL_RECHARGE_AVAILABLE,
+    CONF_FLEET,
+    CONF_VEHICLES,
+    CONF_CAPABILITIES,
+    CONF_DISCOVER,
+    CONF_API_URL,
+    CONF_AUTH_URL,
+    CONF_CONNECTION,
+    API_URL,
+    AUTH_URL,
+    POLL_INTERVAL,
+)
+from .cache import ResponseCache
+from .connection import ConnectionMetrics, ConnectionSettings, async_prewarm, create_session
+from .capabilities import REPROBE_INTERVAL, async_probe_capabilities, unsupported
+from .coordinator import VolvoUpdateCoordinator
+from .entity import device_identifier
+from .geofence import EVENT_GEOFENCE, GEOFENCE_BOOST, GEOFENCE_BOOST_INTERVAL, GeofenceEngine, signal_occupancy, signal_zones, zones_from_states
+from .location_history import coordinates
+from .models import AuthModel
+from .polling import poll_cycle
+from .snapshot_store import VolvoSnapshotStore
+from .token_manager import TokenManager
+from .vehicle_info import REFRESH_INTERVAL, VehicleInfoCache, signal_vehicle_info
+from .volvo import Auth, ConnectedVehicle, Energy
+
+
+def vehicles_from_entry(entry: ConfigEntry) -> dict[str, dict]:
+    """Return {vin: {name, all_recharge_available, capabilities}} for a single VIN or fleet entry.
+
+    capabilities is missing until the vehicle was probed.
+    """
+    if entry.data.get(CONF_FLEET):
+        return dict(entry.data.get(CONF_VEHICLES, {}))
+
+    vehicle = {
+        CONF_NAME: entry.data[CONF_NAME],
+        CONF_ALL_RECHARGE_AVAILABLE: entry.data[CONF_ALL_RECHARGE_AVAILABLE],
+    }
+    if CONF_CAPABILITIES in entry.data:
+        vehicle[CONF_CAPABILITIES] = entry.data[CONF_CAPABILITIES]
+    return {entry.data[CONF_VIN]: vehicle}
+
+
+async def probe_all_recharge_available(energy: Energy) -> bool:
+    """Return True if the full recharge status endpoint works for the VIN."""
+    try:
+        await energy.get_recharge_status()
+    except Exception as e:
+        LOGGER.debug('Can NOT get all recharge endpoints for %s. Battery percentage is available', energy.vin)
+        LOGGER.debug(e)
+        return False
+
+    LOGGER.debug('All recharge status endpoints is available for %s', energy.vin)
+    return True
+
+
+class VolvoFleet:
+    """One token manager, session, response cache and scheduler serving every VIN of a config entry.
+
+    A single timer ticks every cycle / number of vehicles and polls the
+    next vehicle in turn, so polls are spread over the cycle instead of
+    all firing on the same tick. The cycle is the poll interval, or shorter
+    if a poll policy polls an endpoint faster, e.g. while charging. Each
+    poll only fetches the endpoints its coordinator's poll policy considers
+    due.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, poll_interval: timedelta = POLL_INTERVAL) -> None:
+        """Initialize fleet."""
+
+        self.hass = hass
+        self.config_entry = entry
+        self.poll_interval = poll_interval
+        self.connection_settings = ConnectionSettings.from_dict(entry.data.get(CONF_CONNECTION))
+        self.connection_metrics = ConnectionMetrics()
+        self.session = create_session(
+            self.connection_settings,
+            self.connection_metrics,
+            ssl=ssl_util.get_default_context(),
+            headers={"User-Agent": SERVER_SOFTWARE},
+        )
+        entry.async_on_unload(self.session.close)
+        self.auth = Auth(session=self.session, auth_url=entry.data.get(CONF_AUTH_URL, AUTH_URL))
+        self.token_manager = TokenManager(
+            self.auth,
+            refresh_token=entry.data[CONF_REFRESH_TOKEN],
+            access_token=entry.data[CONF_ACCESS_TOKEN],
+            on_update=self._store_tokens,
+        )
+        self.cache = ResponseCache()
+        self.snapshot_store = VolvoSnapshotStore(hass, entry)
+        self.vehicle_info = VehicleInfoCache(hass, entry)
+        self.coordinators: dict[str, VolvoUpdateCoordinator] = {}
+        self.listeners = []
+        self._next_poll = 0
+        self.geofence = GeofenceEngine()
+        # Planner demand for location held per VIN while there are zones to check
+        self._location_demand: dict[str, CALLBACK_TYPE] = {}
+        # Zones are created one by one at startup, index them once they settled
+        self._zones_debouncer = Debouncer(hass, LOGGER, cooldown=1, immediate=False, function=self._async_index_zones)
+
+    async def async_prewarm(self) -> None:
+        """Open connections to the API host before the first poll, e.g. during login."""
+
+        api_url = self.config_entry.data.get(CONF_API_URL, API_URL)
+        opened = await async_prewarm(self.session, api_url, self.connection_settings.prewarm, self.connection_metrics)
+        LOGGER.debug("Pre-warmed %s connections to %s", opened, api_url)
+
+    async def async_login(self) -> None:
+        """Exchange reauth token else auth from username and password."""
+
+        entry = self.config_entry
+        try:
+            await self.token_manager.async_refresh()
+            LOGGER.debug('Refresh token still valid. Updated access token.')
+        except Exception as e:
+            LOGGER.debug(e)
+            LOGGER.debug('Refresh token invalid - retry login using username and password')
+            try:
+                authenticate = await self.auth.authenticate(username=entry.data[CONF_USERNAME], password=entry.data[CONF_PASSWORD])
+                self.token_manager.update(authenticate)
+                LOGGER.debug('Logged in using username and password.')
+            except Exception as e:
+                LOGGER.debug(e)
+                LOGGER.debug('Could not login. Try reinstall the component.')
+
+    def _store_tokens(self, auth: AuthModel) -> None:
+        new_data = {**self.config_entry.data, CONF_ACCESS_TOKEN: auth.access_token, CONF_REFRESH_TOKEN: auth.refresh_token}
+        self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
+
+    async def async_discover_vehicles(self) -> bool:
+        """Add VINs returned by list_vehicles that the fleet entry does not know yet.
+
+        Returns True if vehicles were added, create_coordinators picks them up.
+        """
+
+        if not self.config_entry.data.get(CONF_FLEET) or not self.config_entry.data.get(CONF_DISCOVER, True):
+            return False
+
+        connected_vehicle = ConnectedVehicle(session=self.session, token_manager=self.token_manager, vcc_api_key=self.config_entry.data[CONF_VCC_API_KEY], api_url=self.config_entry.data.get(CONF_API_URL, API_URL))
+        try:
+            response = await connected_vehicle.list_vehicles()
+        except Exception as e:
+            LOGGER.warning('Could not list vehicles, using stored fleet: %s', e)
+            return False
+
+        vehicles = vehicles_from_entry(self.config_entry)
+        new_vins = [item.vin for item in response.data if item.vin not in vehicles]
+        if not new_vins:
+            return False
+
+        probes = await asyncio.gather(
+            *(
+                probe_all_recharge_available(Energy(session=self.session, token_manager=self.token_manager, vcc_api_key=self.config_entry.data[CONF_VCC_API_KEY], vin=vin, api_url=self.config_entry.data.get(CONF_API_URL, API_URL)))
+                for vin in new_vins
+            )
+        )
+        for vin, all_recharge_available in zip(new_vins, probes):
+            LOGGER.debug('Adding %s to fleet', vin)
+            vehicles[vin] = {CONF_NAME: vin, CONF_ALL_RECHARGE_AVAILABLE: all_recharge_available}
+
+        self.hass.config_entries.async_update_entry(self.config_entry, data={**self.config_entry.data, CONF_VEHICLES: vehicles})
+        return True
+
+    def create_coordinators(self) -> None:
+        """Create a coordinator for every VIN that has none, all sharing the fleet session.
+
+        Every update of a coordinator schedules a save of its snapshot, and
+        every new location is checked against the zones.
+        """
+
+        for vin, vehicle in vehicles_from_entry(self.config_entry).items():
+            if vin in self.coordinators:
+                continue
+            self.coordinators[vin] = VolvoUpdateCoordinator(
+                self.hass,
+                self.config_entry,
+                session=self.session,
+                token_manager=self.token_manager,
+                cache=self.cache,
+                vin=vin,
+                vehicle_name=vehicle[CONF_NAME],
+                all_recharge_available=vehicle[CONF_ALL_RECHARGE_AVAILABLE],
+                capabilities=vehicle.get(CONF_CAPABILITIES),
+            )
+            self.coordinators[vin].vehicle_info = self.vehicle_info.info.get(vin)
+            self.listeners.append(
+                self.coordinators[vin].async_add_listener(self._save_callback(vin, self.coordinators[vin]))
+            )
+            self.listeners.append(
+                self.coordinators[vin].async_add_listener(self._geofence_callback(vin, self.coordinators[vin]), ("location", None))
+            )
+        self._update_location_demand()
+
+    async def async_probe_capabilities(self, only_missing: bool = False) -> bool:
+        """Probe the endpoints of every vehicle and store the matrices in the config entry.
+
+        With only_missing, vehicles probed before are skipped. Returns True
+        if the unsupported endpoints of a vehicle changed, its entities then
+        need a reload.
+        """
+
+        vehicles = vehicles_from_entry(self.config_entry)
+        coordinators = [
+            coordinator for vin, coordinator in self.coordinators.items()
+            if not (only_missing and CONF_CAPABILITIES in vehicles.get(vin, {}))
+        ]
+        if not coordinators:
+            return False
+
+        matrices = await asyncio.gather(
+            *(
+                async_probe_capabilities(
+                    (coordinator.energy, coordinator.connected_vehicle, coordinator.location), coordinator.capabilities
+                )
+                for coordinator in coordinators
+            )
+        )
+
+        changed = False
+        for coordinator, capabilities in zip(coordinators, matrices):
+            if unsupported(capabilities) != unsupported(coordinator.capabilities):
+                LOGGER.debug("Unsupported endpoints of %s: %s", coordinator.vin, sorted(unsupported(capabilities)))
+                changed = True
+            coordinator.capabilities = capabilities
+            coordinator.all_recharge_available = capabilities.get("get_recharge_status", coordinator.all_recharge_available)
+            vehicles[coordinator.vin] = {
+                **vehicles[coordinator.vin],
+                CONF_ALL_RECHARGE_AVAILABLE: coordinator.all_recharge_available,
+                CONF_CAPABILITIES: capabilities,
+            }
+
+        if self.config_entry.data.get(CONF_FLEET):
+            new_data = {**self.config_entry.data, CONF_VEHICLES: vehicles}
+        else:
+            vehicle = vehicles[self.config_entry.data[CONF_VIN]]
+            new_data = {
+                **self.config_entry.data,
+                CONF_ALL_RECHARGE_AVAILABLE: vehicle[CONF_ALL_RECHARGE_AVAILABLE],
+                CONF_CAPABILITIES: vehicle[CONF_CAPABILITIES],
+            }
+        self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
+        return changed
+
+    async def async_reprobe(self) -> None:
+        """Probe every vehicle again and reload the entry if its endpoints changed."""
+
+        if await self.async_probe_capabilities():
+            LOGGER.info("Endpoints of %s changed, reloading", self.config_entry.title)
+            self.hass.async_create_task(self.hass.config_entries.async_reload(self.config_entry.entry_id))
+
+    def enable_fetch_planning(self) -> None:
+        """Poll only the data enabled entities read, once the platforms added them."""
+        for coordinator in self.coordinators.values():
+            coordinator.planner.ready = True
+
+    async def async_restore_snapshots(self) -> bool:
+        """Load stored snapshots into the coordinators, marked stale.
+
+        Returns True only if every vehicle got a snapshot, otherwise nothing
+        is restored and setup has to wait for live data.
+        """
+
+        snapshots = await self.snapshot_store.async_load()
+        if not self.coordinators or any(vin not in snapshots for vin in self.coordinators):
+            return False
+
+        for vin, coordinator in self.coordinators.items():
+            coordinator.stale = True
+            coordinator.async_set_updated_data(snapshots[vin])
+        return True
+
+    async def async_start_live(self) -> None:
+        """Log in, fetch live data for every vehicle and start polling.
+
+        Used in the background after a warm start, the restored data stays
+        in place for vehicles whose refresh fails. Vehicles new to the account
+        get entities on the next setup.
+        """
+
+        await asyncio.gather(self.async_login(), self.async_prewarm())
+        await self.async_discover_vehicles()
+        if await self.async_probe_capabilities(only_missing=True):
+            # The entities were created from the snapshot before the vehicle was probed
+            self.hass.async_create_task(self.hass.config_entries.async_reload(self.config_entry.entry_id))
+            return
+        failed = await self.async_first_refresh()
+        for vin, err in failed.items():
+            LOGGER.warning("Could not fetch live data for %s, showing stored data: %s", vin, err)
+        self.start()
+
+    async def async_first_refresh(self) -> dict[str, Exception]:
+        """Load the charging histories and fetch initial data for every vehicle concurrently.
+
+        Returns the errors of vehicles that could not be fully fetched.
+        """
+
+        coordinators = list(self.coordinators.values())
+        await asyncio.gather(
+            *(coordinator.charging_history.async_load() for coordinator in coordinators if not coordinator.charging_history.loaded)
+        )
+        results = await asyncio.gather(*(coordinator.fetch_snapshot() for coordinator in coordinators), return_exceptions=True)
+
+        failed = {}
+        for coordinator, result in zip(coordinators, results):
+            if isinstance(result, Exception):
+                failed[coordinator.vin] = result
+                continue
+            data, errors = result
+            for key, err in errors.items():
+                LOGGER.warning("Fetching %s for %s failed: %s", key, coordinator.vin, err)
+            coordinator.async_set_changed_data(data)
+
+        return failed
+
+    def start(self) -> None:
+        """Start the shared poll scheduler."""
+
+        cycle = poll_cycle(self.poll_interval, (coordinator.poll_policy for coordinator in self.coordinators.values()))
+        tick = max(cycle / max(len(self.coordinators), 1), timedelta(seconds=1))
+        for coordinator in self.coordinators.values():
+            coordinator.metrics.poll_budget = tick
+        self.listeners.append(
+            async_track_time_interval(self.hass, self._async_poll_next, tick)
+        )
+        self.listeners.append(
+            async_track_time_interval(self.hass, self._async_schedule_reprobe, REPROBE_INTERVAL)
+        )
+        self.listeners.append(
+            async_track_time_interval(self.hass, self._async_schedule_vehicle_info, REFRESH_INTERVAL)
+        )
+        self._async_schedule_vehicle_info(None)
+
+    @callback
+    def _async_schedule_reprobe(self, datetime) -> None:
+        self.config_entry.async_create_background_task(self.hass, self.async_reprobe(), f"{DOMAIN} capability probe")
+
+    @callback
+    def _async_schedule_vehicle_info(self, datetime) -> None:
+        self.config_entry.async_create_background_task(self.hass, self.async_refresh_vehicle_info(), f"{DOMAIN} vehicle info")
+
+    async def async_refresh_vehicle_info(self, force: bool = False) -> None:
+        """Fetch outdated metadata and images and update the devices and image entities of changed vehicles."""
+
+        changed = await self.vehicle_info.async_refresh(
+            {vin: coordinator.connected_vehicle for vin, coordinator in self.coordinators.items()}, self.session, force
+        )
+        if not changed:
+            return
+
+        device_registry = dr.async_get(self.hass)
+        for vin in changed:
+            coordinator = self.coordinators[vin]
+            coordinator.vehicle_info = self.vehicle_info.info[vin]
+            device = device_registry.async_get_device(identifiers={device_identifier(coordinator)})
+            if device is not None:
+                device_registry.async_update_device(device.id, model=coordinator.vehicle_info.model)
+        async_dispatcher_send(self.hass, signal_vehicle_info(self.config_entry.entry_id), changed)
+
+    def setup_geofence(self) -> None:
+        """Index the zones of Home Assistant and follow their changes."""
+
+        self.geofence.set_zones(zones_from_states(self.hass))
+        self._update_location_demand()
+        self.listeners.append(
+            self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_zone_changed, self._is_zone_event)
+        )
+        self.listeners.append(self._zones_debouncer.async_cancel)
+        self.listeners.append(self._release_location_demand)
+
+    def _update_location_demand(self) -> None:
+        """Poll the location of every vehicle while there are zones, even without a device tracker."""
+
+        if not self.geofence.zones:
+            self._release_location_demand()
+            return
+        for vin, coordinator in self.coordinators.items():
+            if vin not in self._location_demand:
+                self._location_demand[vin] = coordinator.async_add_demand(("location", None))
+
+    def _release_location_demand(self) -> None:
+        for remove_demand in self._location_demand.values():
+            remove_demand()
+        self._location_demand.clear()
+
+    @callback
+    def _is_zone_event(self, event: Event) -> bool:
+        return event.data["entity_id"].startswith("zone.")
+
+    @callback
+    def _async_zone_changed(self, event: Event) -> None:
+        self.hass.async_create_task(self._zones_debouncer.async_call())
+
+    async def _async_index_zones(self) -> None:
+        self.geofence.set_zones(zones_from_states(self.hass))
+        self._update_location_demand()
+        async_dispatcher_send(self.hass, signal_zones(self.config_entry.entry_id))
+
+    def _geofence_callback(self, vin: str, coordinator: VolvoUpdateCoordinator):
+        @callback
+        def _async_locate() -> None:
+            if (position := coordinates(getattr(coordinator.data, "location", None))) is None:
+                return
+            transitions, near = self.geofence.update(vin, *position)
+            if near:
+                coordinator.poll_policy.boost("location", GEOFENCE_BOOST, GEOFENCE_BOOST_INTERVAL)
+            if not transitions:
+                return
+
+            zones = self.geofence.zones
+            for event, zone in transitions:
+                LOGGER.debug("%s %s %s", coordinator.vehicle_name, event, zone)
+                self.hass.bus.async_fire(
+                    EVENT_GEOFENCE,
+                    {
+                        "event": event,
+                        "zone": zone,
+                        "zone_name": zones[zone].name,
+                        "vin": vin,
+                        "vehicle": coordinator.vehicle_name,
+                    },
+                )
+            async_dispatcher_send(self.hass, signal_occupancy(self.config_entry.entry_id), {zone for _, zone in transitions})
+
+        return _async_locate
+
+    def _save_callback(self, vin: str, coordinator: VolvoUpdateCoordinator):
+        @callback
+        def _async_save() -> None:
+            if coordinator.data is not None and coordinator.last_update_success:
+                self.snapshot_store.async_schedule_save(vin, coordinator.data)
+
+        return _async_save
+
+    async def async_flush_histories(self) -> None:
+        """Write the charging readings not on disk yet."""
+        await asyncio.gather(*(coordinator.charging_history.async_flush() for coordinator in self.coordinators.values()))
+
+    def remove_listeners(self) -> None:
+        """Cancel the poll timer, snapshot saving, queued commands and the scheduled token refresh."""
+        for remove_listener in self.listeners:
+            remove_listener()
+        self.listeners.clear()
+        for coordinator in self.coordinators.values():
+            coordinator.commands.cancel()
+        self.token_manager.close()
+
+    async def _async_poll_next(self, datetime) -> None:
+        """Poll the next vehicle in turn."""
+
+        if not self.coordinators:
+            return
+
+        coordinators = list(self.coordinators.values())
+        coordinator = coordinators[self._next_poll % len(coordinators)]
+        self._next_poll = (self._next_poll + 1) % len(coordinators)
+        await coordinator.update_coordinator_data(datetime, only_due=True)
@@ -0,0 +1,202 @@
+"""Geofencing of Volvo AAOS vehicles against Home Assistant zones."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.zone import DOMAIN as ZONE_DOMAIN
+from homeassistant.const import ATTR_FRIENDLY_NAME, ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .polling import ACTIVE_POLL_INTERVAL
+
+EVENT_GEOFENCE = f"{DOMAIN}_geofence"
+
+EARTH_RADIUS_M = 6371008.8
+
+# Grid cell size, about 5.5 km north-south
+GRID_DEGREES = 0.05
+# Zones covering more cells than this are checked on every update instead
+MAX_ZONE_CELLS = 64
+
+# A vehicle leaves a zone only beyond radius + HYSTERESIS_M, against GPS jitter
+HYSTERESIS_M = 100
+# Within this distance of a zone boundary location is polled every GEOFENCE_BOOST_INTERVAL
+NEAR_BOUNDARY_M = 1000
+# How long a position near a boundary keeps the shorter interval
+GEOFENCE_BOOST = timedelta(minutes=5)
+# Location interval near a boundary, as often as for an unlocked car
+GEOFENCE_BOOST_INTERVAL = ACTIVE_POLL_INTERVAL
+
+ENTER = "enter"
+LEAVE = "leave"
+
+
+@dataclass(frozen=True)
+class Zone:
+    """Circular zone, radius in metres."""
+
+    entity_id: str
+    name: str
+    latitude: float
+    longitude: float
+    radius: float
+
+
+def signal_zones(entry_id: str) -> str:
+    """Return the dispatcher signal sent when the zones of an entry were re-indexed."""
+    return f"{DOMAIN}_{entry_id}_zones"
+
+
+def signal_occupancy(entry_id: str) -> str:
+    """Return the dispatcher signal sent with the zones a vehicle of an entry entered or left."""
+    return f"{DOMAIN}_{entry_id}_occupancy"
+
+
+def zones_from_states(hass: HomeAssistant) -> list[Zone]:
+    """Return the zones of Home Assistant, passive ones included."""
+
+    zones = []
+    for state in hass.states.async_all(ZONE_DOMAIN):
+        try:
+            zones.append(
+                Zone(
+                    state.entity_id,
+                    state.attributes.get(ATTR_FRIENDLY_NAME, state.entity_id),
+                    float(state.attributes[ATTR_LATITUDE]),
+                    float(state.attributes[ATTR_LONGITUDE]),
+                    float(state.attributes.get("radius", 0)),
+                )
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+    return zones
+
+
+def haversine(latitude: float, longitude: float, latitudes: Iterable[float], longitudes: Iterable[float]) -> list[float]:
+    """Return the distances in metres from one point to many."""
+
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    return [
+        2 * EARTH_RADIUS_M * asin(sqrt(
+            sin((radians(other_lat) - lat) / 2) ** 2
+            + cos_lat * cos(radians(other_lat)) * sin((radians(other_lon) - lon) / 2) ** 2
+        ))
+        for other_lat, other_lon in zip(latitudes, longitudes)
+    ]
+
+
+def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return math.floor(latitude / GRID_DEGREES), math.floor(longitude / GRID_DEGREES)
+
+
+class ZoneIndex:
+    """Grid of the zones that reach into each cell, `margin` metres beyond their radius."""
+
+    def __init__(self, zones: list[Zone], margin: float) -> None:
+        """Build the grid."""
+
+        self.zones = zones
+        self.latitudes = array("d", (zone.latitude for zone in zones))
+        self.longitudes = array("d", (zone.longitude for zone in zones))
+        self.radii = array("d", (zone.radius for zone in zones))
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        self.large: list[int] = []
+
+        for index, zone in enumerate(zones):
+            reach = math.degrees((zone.radius + margin) / EARTH_RADIUS_M)
+            lon_reach = reach / max(math.cos(math.radians(zone.latitude)), 0.01)
+            south, west = _cell(zone.latitude - reach, zone.longitude - lon_reach)
+            north, east = _cell(zone.latitude + reach, zone.longitude + lon_reach)
+            if (north - south + 1) * (east - west + 1) > MAX_ZONE_CELLS:
+                self.large.append(index)
+                continue
+            for row in range(south, north + 1):
+                for column in range(west, east + 1):
+                    self.cells.setdefault((row, column), []).append(index)
+
+    def nearby(self, latitude: float, longitude: float) -> list[tuple[int, float]]:
+        """Return (zone index, distance) of the zones that may reach the point."""
+
+        candidates = self.cells.get(_cell(latitude, longitude), []) + self.large
+        if not candidates:
+            return []
+        distances = haversine(
+            latitude, longitude, (self.latitudes[index] for index in candidates), (self.longitudes[index] for index in candidates)
+        )
+        return list(zip(candidates, distances))
+
+
+class GeofenceEngine:
+    """Which zones each vehicle is in, with enter and leave transitions.
+
+    A vehicle enters a zone within its radius and leaves it beyond radius +
+    hysteresis. The first position of a vehicle sets its zones without
+    transitions, so restarts do not report every vehicle entering.
+    """
+
+    def __init__(self, hysteresis: float = HYSTERESIS_M, near: float = NEAR_BOUNDARY_M) -> None:
+        """Initialize engine without zones."""
+
+        self.hysteresis = hysteresis
+        self.near = near
+        self.index = ZoneIndex([], max(hysteresis, near))
+        self._zones: dict[str, Zone] = {}
+        self.inside: dict[str, set[str]] = {}
+        self.positions: dict[str, tuple[float, float]] = {}
+
+    @property
+    def zones(self) -> dict[str, Zone]:
+        """Return the zones by entity id, built once per set_zones."""
+        return self._zones
+
+    def set_zones(self, zones: list[Zone]) -> None:
+        """Replace the zones and place every vehicle again, without transitions.
+
+        The vehicles did not move, zones appearing or changing are no enter
+        or leave.
+        """
+
+        self.index = ZoneIndex(zones, max(self.hysteresis, self.near))
+        self._zones = {zone.entity_id: zone for zone in zones}
+        for vehicle, (latitude, longitude) in self.positions.items():
+            self.inside.pop(vehicle, None)
+            self.update(vehicle, latitude, longitude)
+
+    def update(self, vehicle: str, latitude: float, longitude: float) -> tuple[list[tuple[str, str]], bool]:
+        """Place a vehicle, return its (ENTER or LEAVE, zone entity id) and if it is near a boundary."""
+
+        first = vehicle not in self.inside
+        inside = self.inside.setdefault(vehicle, set())
+        self.positions[vehicle] = (latitude, longitude)
+        now_inside = set()
+        near = False
+        for index, distance in self.index.nearby(latitude, longitude):
+            zone = self.index.zones[index]
+            if distance <= zone.radius or (zone.entity_id in inside and distance <= zone.radius + self.hysteresis):
+                now_inside.add(zone.entity_id)
+            near = near or abs(distance - zone.radius) <= self.near
+
+        transitions = []
+        if not first:
+            transitions += [(LEAVE, entity_id) for entity_id in sorted(inside - now_inside)]
+            transitions += [(ENTER, entity_id) for entity_id in sorted(now_inside - inside)]
+        self.inside[vehicle] = now_inside
+        return transitions, near
+
+    def remove(self, vehicle: str) -> None:
+        """Forget a vehicle."""
+        self.inside.pop(vehicle, None)
+        self.positions.pop(vehicle, None)
+
+    def occupants(self, entity_id: str) -> list[str]:
+        """Return the vehicles in a zone."""
+        return sorted(vehicle for vehicle, inside in self.inside.items() if entity_id in inside)
@@ -0,0 +1,116 @@
+"""Support for Volvo AAOS images."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from homeassistant.components.image import ImageEntity, ImageEntityDescription
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+
+from .coordinator import VolvoUpdateCoordinator
+
+from .entity import VolvoEntity, NO_DATA_KEY
+from .fleet import VolvoFleet
+from .vehicle_info import VehicleInfoCache, signal_vehicle_info
+
+@dataclass
+class VolvoImageEntityMixin:
+    """Mixin values for Volvo image entities."""
+
+    kind: str
+
+@dataclass
+class VolvoImageEntityDescription(ImageEntityDescription, VolvoImageEntityMixin):
+    """Class describing Volvo AAOS image entities."""
+
+IMAGES = [
+    VolvoImageEntityDescription(
+        key="exterior_image",
+        name="Exterior",
+        kind="exterior",
+    ),
+    VolvoImageEntityDescription(
+        key="interior_image",
+        name="Interior",
+        kind="interior",
+    ),
+]
+
+async def async_setup_entry(
+        hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    """Set up Volvo images from config entry."""
+
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        VolvoImageEntity(
+            hass=hass,
+            coordinator=volvo_coordinator,
+            cache=fleet.vehicle_info,
+            description=description
+        )
+        for volvo_coordinator in fleet.coordinators.values()
+        for description in IMAGES
+    )
+
+class VolvoImageEntity(VolvoEntity, ImageEntity):
+    """Representation of a Volvo image, served from the on-disk cache.
+
+    The bytes of the image are kept once read and dropped when the cache
+    downloaded a new version.
+    """
+
+    entity_description: VolvoImageEntityDescription
+
+    def __init__(self, hass: HomeAssistant, coordinator: VolvoUpdateCoordinator, cache: VehicleInfoCache, description: VolvoImageEntityDescription) -> None:
+        """Initiate Volvo image."""
+        # Images do not change with the polled data
+        super().__init__(coordinator, NO_DATA_KEY)
+        ImageEntity.__init__(self, hass)
+
+        self.entity_description = description
+        self._attr_unique_id = self.unique_id_for(description.key)
+        self.cache = cache
+        self._image: bytes | None = None
+        self._update_attrs()
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the downloads of the cache."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, signal_vehicle_info(self.coordinator.config_entry.entry_id), self._async_vehicle_info_changed)
+        )
+
+    @callback
+    def _async_vehicle_info_changed(self, vins: set[str]) -> None:
+        if self.coordinator.vin in vins:
+            self._update_attrs()
+            self.async_write_ha_state()
+
+    def _update_attrs(self) -> None:
+        info = self.cache.info.get(self.coordinator.vin)
+        image = info.images.get(self.entity_description.kind) if info is not None else None
+        if image is None:
+            self._attr_image_last_updated = None
+            return
+        if image.updated != self._attr_image_last_updated:
+            self._image = None
+        self._attr_content_type = image.content_type
+        self._attr_image_last_updated = image.updated
+
+    @property
+    def available(self) -> bool:
+        """Return True once the image is cached, the Volvo API is not needed to serve it."""
+        return self._attr_image_last_updated is not None
+
+    async def async_image(self) -> bytes | None:
+        """Return the cached image."""
+        if self._image is None:
+            self._image = await self.cache.async_image(self.coordinator.vin, self.entity_description.kind)
+        return self._image
@@ -0,0 +1,233 @@
+"""Location history of Volvo AAOS vehicles."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from xml.sax.saxutils import escape, quoteattr
+
+from .compact import NO_TIMESTAMP, ms_to_timestamp, timestamp_to_ms
+
+# Points kept per vehicle, 28 bytes each
+LOCATION_HISTORY_SIZE = 1024
+
+# Share of the points kept when a full history is thinned
+SIMPLIFY_KEEP = 0.75
+
+EARTH_RADIUS_M = 6371008.8
+
+
+@dataclass
+class TrackPoints:
+    """Copy of a location history, oldest point first."""
+
+    latitudes: array
+    longitudes: array
+    headings: array
+    timestamps: array
+
+    def __len__(self) -> int:
+        """Return the number of points."""
+        return len(self.timestamps)
+
+
+def visvalingam(latitudes: array, longitudes: array, keep: int) -> list[int]:
+    """Return the indices of the `keep` most significant points of a track.
+
+    Visvalingam-Whyatt: the point spanning the smallest triangle with its
+    neighbours is removed until `keep` are left. The first and last point
+    always stay. Areas are in square metres on an equirectangular projection.
+    """
+
+    count = len(latitudes)
+    if count <= max(keep, 2):
+        return list(range(count))
+
+    scale = math.cos(math.radians(sum(latitudes) / count))
+    xs = [math.radians(lon) * scale * EARTH_RADIUS_M for lon in longitudes]
+    ys = [math.radians(lat) * EARTH_RADIUS_M for lat in latitudes]
+
+    def area(a: int, b: int, c: int) -> float:
+        return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2
+
+    previous = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    areas = [math.inf] * count
+    for index in range(1, count - 1):
+        areas[index] = area(index - 1, index, index + 1)
+    heap = [(areas[index], index) for index in range(1, count - 1)]
+    heapq.heapify(heap)
+
+    removed = [False] * count
+    remaining = count
+    while remaining > keep and heap:
+        smallest, index = heapq.heappop(heap)
+        if removed[index] or smallest != areas[index]:
+            continue
+        removed[index] = True
+        remaining -= 1
+        before, after = previous[index], following[index]
+        following[before] = after
+        previous[after] = before
+        for neighbour in (before, after):
+            if 0 < neighbour < count - 1:
+                # Never below the removed area, or points would go out of order
+                areas[neighbour] = max(area(previous[neighbour], neighbour, following[neighbour]), smallest)
+                heapq.heappush(heap, (areas[neighbour], neighbour))
+
+    return [index for index in range(count) if not removed[index]]
+
+
+def coordinates(location) -> tuple[float, float] | None:
+    """Return latitude and longitude of a LocationModel or a view of one."""
+
+    data = getattr(location, "data", None)
+    if data is None or data.geometry is None or len(data.geometry.coordinates or ()) < 2:
+        return None
+    longitude, latitude = data.geometry.coordinates[:2]
+    return latitude, longitude
+
+
+class LocationHistory:
+    """Fixed size, array backed track of one vehicle.
+
+    Points are only added when the position changes. When the arrays are
+    full the track is thinned with visvalingam to SIMPLIFY_KEEP of its
+    points instead of dropping the oldest, so the memory stays at
+    `capacity` points and old trips keep their shape at less detail.
+    """
+
+    def __init__(self, capacity: int = LOCATION_HISTORY_SIZE) -> None:
+        """Initialize history."""
+
+        self.capacity = capacity
+        self.latitudes = array("d", bytes(8 * capacity))
+        self.longitudes = array("d", bytes(8 * capacity))
+        self.headings = array("f", bytes(4 * capacity))
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.count = 0
+        self.simplified = 0
+
+    def __len__(self) -> int:
+        """Return the number of points in the track."""
+        return self.count
+
+    def add(self, latitude: float, longitude: float, heading: float | None, timestamp_ms: int) -> bool:
+        """Add a point, return False if it is not newer or did not move."""
+
+        if self.count:
+            last = self.count - 1
+            if timestamp_ms <= self.timestamps[last]:
+                return False
+            if latitude == self.latitudes[last] and longitude == self.longitudes[last]:
+                return False
+
+        if self.count == self.capacity:
+            self.simplify(max(int(self.capacity * SIMPLIFY_KEEP), 2))
+
+        index = self.count
+        self.latitudes[index] = latitude
+        self.longitudes[index] = longitude
+        self.headings[index] = math.nan if heading is None else heading
+        self.timestamps[index] = timestamp_ms
+        self.count += 1
+        return True
+
+    def add_location(self, location) -> bool:
+        """Add the position of a LocationModel or a view of one."""
+
+        if (position := coordinates(location)) is None:
+            return False
+        latitude, longitude = position
+        properties = location.data.properties
+        timestamp = timestamp_to_ms(getattr(properties, "timestamp", None))
+        if timestamp == NO_TIMESTAMP:
+            return False
+        try:
+            heading = float(properties.heading)
+        except (AttributeError, TypeError, ValueError):
+            heading = None
+        return self.add(latitude, longitude, heading, timestamp)
+
+    def simplify(self, keep: int) -> None:
+        """Thin the track to `keep` points."""
+
+        points = self.points()
+        kept = visvalingam(points.latitudes, points.longitudes, keep)
+        for index, source in enumerate(kept):
+            self.latitudes[index] = points.latitudes[source]
+            self.longitudes[index] = points.longitudes[source]
+            self.headings[index] = points.headings[source]
+            self.timestamps[index] = points.timestamps[source]
+        self.simplified += self.count - len(kept)
+        self.count = len(kept)
+
+    def points(self) -> TrackPoints:
+        """Return a copy of the points, e.g. to export them outside the event loop."""
+        return TrackPoints(
+            self.latitudes[:self.count],
+            self.longitudes[:self.count],
+            self.headings[:self.count],
+            self.timestamps[:self.count],
+        )
+
+    def clear(self) -> None:
+        """Forget every point."""
+        self.count = 0
+
+    def as_dict(self) -> dict:
+        """Return counters for diagnostics."""
+        return {
+            "points": self.count,
+            "capacity": self.capacity,
+            "simplified": self.simplified,
+            "bytes": sum(part.itemsize * self.capacity for part in (self.latitudes, self.longitudes, self.headings, self.timestamps)),
+        }
+
+
+def iter_gpx(points: TrackPoints, name: str) -> Iterator[str]:
+    """Yield a GPX 1.1 track of the points in chunks."""
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<gpx version="1.1" creator="Volvo AAOS" xmlns="http://www.topografix.com/GPX/1/1">\n'
+    yield f"<trk><name>{escape(name)}</name><trkseg>\n"
+    for latitude, longitude, timestamp in zip(points.latitudes, points.longitudes, points.timestamps):
+        yield f'<trkpt lat={quoteattr(repr(latitude))} lon={quoteattr(repr(longitude))}><time>{ms_to_timestamp(timestamp)}</time></trkpt>\n'
+    yield "</trkseg></trk>\n</gpx>\n"
+
+
+def iter_geojson(points: TrackPoints, name: str) -> Iterator[str]:
+    """Yield a GeoJSON LineString feature of the points in chunks.
+
+    Times and headings per point follow the coordinateProperties convention.
+    """
+
+    def listed(values: Iterator[str]) -> Iterator[str]:
+        for index, value in enumerate(values):
+            yield f",{value}" if index else value
+
+    yield f'{{"type":"Feature","properties":{{"name":{json.dumps(name)},"coordinateProperties":{{"times":['
+    yield from listed(json.dumps(ms_to_timestamp(timestamp)) for timestamp in points.timestamps)
+    yield '],"headings":['
+    yield from listed("null" if math.isnan(heading) else repr(round(heading, 1)) for heading in points.headings)
+    yield ']}},"geometry":{"type":"LineString","coordinates":['
+    yield from listed(f"[{longitude!r},{latitude!r}]" for latitude, longitude in zip(points.latitudes, points.longitudes))
+    yield "]}}\n"
+
+
+TRACK_FORMATS = {
+    "gpx": iter_gpx,
+    "geojson": iter_geojson,
+}
+
+
+def write_track(path: str, chunks: Iterator[str]) -> None:
+    """Write chunks to a file, blocking."""
+
+    with open(path, "w", encoding="utf-8") as file:
+        for chunk in chunks:
+            file.write(chunk)
@@ -12,13 +12,15 @@ from homeassistant.components.lock import (
 )
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 
 from .const import DOMAIN, LOGGER
+from .command_queue import CommandSupersededError
 from .coordinator import VolvoData, VolvoUpdateCoordinator
 from .entity import VolvoEntity
+from .fleet import VolvoFleet
 from .volvo import ConnectedVehicle
 
 
@@ -26,6 +28,7 @@ from .volvo import ConnectedVehicle
 class VolvoLockEntityMixin:
     """Mixin values for Volvo lock entities."""
     value_fn: Callable[[VolvoData], float]
+    data_key: tuple[str, str | None]
     lock_fn: Callable[[ConnectedVehicle], Awaitable[Any]]
     unlock_fn: Callable[[ConnectedVehicle], Awaitable[Any]]
 
@@ -38,6 +41,7 @@ LOCKS = [
         key="lock",
         name="Lock",
         value_fn=lambda x: True if x.connected_vehicle_door_status.data.central_lock.value == 'LOCKED' else False,
+        data_key=("connected_vehicle_door_status", "central_lock"),
         lock_fn=lambda client: client.lock_car(),
         unlock_fn=lambda client: client.unlock_car(),
     )
@@ -47,14 +51,16 @@ async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Setup Volvo AAOS lock from config entry"""
 
-    volvo_coordinator: VolvoUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
         VolvoLockEntity(
-            coordinator = volvo_coordinator,
+            coordinator=volvo_coordinator,
             description=description
         )
+        for volvo_coordinator in fleet.coordinators.values()
         for description in LOCKS
+        if volvo_coordinator.supports(description.data_key)
     )
 
 class VolvoLockEntity(VolvoEntity, LockEntity):
@@ -63,23 +69,44 @@ class VolvoLockEntity(VolvoEntity, LockEntity):
     entity_description: VolvoLockEntityDescription
 
     def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoLockEntityDescription) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, description.data_key)
 
         self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+        self._attr_unique_id = self.unique_id_for(description.key)
 
     @property
     def is_locked(self) -> bool | None:
         return self.entity_description.value_fn(self.coordinator.data)
 
     async def async_lock(self, **kwargs: Any) -> None:
-        """Lock"""
-        self.coordinator.set_tokens()
-        await self.entity_description.lock_fn(self.coordinator.connected_vehicle)
-        await self.coordinator.update_coordinator_data(datetime=None)
+        """Lock, showing locking until the car reports it"""
+        await self._async_command("lock", self.entity_description.lock_fn)
 
     async def async_unlock(self, **kwargs: Any) -> None:
-        """Unlock"""
-        self.coordinator.set_tokens()
-        await self.entity_description.unlock_fn(self.coordinator.connected_vehicle)
-        await self.coordinator.update_coordinator_data(datetime=None)
+        """Unlock, showing unlocking until the car reports it"""
+        await self._async_command("unlock", self.entity_description.unlock_fn)
+
+    async def _async_command(self, command: str, send: Callable[[ConnectedVehicle], Awaitable[Any]]) -> None:
+        self._attr_is_locking = command == "lock"
+        self._attr_is_unlocking = command == "unlock"
+        self.async_write_ha_state()
+        try:
+            follow_up = await self.coordinator.async_send_command(command, send)
+        except CommandSupersededError as err:
+            LOGGER.debug("%s", err)
+            self._async_command_done()
+            return
+        except Exception:
+            self._async_command_done()
+            raise
+        if follow_up is None:
+            self._async_command_done()
+        else:
+            follow_up.add_done_callback(lambda _: self._async_command_done())
+
+    @callback
+    def _async_command_done(self) -> None:
+        self._attr_is_locking = False
+        self._attr_is_unlocking = False
+        if self.hass is not None:
+            self.async_write_ha_state()
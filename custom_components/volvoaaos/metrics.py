@@ -0,0 +1,194 @@
+"""Call and poll metrics for Volvo AAOS."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from .const import POLL_INTERVAL
+
+# Upper bounds in milliseconds, the last bucket takes everything slower
+LATENCY_BUCKETS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 20000, 60000)
+
+
+@dataclass
+class LatencyHistogram:
+    """Bucketed latency samples with interpolated percentiles, constant memory."""
+
+    buckets: tuple[int, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float | None = None
+
+    def add(self, milliseconds: float) -> None:
+        """Add a sample."""
+
+        self.counts[bisect.bisect_left(self.buckets, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.last = milliseconds
+
+    def percentile(self, share: float) -> float | None:
+        """Return the latency below which `share` of the samples fall, in ms."""
+
+        if not self.count:
+            return None
+        rank = share * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the samples of another histogram with the same buckets."""
+
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.last is not None:
+            self.last = other.last
+
+    def as_dict(self) -> dict:
+        """Return a summary for diagnostics."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max,
+            "buckets_ms": dict(zip([*map(str, self.buckets), "inf"], self.counts)),
+        }
+
+
+@dataclass
+class EndpointStats:
+    """Counters and latency of one endpoint."""
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict:
+        """Return a summary for diagnostics."""
+        return {"calls": self.calls, "errors": self.errors, "timeouts": self.timeouts, "latency": self.latency.as_dict()}
+
+
+@dataclass
+class CommandStats:
+    """Outcome and latency of one command, from sending to the car reporting it done."""
+
+    sent: int = 0
+    confirmed: int = 0
+    unconfirmed: int = 0
+    confirm_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict:
+        """Return a summary for diagnostics."""
+        return {
+            "sent": self.sent,
+            "confirmed": self.confirmed,
+            "unconfirmed": self.unconfirmed,
+            "confirm_latency": self.confirm_latency.as_dict(),
+        }
+
+
+class VolvoMetrics:
+    """API call and poll cycle metrics of one vehicle.
+
+    Calls are timed from the first attempt to the final response, so retries
+    and token refreshes count towards one call. Cache hits are not counted.
+    """
+
+    def __init__(self) -> None:
+        """Initialize metrics."""
+
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.polls = LatencyHistogram()
+        # Time a poll may take before it delays the next scheduled one
+        self.poll_budget: timedelta = POLL_INTERVAL
+        self.poll_overruns = 0
+        self.commands: dict[str, CommandStats] = {}
+
+    def record_call(self, endpoint: str, milliseconds: float | None, error: bool = False, timeout: bool = False) -> None:
+        """Count a call, milliseconds None for calls that never reached the host."""
+
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.calls += 1
+        stats.errors += error or timeout
+        stats.timeouts += timeout
+        if milliseconds is not None:
+            stats.latency.add(milliseconds)
+
+    def record_command(self, command: str, milliseconds: float | None) -> None:
+        """Count a sent command, milliseconds until confirmed or None if it never was."""
+
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = CommandStats()
+        stats.sent += 1
+        if milliseconds is None:
+            stats.unconfirmed += 1
+        else:
+            stats.confirmed += 1
+            stats.confirm_latency.add(milliseconds)
+
+    def record_poll(self, milliseconds: float) -> None:
+        """Count a poll cycle of the vehicle."""
+
+        self.polls.add(milliseconds)
+        if milliseconds > self.poll_budget.total_seconds() * 1000:
+            self.poll_overruns += 1
+
+    @property
+    def calls(self) -> int:
+        """Return calls over all endpoints."""
+        return sum(stats.calls for stats in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        """Return failed calls over all endpoints."""
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    @property
+    def timeouts(self) -> int:
+        """Return timed out calls over all endpoints."""
+        return sum(stats.timeouts for stats in self.endpoints.values())
+
+    def latency(self) -> LatencyHistogram:
+        """Return the latency over all endpoints."""
+
+        latency = LatencyHistogram()
+        for stats in self.endpoints.values():
+            latency.merge(stats.latency)
+        return latency
+
+    @property
+    def poll_budget_used(self) -> float | None:
+        """Return the last poll duration as a percentage of the poll budget."""
+
+        if self.polls.last is None:
+            return None
+        return self.polls.last / (self.poll_budget.total_seconds() * 1000) * 100
+
+    def as_dict(self) -> dict:
+        """Return every metric for diagnostics."""
+        return {
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+            "polls": self.polls.as_dict(),
+            "poll_budget_s": self.poll_budget.total_seconds(),
+            "poll_overruns": self.poll_overruns,
+            "commands": {name: stats.as_dict() for name, stats in self.commands.items()},
+        }
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from .decode import PYDANTIC_V2
 
 ### Authentication ###
 
@@ -123,6 +125,10 @@ class Descriptions(BaseModel):
 
 
 class GetVehicleData(BaseModel):
+    if PYDANTIC_V2:
+        # model_year is a field, not a pydantic model_ method
+        model_config = ConfigDict(protected_namespaces=())
+
     model_year: str = Field(..., alias='modelYear')
     vin: str
     external_colour: str = Field(..., alias='externalColour')
@@ -296,3 +302,116 @@ class LocationModel(BaseModel):
     status: int
     operationId: str
     data: LocationData
+
+### Status endpoints without entities ###
+
+class StatusValue(BaseModel):
+    """Value, unit and time of a status reading."""
+
+    value: str | int | float
+    unit: str | None = None
+    timestamp: str
+
+
+class OdometerData(BaseModel):
+    """Data of the odometer status."""
+
+    odometer: StatusValue
+
+
+class OdometerModel(BaseModel):
+    """Model for the odometer status."""
+
+    data: OdometerData
+
+
+class TyreData(BaseModel):
+    """Data of the tyre pressure warnings."""
+
+    front_left: StatusValue = Field(..., alias='frontLeft')
+    front_right: StatusValue = Field(..., alias='frontRight')
+    rear_left: StatusValue = Field(..., alias='rearLeft')
+    rear_right: StatusValue = Field(..., alias='rearRight')
+
+
+class TyreModel(BaseModel):
+    """Model for the tyre pressure warnings."""
+
+    data: TyreData
+
+
+class EngineStatusData(BaseModel):
+    """Data of the engine running status."""
+
+    engine_status: StatusValue = Field(..., alias='engineStatus')
+
+
+class EngineStatusModel(BaseModel):
+    """Model for the engine running status."""
+
+    data: EngineStatusData
+
+
+class EngineData(BaseModel):
+    """Data of the engine fluid warnings."""
+
+    oil_level_warning: StatusValue | None = Field(None, alias='oilLevelWarning')
+    engine_coolant_level_warning: StatusValue | None = Field(None, alias='engineCoolantLevelWarning')
+
+
+class EngineModel(BaseModel):
+    """Model for the engine fluid warnings."""
+
+    data: EngineData
+
+
+class BrakeData(BaseModel):
+    """Data of the brake fluid warning."""
+
+    brake_fluid_level_warning: StatusValue = Field(..., alias='brakeFluidLevelWarning')
+
+
+class BrakeModel(BaseModel):
+    """Model for the brake fluid warning."""
+
+    data: BrakeData
+
+
+class DiagnosticsData(BaseModel):
+    """Data of the service and washer fluid diagnostics."""
+
+    service_warning: StatusValue | None = Field(None, alias='serviceWarning')
+    engine_hours_to_service: StatusValue | None = Field(None, alias='engineHoursToService')
+    distance_to_service: StatusValue | None = Field(None, alias='distanceToService')
+    washer_fluid_level_warning: StatusValue | None = Field(None, alias='washerFluidLevelWarning')
+    time_to_service: StatusValue | None = Field(None, alias='timeToService')
+
+
+class DiagnosticsModel(BaseModel):
+    """Model for the service and washer fluid diagnostics."""
+
+    data: DiagnosticsData
+
+
+class WarningsModel(BaseModel):
+    """Model for the vehicle warnings, by warning name."""
+
+    data: dict[str, StatusValue]
+
+
+class FuelData(BaseModel):
+    """Data of the fuel amount."""
+
+    fuel_amount: StatusValue = Field(..., alias='fuelAmount')
+
+
+class FuelModel(BaseModel):
+    """Model for the fuel amount."""
+
+    data: FuelData
+
+
+class StatisticsModel(BaseModel):
+    """Model for the trip statistics, by statistic name."""
+
+    data: dict[str, StatusValue]
@@ -0,0 +1,49 @@
+"""Demand-driven fetch planning for Volvo AAOS vehicles."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+
+
+class FetchPlanner:
+    """VolvoData fields read by the enabled entities of one vehicle.
+
+    Entities add the field of their data_key when added to Home Assistant
+    and drop it when removed, which disabling them in the entity registry
+    does. Enabling one reloads the config entry, which adds it. Until
+    `ready`, i.e. while the platforms are set up, every field is planned.
+    """
+
+    def __init__(self) -> None:
+        """Initialize planner without demand."""
+
+        self.demand: Counter[str] = Counter()
+        self.ready = False
+
+    def add(self, key: str) -> Callable[[], None]:
+        """Demand a field, return the callable dropping the demand again.
+
+        Calling it more than once drops the demand once.
+        """
+
+        self.demand[key] += 1
+        removed = False
+
+        def remove() -> None:
+            nonlocal removed
+            if removed:
+                return
+            removed = True
+            self.demand[key] -= 1
+            if self.demand[key] <= 0:
+                del self.demand[key]
+
+        return remove
+
+    def plan(self, keys: Iterable[str]) -> set[str]:
+        """Return the fields among keys to fetch."""
+
+        if not self.ready:
+            return set(keys)
+        return {key for key in keys if key in self.demand}
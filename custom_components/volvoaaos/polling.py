@@ -0,0 +1,218 @@
+"""State-adaptive polling cadence for Volvo AAOS endpoints."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+# Scheduler ticks drift by a few seconds, do not skip a cycle because of it
+DUE_TOLERANCE = 5
+# Cadence of the endpoints of a charging or unlocked car, faster than POLL_INTERVAL
+ACTIVE_POLL_INTERVAL = timedelta(seconds=30)
+
+
+def _is_charging(data) -> bool:
+    status = getattr(getattr(data.energy, 'data', None), 'charging_system_status', None)
+    return status is not None and status.value == 'CHARGING_SYSTEM_CHARGING'
+
+
+def _is_unlocked(data) -> bool:
+    # Vehicles without the doors endpoint count as locked
+    if data.connected_vehicle_door_status is None:
+        return False
+    return data.connected_vehicle_door_status.data.central_lock.value != 'LOCKED'
+
+
+def _never(data) -> bool:
+    return False
+
+
+@dataclass
+class EndpointSchedule:
+    """Poll cadence of one endpoint.
+
+    The endpoint is polled every `fast` while `is_active` holds for the latest
+    snapshot or while it changed within the last `idle_cycles` polls, and every
+    `slow` otherwise.
+    """
+
+    fast: timedelta
+    slow: timedelta
+    idle_cycles: int
+    is_active: Callable[[Any], bool]
+
+
+ENDPOINT_SCHEDULES = {
+    "energy": EndpointSchedule(
+        fast=ACTIVE_POLL_INTERVAL,
+        slow=timedelta(minutes=10),
+        idle_cycles=3,
+        is_active=_is_charging,
+    ),
+    "connected_vehicle_door_status": EndpointSchedule(
+        fast=ACTIVE_POLL_INTERVAL,
+        slow=timedelta(minutes=10),
+        idle_cycles=5,
+        is_active=_is_unlocked,
+    ),
+    "connected_vehicle_window_status": EndpointSchedule(
+        fast=ACTIVE_POLL_INTERVAL,
+        slow=timedelta(minutes=10),
+        idle_cycles=5,
+        is_active=_is_unlocked,
+    ),
+    "location": EndpointSchedule(
+        fast=ACTIVE_POLL_INTERVAL,
+        slow=timedelta(minutes=5),
+        idle_cycles=5,
+        is_active=_is_unlocked,
+    ),
+    # Low-frequency tier, these change over days
+    "connected_vehicle_odometer": EndpointSchedule(
+        fast=timedelta(minutes=30),
+        slow=timedelta(hours=2),
+        idle_cycles=1,
+        is_active=_is_unlocked,
+    ),
+    "connected_vehicle_tyre_status": EndpointSchedule(
+        fast=timedelta(hours=1),
+        slow=timedelta(hours=6),
+        idle_cycles=1,
+        is_active=_is_unlocked,
+    ),
+    **{
+        key: EndpointSchedule(
+            fast=timedelta(hours=6),
+            slow=timedelta(hours=6),
+            idle_cycles=0,
+            is_active=_never,
+        )
+        for key in (
+            "connected_vehicle_brake_status",
+            "connected_vehicle_diagnostics",
+            "connected_vehicle_engine_diagnostics",
+            "connected_vehicle_warnings",
+        )
+    },
+}
+
+
+class AdaptivePollPolicy:
+    """Track per-endpoint due times from vehicle state and recent changes."""
+
+    def __init__(self, schedules: dict[str, EndpointSchedule] = ENDPOINT_SCHEDULES) -> None:
+        """Initialize policy, every endpoint is due on the first poll."""
+
+        self.schedules = schedules
+        self.unchanged: dict[str, int] = {key: 0 for key in schedules}
+        self.next_due: dict[str, float] = {key: 0.0 for key in schedules}
+        # Endpoint: (monotonic time a boost ends, interval while boosted)
+        self.boosts: dict[str, tuple[float, timedelta]] = {}
+
+    @property
+    def shortest_interval(self) -> timedelta:
+        """Return the fastest cadence of any endpoint."""
+        return min(schedule.fast for schedule in self.schedules.values())
+
+    def interval(self, key: str, data, now: float | None = None) -> timedelta:
+        """Return the current poll interval of an endpoint."""
+
+        schedule = self.schedules[key]
+        if data is None or schedule.is_active(data) or self.unchanged[key] < schedule.idle_cycles:
+            interval = schedule.fast
+        else:
+            interval = schedule.slow
+        if now is None:
+            now = time.monotonic()
+        until, boosted = self.boosts.get(key, (0.0, interval))
+        if now < until:
+            return min(interval, boosted)
+        return interval
+
+    def boost(self, key: str, duration: timedelta, interval: timedelta, now: float | None = None) -> None:
+        """Poll an endpoint at least every `interval` for `duration`, e.g. near a geofence."""
+
+        if key not in self.schedules:
+            return
+        if now is None:
+            now = time.monotonic()
+        until, _ = self.boosts.get(key, (0.0, interval))
+        self.boosts[key] = (max(until, now + duration.total_seconds()), interval)
+        self.next_due[key] = min(self.next_due[key], now + interval.total_seconds())
+
+    def due(self, keys: Iterable[str], now: float | None = None) -> set[str]:
+        """Return the endpoints among keys that should be polled now."""
+
+        if now is None:
+            now = time.monotonic()
+        return {
+            key for key in keys
+            if key not in self.schedules or now + DUE_TOLERANCE >= self.next_due[key]
+        }
+
+    def record(self, previous, data, polled: Iterable[str], now: float | None = None) -> None:
+        """Update change counters and due times after a poll.
+
+        Endpoints that failed should not be passed in `polled`, so they stay due.
+        """
+
+        if now is None:
+            now = time.monotonic()
+        for key in polled:
+            if key not in self.schedules:
+                continue
+            if previous is not None and getattr(previous, key) == getattr(data, key):
+                self.unchanged[key] += 1
+            else:
+                self.unchanged[key] = 0
+            self.next_due[key] = now + self.interval(key, data, now).total_seconds()
+
+    def reset(self) -> None:
+        """Make every endpoint fast and due, e.g. after a command."""
+
+        for key in self.schedules:
+            self.unchanged[key] = 0
+            self.next_due[key] = 0.0
+
+
+def poll_cycle(poll_interval: timedelta, policies: Iterable[AdaptivePollPolicy]) -> timedelta:
+    """Return how often a fleet visits each vehicle.
+
+    That is poll_interval, or the shortest interval of the policies if an
+    endpoint is polled faster. Visits without due endpoints send no request.
+    """
+    return min([poll_interval, *(policy.shortest_interval for policy in policies)])
+
+
+# Seconds between re-polls after a command, and the time given up after
+COMMAND_FOLLOW_UP_DELAYS = (2, 2, 3, 5, 5, 8, 10, 15, 20, 20)
+COMMAND_FOLLOW_UP_DEADLINE = 90
+
+
+@dataclass
+class CommandFollowUp:
+    """Endpoint to re-poll after a command and the state that confirms it.
+
+    With `confirmed` None the endpoint is polled once, for commands whose
+    effect the API does not report.
+    """
+
+    key: str
+    confirmed: Callable[[Any], bool] | None
+
+
+COMMAND_FOLLOW_UPS = {
+    "lock": CommandFollowUp(
+        key="connected_vehicle_door_status",
+        confirmed=lambda data: not _is_unlocked(data),
+    ),
+    "unlock": CommandFollowUp(
+        key="connected_vehicle_door_status",
+        confirmed=_is_unlocked,
+    ),
+    "climatization-start": CommandFollowUp(key="energy", confirmed=None),
+    "climatization-stop": CommandFollowUp(key="energy", confirmed=None),
+}
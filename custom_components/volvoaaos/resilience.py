@@ -0,0 +1,219 @@
+"""Retry, backoff and circuit breaker for Volvo AAOS API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+from aiohttp import ClientConnectionError, ClientConnectorError, ClientResponseError
+from aiohttp.hdrs import RETRY_AFTER
+
+from .const import LOGGER
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the host's breaker is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        """Initialize error."""
+        super().__init__(f"Circuit breaker for {host} is open, retry in {retry_in:.0f} s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def is_server_failure(err: BaseException) -> bool:
+    """Return True if the error means the host is failing, not the request."""
+
+    if isinstance(err, ClientResponseError):
+        return err.status >= 500
+    return isinstance(err, asyncio.TimeoutError | ClientConnectionError)
+
+
+def retry_after(err: BaseException) -> float | None:
+    """Return the Retry-After delay in seconds of a response error, if any."""
+
+    if not isinstance(err, ClientResponseError) or not err.headers:
+        return None
+    value = err.headers.get(RETRY_AFTER)
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request."""
+
+    max_tries: int
+    retry_statuses: frozenset[int]
+    retry_timeouts: bool
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    # A Retry-After longer than this is not waited for, the error is raised
+    max_retry_after: float = 30.0
+    # Retries after a timeout, each one already took the full request timeout
+    max_timeout_retries: int = 1
+    # Seconds from the first attempt all attempts and waits must fit in, None for no limit
+    deadline: float | None = None
+
+    def retry_delay(self, err: BaseException, attempt: int, elapsed: float = 0.0, timeouts: int = 0) -> float | None:
+        """Return seconds to wait before the next attempt, or None to give up.
+
+        elapsed is the time since the first attempt and timeouts the number
+        of attempts that timed out, this one included. A retry is only
+        made if at least base_delay of the deadline is left after the wait.
+        """
+
+        if attempt >= self.max_tries:
+            return None
+
+        if isinstance(err, ClientResponseError):
+            if err.status not in self.retry_statuses:
+                return None
+            if (delay := retry_after(err)) is not None:
+                if delay > self.max_retry_after:
+                    return None
+                return self._within_deadline(delay, elapsed)
+        elif isinstance(err, asyncio.TimeoutError):
+            if not self.retry_timeouts or timeouts > self.max_timeout_retries:
+                return None
+        elif isinstance(err, ClientConnectionError):
+            # A command may only be resent if it never reached the host
+            if not self.retry_timeouts and not isinstance(err, ClientConnectorError):
+                return None
+        else:
+            return None
+
+        # Exponential backoff with full jitter
+        return self._within_deadline(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))), elapsed)
+
+    def _within_deadline(self, delay: float, elapsed: float) -> float | None:
+        if self.deadline is not None and elapsed + delay + self.base_delay > self.deadline:
+            return None
+        return delay
+
+    def remaining(self, elapsed: float) -> float | None:
+        """Return seconds left of the deadline, None without one."""
+        return None if self.deadline is None else max(self.deadline - elapsed, 0.0)
+
+
+# GETs are idempotent, retry server errors and one timeout. The deadline
+# keeps a read, retries included, within half of the 60 s poll interval.
+READ_RETRY = RetryPolicy(
+    max_tries=3,
+    retry_statuses=frozenset({429, 500, 502, 503, 504}),
+    retry_timeouts=True,
+    deadline=30.0,
+)
+
+# Commands are not, only retry when the host rejected them before acting
+COMMAND_RETRY = RetryPolicy(
+    max_tries=2,
+    retry_statuses=frozenset({429, 503}),
+    retry_timeouts=False,
+)
+
+
+@dataclass
+class CircuitBreaker:
+    """Stop sending requests to a host after repeated server failures.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    requests fail fast with CircuitOpenError. After `reset_timeout` seconds a
+    single probe request is let through, its success closes the breaker.
+    """
+
+    host: str
+    failure_threshold: int = 5
+    reset_timeout: float = 60.0
+    failures: int = 0
+    opened_at: float | None = None
+    open_count: int = 0
+    _probing: bool = field(default=False, repr=False)
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+
+        if self.opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    @property
+    def available(self) -> bool:
+        """Return False while requests to the host fail fast."""
+        return self.state != STATE_OPEN
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError if a request may not be sent now."""
+
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        retry_in = max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+        raise CircuitOpenError(self.host, retry_in)
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+
+        if self.opened_at is not None:
+            LOGGER.info("Volvo API host %s is reachable again", self.host)
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def cancel_probe(self) -> None:
+        """Let another request probe the host after a cancelled probe."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a server failure, opening the breaker at the threshold."""
+
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                LOGGER.warning("Volvo API host %s is failing, pausing requests for %.0f s", self.host, self.reset_timeout)
+                self.open_count += 1
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class CircuitBreakers:
+    """Circuit breakers by host, shared by every client using the registry."""
+
+    def __init__(self) -> None:
+        """Initialize registry."""
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        """Return the breaker of a host, creating it on first use."""
+
+        if (breaker := self._breakers.get(host)) is None:
+            breaker = self._breakers[host] = CircuitBreaker(host)
+        return breaker
+
+    def __iter__(self):
+        """Iterate over known breakers."""
+        return iter(self._breakers.values())
+
+
+BREAKERS = CircuitBreakers()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -13,22 +14,28 @@ from homeassistant.components.sensor import (
 )
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, PERCENTAGE, LENGTH_KILOMETERS, TIME_MINUTES
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfEnergy, UnitOfTime, PERCENTAGE, LENGTH_KILOMETERS, TIME_MINUTES
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 
-from .const import DOMAIN, LOGGER
+from .const import DOMAIN, LOGGER, CONF_FLEET
 
-from .coordinator import VolvoData, VolvoUpdateCoordinator
+from .charging_history import ChargingHistory
+from .coordinator import METRICS_KEY, VolvoData, VolvoUpdateCoordinator
 
 from .entity import VolvoEntity
+from .fleet import VolvoFleet
+from .geofence import signal_occupancy, signal_zones
 
 @dataclass
 class VolvoEntityMixin:
     """Mixin values for Volvo entities."""
 
     value_fn: Callable[[VolvoData], float]
+    data_key: tuple[str, str | None]
     attr_name: str | None
     attr_fn: Callable[[VolvoData], float | None]
 
@@ -45,6 +52,7 @@ SENSORS = [
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=0,
         value_fn=lambda x: x.energy.data.battery_charge_level.value if hasattr(x.energy.data, 'battery_charge_level') else None,
+        data_key=("energy", "battery_charge_level"),
         attr_name=None,
         attr_fn=None,
     ),
@@ -56,6 +64,7 @@ SENSORS = [
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=0,
         value_fn=lambda x: x.energy.data.electric_range.value if hasattr(x.energy.data, 'electric_range') else None,
+        data_key=("energy", "electric_range"),
         attr_name=None,
         attr_fn=None,
     ),
@@ -67,6 +76,7 @@ SENSORS = [
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=0,
         value_fn=lambda x: x.energy.data.estimated_charging_time.value if hasattr(x.energy.data, 'estimated_charging_time') else None,
+        data_key=("energy", "estimated_charging_time"),
         attr_name=None,
         attr_fn=None,
     ),
@@ -74,6 +84,7 @@ SENSORS = [
         key="charging_connection_status",
         name="Charging Connection Status",
         value_fn=lambda x: x.energy.data.charging_connection_status.value if hasattr(x.energy.data, 'charging_connection_status') else None,
+        data_key=("energy", "charging_connection_status"),
         attr_name=None,
         attr_fn=None,
     ),
@@ -81,23 +92,194 @@ SENSORS = [
         key="charging_system_status",
         name="Charging System Status",
         value_fn=lambda x: x.energy.data.charging_system_status.value if hasattr(x.energy.data, 'charging_system_status') else None,
+        data_key=("energy", "charging_system_status"),
         attr_name=None,
         attr_fn=None,
+    ),
+    VolvoEntityDescription(
+        key="odometer",
+        name="Odometer",
+        icon="mdi:counter",
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=LENGTH_KILOMETERS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda x: x.connected_vehicle_odometer.data.odometer.value if x.connected_vehicle_odometer is not None else None,
+        data_key=("connected_vehicle_odometer", "odometer"),
+        attr_name=None,
+        attr_fn=None,
+    ),
+    VolvoEntityDescription(
+        key="distance_to_service",
+        name="Distance to service",
+        icon="mdi:wrench-clock",
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=LENGTH_KILOMETERS,
+        suggested_display_precision=0,
+        value_fn=lambda x: _status_value(x.connected_vehicle_diagnostics, "distance_to_service"),
+        data_key=("connected_vehicle_diagnostics", "distance_to_service"),
+        attr_name=None,
+        attr_fn=None,
+    ),
+]
+
+def _status_value(model, attribute: str):
+    """Return the value of a status of an optional low-frequency tier model."""
+    status = getattr(getattr(model, "data", None), attribute, None)
+    return status.value if status is not None else None
+
+@dataclass
+class VolvoChargingEntityMixin:
+    """Mixin values for Volvo entities estimated from the charging history."""
+
+    value_fn: Callable[[ChargingHistory], Any]
+
+@dataclass
+class VolvoChargingEntityDescription(SensorEntityDescription, VolvoChargingEntityMixin):
+    """Class describing Volvo AAOS charging estimate sensor entities."""
+
+CHARGING_SENSORS = [
+    VolvoChargingEntityDescription(
+        key="charge_rate",
+        name="Charge rate",
+        native_unit_of_measurement=f"{PERCENTAGE}/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda x: x.charge_rate(),
+    ),
+    VolvoChargingEntityDescription(
+        key="estimated_full",
+        name="Estimated full",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda x: x.estimated_full(),
+    ),
+]
+
+@dataclass
+class VolvoDiagnosticEntityMixin:
+    """Mixin values for Volvo diagnostic entities."""
+
+    value_fn: Callable[[VolvoUpdateCoordinator], float | None]
+    attr_fn: Callable[[VolvoUpdateCoordinator], dict[str, Any]] | None
+
+@dataclass
+class VolvoDiagnosticEntityDescription(SensorEntityDescription, VolvoDiagnosticEntityMixin):
+    """Class describing Volvo AAOS diagnostic sensor entities showing API and poll metrics."""
+
+    entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+
+
+def _latency_description(key: str, name: str, share: float) -> VolvoDiagnosticEntityDescription:
+    return VolvoDiagnosticEntityDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda x: x.metrics.latency().percentile(share),
+        attr_fn=lambda x: {endpoint: stats.latency.percentile(share) for endpoint, stats in x.metrics.endpoints.items()},
     )
+
+
+DIAGNOSTIC_SENSORS = [
+    _latency_description("api_latency_p50", "API latency p50", 0.5),
+    _latency_description("api_latency_p95", "API latency p95", 0.95),
+    _latency_description("api_latency_p99", "API latency p99", 0.99),
+    VolvoDiagnosticEntityDescription(
+        key="api_calls",
+        name="API calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda x: x.metrics.calls,
+        attr_fn=lambda x: {name: stats.calls for name, stats in x.metrics.endpoints.items()},
+    ),
+    VolvoDiagnosticEntityDescription(
+        key="api_errors",
+        name="API errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda x: x.metrics.errors,
+        attr_fn=lambda x: {name: stats.errors for name, stats in x.metrics.endpoints.items()},
+    ),
+    VolvoDiagnosticEntityDescription(
+        key="api_timeouts",
+        name="API timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda x: x.metrics.timeouts,
+        attr_fn=lambda x: {name: stats.timeouts for name, stats in x.metrics.endpoints.items()},
+    ),
+    VolvoDiagnosticEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda x: x.metrics.polls.last,
+        attr_fn=lambda x: {
+            "p95": x.metrics.polls.percentile(0.95),
+            "max": x.metrics.polls.max,
+            "budget_used": x.metrics.poll_budget_used,
+            "overruns": x.metrics.poll_overruns,
+        },
+    ),
+    VolvoDiagnosticEntityDescription(
+        key="token_refreshes",
+        name="Token refreshes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda x: x.token_manager.refresh_count,
+        attr_fn=None,
+    ),
 ]
 
 async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Setup Volvo AAOS sensors from config entry"""
-    volvo_coordinator: VolvoUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    fleet: VolvoFleet = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
         VolvoSensorEntity(
             coordinator=volvo_coordinator,
             description=description
         )
+        for volvo_coordinator in fleet.coordinators.values()
         for description in SENSORS
+        if volvo_coordinator.supports(description.data_key)
     )
+    async_add_entities(
+        VolvoChargingSensorEntity(
+            coordinator=volvo_coordinator,
+            description=description
+        )
+        for volvo_coordinator in fleet.coordinators.values()
+        for description in CHARGING_SENSORS
+        if volvo_coordinator.supports(("energy", "battery_charge_level"))
+    )
+    if entry.data.get(CONF_FLEET):
+        async_setup_zone_sensors(hass, entry, fleet, async_add_entities)
+    async_add_entities(
+        VolvoDiagnosticSensorEntity(
+            coordinator=volvo_coordinator,
+            description=description
+        )
+        for volvo_coordinator in fleet.coordinators.values()
+        for description in DIAGNOSTIC_SENSORS
+    )
+
+@callback
+def async_setup_zone_sensors(hass: HomeAssistant, entry: ConfigEntry, fleet: VolvoFleet, async_add_entities: AddEntitiesCallback) -> None:
+    """Add an occupancy sensor per zone, and for zones added later."""
+
+    added: set[str] = set()
+
+    @callback
+    def _async_add_new_zones() -> None:
+        new = [entity_id for entity_id in fleet.geofence.zones if entity_id not in added]
+        added.update(new)
+        async_add_entities(VolvoZoneOccupancySensorEntity(fleet, entity_id) for entity_id in new)
+
+    _async_add_new_zones()
+    entry.async_on_unload(async_dispatcher_connect(hass, signal_zones(entry.entry_id), _async_add_new_zones))
 
 class VolvoSensorEntity(VolvoEntity, SensorEntity):
     """Representation of a Volvo AAOS sensor."""
@@ -106,12 +288,112 @@ class VolvoSensorEntity(VolvoEntity, SensorEntity):
 
     def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoEntityDescription) -> None:
         """Initiate Volvo AAOS sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, description.data_key)
 
         self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+        self._attr_unique_id = self.unique_id_for(description.key)
 
     @property
     def native_value(self):
         """Return sensor value."""
-        return self.entity_description.value_fn(self.coordinator.data)
\ No newline at end of file
+        return self.entity_description.value_fn(self.coordinator.data)
+
+class VolvoChargingSensorEntity(VolvoEntity, SensorEntity):
+    """Representation of a Volvo AAOS charge rate or ETA, estimated locally."""
+
+    entity_description: VolvoChargingEntityDescription
+
+    def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoChargingEntityDescription) -> None:
+        """Initiate Volvo AAOS charging estimate sensor."""
+        super().__init__(coordinator, ("energy", None))
+
+        self.entity_description = description
+        self._attr_unique_id = self.unique_id_for(description.key)
+
+    @property
+    def native_value(self):
+        """Return estimate."""
+        return self.entity_description.value_fn(self.coordinator.charging_history)
+
+class VolvoDiagnosticSensorEntity(VolvoEntity, SensorEntity):
+    """Representation of a Volvo AAOS API or poll metric."""
+
+    entity_description: VolvoDiagnosticEntityDescription
+
+    def __init__(self, coordinator: VolvoUpdateCoordinator, description: VolvoDiagnosticEntityDescription) -> None:
+        """Initiate Volvo AAOS diagnostic sensor."""
+        super().__init__(coordinator, METRICS_KEY)
+
+        self.entity_description = description
+        self._attr_unique_id = self.unique_id_for(description.key)
+
+    @property
+    def available(self) -> bool:
+        """Metrics stay available while the API fails, that is when they matter."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return metric value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return per-endpoint values."""
+        if self.entity_description.attr_fn is None:
+            return None
+        return self.entity_description.attr_fn(self.coordinator)
+
+class VolvoZoneOccupancySensorEntity(SensorEntity):
+    """Number of fleet vehicles in a Home Assistant zone."""
+
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = "vehicles"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:car-multiple"
+
+    def __init__(self, fleet: VolvoFleet, zone: str) -> None:
+        """Initiate Volvo AAOS zone occupancy sensor."""
+
+        self.fleet = fleet
+        self.zone = zone
+        self._attr_name = f"Volvo {fleet.geofence.zones[zone].name} occupancy"
+        self._attr_unique_id = f"{fleet.config_entry.entry_id}_{zone}_occupancy"
+
+    async def async_added_to_hass(self) -> None:
+        """Update when vehicles enter or leave the zone, or the zones change.
+
+        The vehicles' locations are polled while the sensor exists.
+        """
+
+        entry_id = self.fleet.config_entry.entry_id
+        for coordinator in self.fleet.coordinators.values():
+            self.async_on_remove(coordinator.async_add_demand(("location", None)))
+        self.async_on_remove(async_dispatcher_connect(self.hass, signal_occupancy(entry_id), self._async_occupancy_changed))
+        self.async_on_remove(async_dispatcher_connect(self.hass, signal_zones(entry_id), self.async_write_ha_state))
+
+    @callback
+    def _async_occupancy_changed(self, zones: set[str]) -> None:
+        if self.zone in zones:
+            self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Return False once the zone is deleted."""
+        return self.zone in self.fleet.geofence.zones
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of vehicles in the zone."""
+        return len(self.fleet.geofence.occupants(self.zone))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the names of the vehicles in the zone."""
+        return {
+            "vehicles": [
+                self.fleet.coordinators[vin].vehicle_name
+                for vin in self.fleet.geofence.occupants(self.zone)
+                if vin in self.fleet.coordinators
+            ]
+        }
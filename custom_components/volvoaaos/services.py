@@ -0,0 +1,87 @@
+"""Services of Volvo AAOS."""
+
+from __future__ import annotations
+
+import os
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import VolvoUpdateCoordinator
+from .fleet import VolvoFleet
+from .location_history import TRACK_FORMATS, write_track
+
+SERVICE_EXPORT_TRACK = "export_track"
+ATTR_FORMAT = "format"
+
+EXPORT_TRACK_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_FORMAT, default="gpx"): vol.In(TRACK_FORMATS),
+    }
+)
+
+
+def _tracker_coordinator(hass: HomeAssistant, entity_id: str) -> VolvoUpdateCoordinator:
+    """Return the coordinator behind a Volvo AAOS device tracker."""
+
+    entity = er.async_get(hass).async_get(entity_id)
+    if entity is None or entity.platform != DOMAIN or entity.domain != Platform.DEVICE_TRACKER:
+        raise HomeAssistantError(f"{entity_id} is not a Volvo AAOS device tracker")
+
+    fleet: VolvoFleet | None = hass.data.get(DOMAIN, {}).get(entity.config_entry_id)
+    if fleet is None:
+        raise HomeAssistantError(f"{entity_id} is not loaded")
+
+    # Unique ids are "location", or "<vin>_location" in fleet mode
+    vin = entity.unique_id.rpartition("_")[0]
+    coordinator = fleet.coordinators.get(vin) if vin else next(iter(fleet.coordinators.values()), None)
+    if coordinator is None:
+        raise HomeAssistantError(f"{entity_id} has no vehicle")
+    return coordinator
+
+
+async def async_export_track(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Write the location history of a vehicle to <config>/volvoaaos/.
+
+    The points are copied in the event loop and streamed to the file in the
+    executor.
+    """
+
+    entity_id = call.data[ATTR_ENTITY_ID]
+    track_format = call.data[ATTR_FORMAT]
+    coordinator = _tracker_coordinator(hass, entity_id)
+
+    points = coordinator.location_history.points()
+    path = hass.config.path(DOMAIN, f"{entity_id.split('.', 1)[1]}.{track_format}")
+    chunks = TRACK_FORMATS[track_format](points, coordinator.vehicle_name)
+
+    def write() -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_track(path, chunks)
+
+    await hass.async_add_executor_job(write)
+
+    return {
+        "path": path,
+        "points": len(points),
+        "start": dt_util.utc_from_timestamp(points.timestamps[0] / 1000).isoformat() if len(points) else None,
+        "end": dt_util.utc_from_timestamp(points.timestamps[-1] / 1000).isoformat() if len(points) else None,
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def export_track(call: ServiceCall) -> ServiceResponse:
+        return await async_export_track(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXPORT_TRACK, export_track, schema=EXPORT_TRACK_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
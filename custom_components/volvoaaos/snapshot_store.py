@@ -0,0 +1,116 @@
+"""Persisted VolvoData snapshots for warm starts."""
+
+from __future__ import annotations
+
+from dataclasses import fields
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LOGGER
+from .compact import VehicleSnapshot, to_model
+from .coordinator import VolvoData, compact_volvo_data
+from .decode import decode_model, encode_model
+from .models import (
+    BatteryChargeLevelConnectedVehicleModel,
+    BatteryChargeLevelModel,
+    BrakeModel,
+    DiagnosticsModel,
+    EngineModel,
+    GetDoorModel,
+    GetWindowModel,
+    LocationModel,
+    OdometerModel,
+    RechargeModel,
+    TyreModel,
+    WarningsModel,
+)
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing, updates of all vehicles within it share one write
+SAVE_DELAY = 60
+
+SNAPSHOT_MODELS = {
+    model.__name__: model
+    for model in (
+        RechargeModel,
+        BatteryChargeLevelModel,
+        BatteryChargeLevelConnectedVehicleModel,
+        GetDoorModel,
+        GetWindowModel,
+        LocationModel,
+        OdometerModel,
+        TyreModel,
+        BrakeModel,
+        DiagnosticsModel,
+        EngineModel,
+        WarningsModel,
+    )
+}
+
+
+class VolvoSnapshotStore:
+    """Last VolvoData of every vehicle of a config entry, stored on disk.
+
+    Each field is kept as [model name, compact JSON] so it decodes straight
+    back into its model. Saves are delayed and batched, the snapshots are
+    only serialized when the write happens.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize snapshot store."""
+
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
+        self._snapshots: dict[str, VehicleSnapshot] = {}
+
+    async def async_load(self) -> dict[str, VehicleSnapshot]:
+        """Return the stored snapshots by VIN, skipping any that fail to decode."""
+
+        stored = await self._store.async_load() or {}
+        snapshots = {}
+        for vin, encoded in stored.items():
+            try:
+                # Fields of endpoints the vehicle does not support are not stored
+                stored_fields = {
+                    name: decode_model(SNAPSHOT_MODELS[model_name], body)
+                    for name, (model_name, body) in encoded.items()
+                }
+                snapshots[vin] = compact_volvo_data(VolvoData(
+                    **{item.name: stored_fields.get(item.name) for item in fields(VolvoData)}
+                ))
+            except Exception as e:
+                LOGGER.debug('Could not restore snapshot of %s: %s', vin, e)
+
+        self._snapshots.update(snapshots)
+        return snapshots
+
+    @callback
+    def async_schedule_save(self, vin: str, data: VehicleSnapshot) -> None:
+        """Remember the latest data of a vehicle and schedule a delayed write."""
+
+        self._snapshots[vin] = data
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write pending snapshots now."""
+
+        if self._snapshots:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the stored snapshots."""
+
+        self._snapshots.clear()
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            vin: {
+                item.name: [type(value).__name__, encode_model(value)]
+                for item in fields(VolvoData)
+                if (value := to_model(getattr(data, item.name))) is not None
+            }
+            for vin, data in self._snapshots.items()
+        }
@@ -0,0 +1,121 @@
+"""Access token manager for Volvo AAOS."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+from .const import LOGGER
+from .models import AuthModel
+
+
+class TokenManager:
+    """Hold the current access token and refresh it before it expires.
+
+    The refresh is scheduled from AuthModel.expires_in minus a safety margin.
+    Concurrent refreshes collapse into one in-flight call, so polls, lock
+    commands and buttons never race on the refresh token.
+    """
+
+    def __init__(
+        self,
+        auth,
+        refresh_token: str,
+        access_token: str | None = None,
+        on_update: Callable[[AuthModel], None] | None = None,
+        safety_margin: int = 60,
+    ) -> None:
+        """Initialize token manager."""
+
+        self.auth = auth
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.on_update = on_update
+        self.safety_margin = safety_margin
+        self.expires_at: float = 0.0
+        self.refresh_count = 0
+        self._refresh_task: asyncio.Task | None = None
+        self._scheduled: asyncio.TimerHandle | None = None
+        self._closed = False
+
+    @property
+    def expired(self) -> bool:
+        """Return True if the access token is missing or past its expiry."""
+        return self.access_token is None or time.monotonic() >= self.expires_at
+
+    def update(self, auth: AuthModel) -> None:
+        """Store new tokens and schedule the next refresh."""
+
+        self.access_token = auth.access_token
+        self.refresh_token = auth.refresh_token
+        self.expires_at = time.monotonic() + auth.expires_in
+        self._schedule_refresh(auth.expires_in)
+
+        if self.on_update is not None:
+            self.on_update(auth)
+
+    def _schedule_refresh(self, expires_in: int) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        # A refresh in flight while closing must not arm a new timer
+        if self._closed:
+            return
+
+        delay = max(expires_in - self.safety_margin, expires_in / 2)
+        self._scheduled = asyncio.get_running_loop().call_later(delay, self._scheduled_refresh)
+
+    def _scheduled_refresh(self) -> None:
+        self._scheduled = None
+        task = self._start_refresh()
+        # The failure is already logged, only mark it as retrieved
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._async_do_refresh())
+        return self._refresh_task
+
+    async def _async_do_refresh(self) -> str:
+        try:
+            auth = await self.auth.reauth(refresh_token=self.refresh_token)
+        except Exception as e:
+            LOGGER.warning("Could not refresh access token: %s", e)
+            # Retry soon instead of waiting for a 401
+            self._schedule_refresh(2 * self.safety_margin)
+            raise
+
+        self.refresh_count += 1
+        self.update(auth)
+        LOGGER.debug("Access and refresh token updated")
+        return auth.access_token
+
+    async def async_refresh(self, stale_token: str | None = None) -> str:
+        """Refresh the access token, joining a refresh that is already in flight.
+
+        If stale_token is given and the current token already differs from it,
+        another caller has refreshed in the meantime and no request is made.
+        """
+
+        if stale_token is not None and self.access_token != stale_token and not self.expired:
+            return self.access_token
+
+        return await asyncio.shield(self._start_refresh())
+
+    async def async_get_access_token(self) -> str:
+        """Return a valid access token, refreshing first if it has expired."""
+
+        if self.expired:
+            return await self.async_refresh()
+        return self.access_token
+
+    def close(self) -> None:
+        """Cancel the scheduled refresh and a refresh in flight, none is scheduled afterwards."""
+
+        self._closed = True
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
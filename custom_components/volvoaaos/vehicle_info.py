@@ -0,0 +1,265 @@
+"""Cached metadata and images of Volvo AAOS vehicles."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from aiohttp.hdrs import ETAG, IF_MODIFIED_SINCE, IF_NONE_MATCH, LAST_MODIFIED
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+from .decode import decode_model, encode_model
+from .models import GetVehicleData
+from .volvo import SNAPSHOT_CONCURRENCY, ConnectedVehicle
+
+STORAGE_VERSION = 1
+
+# Model, colour and image URLs only change with a new car on the VIN
+METADATA_MAX_AGE = timedelta(days=7)
+# How often vehicles are checked for outdated metadata or missing images
+REFRESH_INTERVAL = timedelta(days=1)
+
+# Image kind: attribute of Images holding its URL
+IMAGE_URLS = {
+    "exterior": "exterior_default_url",
+    "interior": "interior_default_url",
+}
+DEFAULT_IMAGE_CONTENT_TYPE = "image/png"
+IMAGE_TIMEOUT = ClientTimeout(total=30)
+
+
+def image_dir(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the directory of the cached images of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.images")
+
+
+def signal_vehicle_info(entry_id: str) -> str:
+    """Return the dispatcher signal sent with the VINs whose metadata or images of an entry changed."""
+    return f"{DOMAIN}_{entry_id}_vehicle_info"
+
+
+def model_name(data: GetVehicleData) -> str:
+    """Return the model and model year, e.g. "XC40 2023"."""
+    return f"{data.descriptions.model} {data.model_year}"
+
+
+def read_image(path: str) -> bytes | None:
+    """Return the content of a cached image, blocking."""
+
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_image(path: str, body: bytes) -> None:
+    """Replace a cached image, blocking. Readers never see a partly written file."""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(body)
+    os.replace(temporary, path)
+
+
+@dataclass
+class CachedImage:
+    """An image on disk and the validators to revalidate it with."""
+
+    url: str
+    path: str
+    content_type: str
+    etag: str | None
+    last_modified: str | None
+    # When the content last changed
+    updated: datetime
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the image for the store."""
+        return {
+            "url": self.url,
+            "path": self.path,
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "updated": self.updated.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> CachedImage:
+        """Return an image from the store."""
+        return cls(**{**values, "updated": dt_util.parse_datetime(values["updated"])})
+
+
+@dataclass
+class VehicleInfo:
+    """Metadata of one vehicle, when it was fetched and its cached images by kind."""
+
+    data: GetVehicleData
+    fetched: datetime
+    images: dict[str, CachedImage] = field(default_factory=dict)
+
+    @property
+    def model(self) -> str:
+        """Return the model and model year."""
+        return model_name(self.data)
+
+
+class VehicleInfoCache:
+    """Metadata and images of every vehicle of a config entry, kept on disk.
+
+    Metadata are fetched once and refreshed after METADATA_MAX_AGE. Images
+    are downloaded into image_dir and revalidated with conditional GETs
+    when the metadata are refreshed, a 304 keeps the file on disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize cache."""
+
+        self.hass = hass
+        self.directory = image_dir(hass, entry.entry_id)
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.vehicle_info")
+        self.info: dict[str, VehicleInfo] = {}
+        self.downloaded = 0
+        self.not_modified = 0
+        self.failed = 0
+
+    async def async_load(self) -> None:
+        """Load the stored metadata, forgetting images whose file is gone."""
+
+        stored = await self._store.async_load() or {}
+        info = {}
+        for vin, values in stored.items():
+            try:
+                info[vin] = VehicleInfo(
+                    decode_model(GetVehicleData, values["data"]),
+                    dt_util.parse_datetime(values["fetched"]),
+                    {kind: CachedImage.from_dict(image) for kind, image in values["images"].items()},
+                )
+            except Exception as e:
+                LOGGER.debug('Could not restore details of %s: %s', vin, e)
+
+        paths = [image.path for vehicle in info.values() for image in vehicle.images.values()]
+        existing = await self.hass.async_add_executor_job(lambda: {path for path in paths if os.path.exists(path)})
+        for vehicle in info.values():
+            vehicle.images = {kind: image for kind, image in vehicle.images.items() if image.path in existing}
+        self.info.update(info)
+
+    def is_due(self, vin: str, now: datetime) -> bool:
+        """Return True if the metadata of a VIN are outdated or an image is missing."""
+
+        info = self.info.get(vin)
+        return info is None or now - info.fetched >= METADATA_MAX_AGE or len(info.images) < len(IMAGE_URLS)
+
+    async def async_refresh(self, clients: dict[str, ConnectedVehicle], session: ClientSession, force: bool = False) -> set[str]:
+        """Fetch the metadata and images of the due VINs among clients, return the VINs that changed.
+
+        Images are downloaded with session, without the Volvo API headers.
+        """
+
+        now = dt_util.utcnow()
+        due = [vin for vin in clients if force or self.is_due(vin, now)]
+        if not due:
+            return set()
+
+        semaphore = asyncio.Semaphore(SNAPSHOT_CONCURRENCY)
+        results = await asyncio.gather(*(self._async_refresh_vehicle(clients[vin], session, semaphore, now) for vin in due))
+        await self._store.async_save(self._data_to_save())
+        return {vin for vin, changed in zip(due, results) if changed}
+
+    async def _async_refresh_vehicle(self, client: ConnectedVehicle, session: ClientSession, semaphore: asyncio.Semaphore, now: datetime) -> bool:
+        async with semaphore:
+            try:
+                response = await client.get_vehicle_data()
+            except Exception as e:
+                LOGGER.debug('Could not get details of %s: %s', client.vin, e)
+                return False
+
+            previous = self.info.get(client.vin)
+            data = response.data
+            images = dict(previous.images) if previous is not None else {}
+            changed = previous is None or previous.data != data
+            for kind, attribute in IMAGE_URLS.items():
+                url = getattr(data.images, attribute)
+                try:
+                    image = await self._async_fetch_image(session, url, os.path.join(self.directory, f"{client.vin}_{kind}"), images.get(kind))
+                except (ClientError, asyncio.TimeoutError, OSError) as e:
+                    self.failed += 1
+                    LOGGER.debug('Could not get %s image of %s: %s', kind, client.vin, e)
+                    continue
+                changed = changed or image is not images.get(kind)
+                images[kind] = image
+
+            self.info[client.vin] = VehicleInfo(data, now, images)
+            return changed
+
+    async def _async_fetch_image(self, session: ClientSession, url: str, path: str, cached: CachedImage | None) -> CachedImage:
+        """Return the cached image if the server answers 304, else download it to path."""
+
+        headers = {}
+        if cached is not None and cached.url == url:
+            if cached.etag:
+                headers[IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[IF_MODIFIED_SINCE] = cached.last_modified
+
+        async with session.get(url, headers=headers, timeout=IMAGE_TIMEOUT) as response:
+            if response.status == 304 and headers:
+                self.not_modified += 1
+                return cached
+            response.raise_for_status()
+            body = await response.read()
+            content_type = response.content_type if response.content_type.startswith("image/") else DEFAULT_IMAGE_CONTENT_TYPE
+            etag = response.headers.get(ETAG)
+            last_modified = response.headers.get(LAST_MODIFIED)
+
+        await self.hass.async_add_executor_job(write_image, path, body)
+        self.downloaded += 1
+        return CachedImage(url, path, content_type, etag, last_modified, dt_util.utcnow())
+
+    async def async_image(self, vin: str, kind: str) -> bytes | None:
+        """Return the cached image of a VIN from disk."""
+
+        info = self.info.get(vin)
+        if info is None or (image := info.images.get(kind)) is None:
+            return None
+        return await self.hass.async_add_executor_job(read_image, image.path)
+
+    async def async_remove(self) -> None:
+        """Delete the stored metadata and the images."""
+
+        self.info.clear()
+        await self._store.async_remove()
+        await self.hass.async_add_executor_job(partial(shutil.rmtree, self.directory, ignore_errors=True))
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            vin: {
+                "data": encode_model(info.data),
+                "fetched": info.fetched.isoformat(),
+                "images": {kind: image.as_dict() for kind, image in info.images.items()},
+            }
+            for vin, info in self.info.items()
+        }
+
+    def as_dict(self) -> dict:
+        """Return counters for diagnostics."""
+        return {
+            "vehicles": len(self.info),
+            "images": sum(len(info.images) for info in self.info.values()),
+            "downloaded": self.downloaded,
+            "not_modified": self.not_modified,
+            "failed": self.failed,
+        }
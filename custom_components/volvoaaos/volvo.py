@@ -1,18 +1,42 @@
 """Asynchronous Python client for Volvo AAOS"""
 from __future__ import annotations
 
-from dataclasses import dataclass, field, KW_ONLY
-from typing import Any, cast
+from collections.abc import Iterable
+from dataclasses import dataclass, field, fields, KW_ONLY
+from typing import Any
 
 import asyncio
-import backoff
+import time
+from functools import partial
 
 import async_timeout
 from aiohttp.client import ClientSession
 from aiohttp.hdrs import METH_GET, METH_POST
-
-from .models import AuthModel, RechargeModel, BatteryChargeLevelModel, GetVinModel, GetVehicleModel, GetDoorModel, StartClimateModel, StopClimateModel, LockModel, UnlockModel, GetWindowModel, LocationModel, BatteryChargeLevelConnectedVehicleModel
-from .const import LOGGER
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from .models import (
+    AuthModel,
+    BrakeModel,
+    DiagnosticsModel,
+    EngineModel,
+    EngineStatusModel,
+    FuelModel,
+    GetDoorModel,
+    GetWindowModel,
+    OdometerModel,
+    StatisticsModel,
+    TyreModel,
+    WarningsModel,
+)
+from .cache import ResponseCache
+from .connection import create_session
+from .const import LOGGER, API_URL, AUTH_URL
+from .decode import decode_model
+from .endpoints import CONNECTED_VEHICLE_ENDPOINTS, ENERGY_ENDPOINTS, LOCATION_ENDPOINTS, Endpoint
+from .metrics import VolvoMetrics
+from .resilience import BREAKERS, COMMAND_RETRY, READ_RETRY, CircuitBreaker, CircuitBreakers, CircuitOpenError, is_server_failure
+from .token_manager import TokenManager
 
 
 @dataclass
@@ -22,31 +46,169 @@ class Volvo:
     request_timeout: int = 20
     session: ClientSession | None = None
     _close_session: bool = False
+    token_manager: TokenManager | None = None
+
+    cache: ResponseCache | None = None
+    breakers: CircuitBreakers = field(default_factory=lambda: BREAKERS)
+    metrics: VolvoMetrics | None = None
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of the URL's host."""
+        return self.breakers.get(URL(url).host)
 
-    #@backoff.on_exception(backoff.expo, aiohttp.exc max_tries=4)
     async def _request(
         self,
         url: str,
         method: str = METH_GET,
         headers: dict[str, Any] | None = None,
         data: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
-        """Handle request to Volvo backend."""
+        name: str | None = None,
+    ) -> bytes:
+        """Handle request to Volvo backend and return the raw response body.
+
+        GETs go through the response cache when one is set. The body is read
+        once and decoded into a model by the caller, see decode_model.
+        Requests that reach the backend are recorded in metrics under name,
+        or the URL path.
+        """
 
         if self.session is None:
-            self.session = ClientSession()
+            self.session = create_session()
             self._close_session = True
 
-        async with async_timeout.timeout(self.request_timeout):
+        send = self._send
+        if self.metrics is not None:
+            send = partial(self._send_measured, name or URL(url).path)
+
+        if method == METH_GET and self.cache is not None:
+            return await self.cache.async_get(
+                url, lambda validators: send(url, method, headers, data, validators)
+            )
+
+        _, payload, _ = await send(url, method, headers, data)
+        return payload
+
+    async def _send_measured(self, name: str, *args: Any) -> tuple[int, bytes | None, CIMultiDictProxy[str]]:
+        """Send a request and record its latency and outcome in metrics."""
+
+        start = time.monotonic()
+        try:
+            result = await self._send(*args)
+        except CircuitOpenError:
+            self.metrics.record_call(name, None, error=True)
+            raise
+        except asyncio.TimeoutError:
+            self.metrics.record_call(name, (time.monotonic() - start) * 1000, timeout=True)
+            raise
+        except Exception:
+            self.metrics.record_call(name, (time.monotonic() - start) * 1000, error=True)
+            raise
+        self.metrics.record_call(name, (time.monotonic() - start) * 1000)
+        return result
+
+    async def _send(
+        self,
+        url: str,
+        method: str,
+        headers: dict[str, Any] | None,
+        data: dict[str, Any] | None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> tuple[int, bytes | None, CIMultiDictProxy[str]]:
+        """Send a request, retrying per method, behind the host's circuit breaker.
+
+        GETs are retried on 429, 5xx and once on a timeout, commands only when
+        the host rejected them before acting. Waits use exponential backoff
+        with jitter or the response's Retry-After. All attempts of a GET fit
+        in the policy's deadline, later attempts get a shorter timeout.
+        """
+
+        breaker = self.breaker(url)
+        policy = READ_RETRY if method == METH_GET else COMMAND_RETRY
+        start = time.monotonic()
+        attempt = 0
+        timeouts = 0
+        while True:
+            attempt += 1
+            breaker.before_request()
+            remaining = policy.remaining(time.monotonic() - start)
+            timeout = self.request_timeout if remaining is None else min(self.request_timeout, remaining)
+            try:
+                result = await self._send_once(url, method, headers, data, extra_headers, timeout)
+            except asyncio.CancelledError:
+                breaker.cancel_probe()
+                raise
+            except Exception as err:
+                if is_server_failure(err):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if isinstance(err, asyncio.TimeoutError):
+                    timeouts += 1
+                delay = policy.retry_delay(err, attempt, time.monotonic() - start, timeouts)
+                if delay is None:
+                    raise
+                LOGGER.debug("Request to %s failed (%s), retry %s in %.1f s", url, err, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return result
+
+    def _headers_with_token(self, headers: dict[str, Any] | None, token: str) -> dict[str, Any]:
+        """Return headers carrying the bearer token."""
+        return {**(headers or {}), "authorization": f"Bearer {token}"}
+
+    async def _send_once(
+        self,
+        url: str,
+        method: str,
+        headers: dict[str, Any] | None,
+        data: dict[str, Any] | None,
+        extra_headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> tuple[int, bytes | None, CIMultiDictProxy[str]]:
+        """Send one request and return status, body bytes and headers.
+
+        With a token manager the bearer token is taken from it, and a 401 is
+        answered by one transparent refresh and retry. A 304 has no body.
+        timeout defaults to request_timeout.
+        """
+
+        timeout = self.request_timeout if timeout is None else timeout
+
+        token = None
+        if self.token_manager is not None:
+            token = await self.token_manager.async_get_access_token()
+            headers = self._headers_with_token(headers, token)
+
+        async with async_timeout.timeout(timeout):
             response = await self.session.request(
                 method,
                 url,
                 data=data,
-                headers=headers,
+                headers={**headers, **extra_headers} if extra_headers else headers,
             )
-            response.raise_for_status()
 
-        return cast(dict[str, Any], await response.json())
+        if response.status == 401 and token is not None:
+            response.release()
+            LOGGER.debug("Access token rejected, refreshing and retrying %s", url)
+            token = await self.token_manager.async_refresh(stale_token=token)
+            headers = self._headers_with_token(headers, token)
+            async with async_timeout.timeout(timeout):
+                response = await self.session.request(
+                    method,
+                    url,
+                    data=data,
+                    headers={**headers, **extra_headers} if extra_headers else headers,
+                )
+
+        response.raise_for_status()
+
+        if response.status == 304:
+            response.release()
+            return response.status, None, response.headers
+
+        return response.status, await response.read(), response.headers
 
     async def close(self) -> None:
         """Close client session"""
@@ -65,13 +227,17 @@ class Volvo:
         await self.close()
 
 
+@dataclass
 class Auth(Volvo):
     """Handles Volvo auth process"""
 
+    _: KW_ONLY
+    auth_url: str = AUTH_URL
+
     async def authenticate(self, username: str, password: str) -> AuthModel:
         """Obtain credentials from Volvo"""
 
-        url = "https://volvoid.eu.volvocars.com/as/token.oauth2"
+        url = self.auth_url
 
         data = {
             "username": username,
@@ -88,12 +254,12 @@ class Auth(Volvo):
         response = await self._request(
             url, method=METH_POST, headers=headers, data=data
         )
-        return AuthModel.parse_obj(response)
+        return decode_model(AuthModel, response)
 
     async def reauth(self, refresh_token):
         """Exchange refresh token for Bearer token"""
 
-        url = "https://volvoid.eu.volvocars.com/as/token.oauth2"
+        url = self.auth_url
 
         data = {"grant_type": "refresh_token", "refresh_token": refresh_token}
 
@@ -105,188 +271,163 @@ class Auth(Volvo):
         response = await self._request(
             url=url, method=METH_POST, headers=headers, data=data
         )
-        return AuthModel.parse_obj(response)
+        return decode_model(AuthModel, response)
 
 @dataclass
-class Energy(Volvo):
-    """Handling Energy API calls"""
-
-    _: KW_ONLY
-    access_token: str = None
-    vcc_api_key: str = None
-    content_type: str = "application/json"
-    vin: str = None
-
-    async def get_recharge_status(self):
-        """Get recharge status"""
-
-        url = f"https://api.volvocars.com/energy/v1/vehicles/{self.vin}/recharge-status"
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
-
-        response = await self._request(url=url, headers=headers)
-        return RechargeModel.parse_obj(response)
-
-    async def get_battery_charge_level(self):
-        """Get battery charge state."""
-
-        url = f"https://api.volvocars.com/connected-vehicle/v1/vehicles/{self.vin}/battery-charge-level"
-        headers = {
-            "content-type": 'application/vnd.volvocars.api.connected-vehicle.vehicledata.v1+json',
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
-
-        response = await self._request(url=url, headers=headers)
-        return BatteryChargeLevelConnectedVehicleModel.parse_obj(response)
-
-
+class VolvoApiClient(Volvo):
+    """Shared plumbing for clients generated from the endpoint registry.
 
-@dataclass
-class ConnectedVehicle(Volvo):
-    """Handling Connected Vehicle API calls"""
+    URLs are built once per VIN and headers once per token and content type,
+    then reused for every call.
+    """
 
     _: KW_ONLY
     access_token: str = None
     vcc_api_key: str = None
     content_type: str = "application/json"
     vin: str | None = None
+    api_url: str = API_URL
+    _urls: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _urls_vin: str | None = field(default=None, init=False, repr=False)
+    _header_cache: dict[str, dict[str, str]] = field(default_factory=dict, init=False, repr=False)
+    _headers_token: str | None = field(default=None, init=False, repr=False)
+
+    def _url(self, endpoint: Endpoint) -> str:
+        """Return the prebuilt URL of an endpoint for the current VIN."""
+
+        if self._urls_vin != self.vin:
+            self._urls.clear()
+            self._urls_vin = self.vin
+        if (url := self._urls.get(endpoint.name)) is None:
+            url = self._urls[endpoint.name] = self.api_url + endpoint.path.format(vin=self.vin)
+        return url
+
+    def _headers(self, content_type: str, token: str | None) -> dict[str, str]:
+        """Return the prebuilt headers for a content type and token."""
+
+        if token != self._headers_token:
+            self._header_cache.clear()
+            self._headers_token = token
+        if (headers := self._header_cache.get(content_type)) is None:
+            headers = self._header_cache[content_type] = {
+                "content-type": content_type,
+                "authorization": f"Bearer {token}",
+                "vcc-api-key": self.vcc_api_key,
+            }
+        return headers
+
+    def _headers_with_token(self, headers: dict[str, Any] | None, token: str) -> dict[str, Any]:
+        """Return the prebuilt headers for the refreshed token."""
+        return self._headers(headers["content-type"], token)
+
+    async def _call(self, endpoint: Endpoint) -> Any:
+        """Call an endpoint and parse the response into its model."""
+
+        token = self.access_token
+        if self.token_manager is not None:
+            token = await self.token_manager.async_get_access_token()
 
-    async def list_vehicles(self):
-        """Get list of vehicles in relation to Volvo-id."""
-
-        url = "https://api.volvocars.com/connected-vehicle/v2/vehicles"
-
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
-
-        response = await self._request(url=url, headers=headers)
-        return GetVinModel.parse_obj(response)
-
-    async def get_vehicle_data(self):
-        """Get data of vehicle based on VIN"""
-
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}"
-
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
-
-        response = await self._request(url=url, headers=headers)
-        return GetVehicleModel.parse_obj(response)
+        response = await self._request(
+            url=self._url(endpoint),
+            method=endpoint.method,
+            headers=self._headers(endpoint.content_type or self.content_type, token),
+            name=endpoint.name,
+        )
+        if endpoint.is_command and self.cache is not None:
+            self.cache.invalidate_command(self.vin, endpoint.command)
+        return decode_model(endpoint.model, response)
 
-    async def get_door_status(self):
-        """Get status of doors"""
 
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/doors"
+def _endpoint_method(endpoint: Endpoint):
+    async def method(self):
+        return await self._call(endpoint)
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
+    method.__name__ = endpoint.name
+    method.__qualname__ = endpoint.name
+    method.__doc__ = endpoint.description
+    return method
 
-        response = await self._request(url=url, headers=headers)
-        return GetDoorModel.parse_obj(response)
 
-    async def get_window_status(self):
-        """Get status of windows."""
+def endpoint_methods(endpoints: list[Endpoint]):
+    """Class decorator adding one async method per registry entry."""
 
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/windows"
+    def decorate(cls):
+        for endpoint in endpoints:
+            setattr(cls, endpoint.name, _endpoint_method(endpoint))
+        cls.endpoints = {endpoint.name: endpoint for endpoint in endpoints}
+        return cls
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
+    return decorate
 
-        response = await self._request(url=url, headers=headers)
-        return GetWindowModel.parse_obj(response)
 
-    async def lock_car(self):
-        """Lock the car."""
+@endpoint_methods(ENERGY_ENDPOINTS)
+@dataclass
+class Energy(VolvoApiClient):
+    """Handling Energy API calls"""
 
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/commands/lock"
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
+@dataclass
+class ConnectedVehicleSnapshot:
+    """Responses of ConnectedVehicle.get_snapshot, None where not fetched or failed.
+
+    Each field is filled by the endpoint get_<field>.
+    """
+
+    door_status: GetDoorModel | None = None
+    window_status: GetWindowModel | None = None
+    odometer: OdometerModel | None = None
+    tyre_status: TyreModel | None = None
+    engine_status: EngineStatusModel | None = None
+    engine_diagnostics: EngineModel | None = None
+    brake_status: BrakeModel | None = None
+    diagnostics: DiagnosticsModel | None = None
+    warnings: WarningsModel | None = None
+    fuel_status: FuelModel | None = None
+    statistics: StatisticsModel | None = None
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    def fetched(self) -> dict[str, Any]:
+        """Return the responses that were fetched, by field."""
+        return {
+            item.name: value
+            for item in fields(self)
+            if item.name != "errors" and (value := getattr(self, item.name)) is not None
         }
 
-        response = await self._request(url=url, headers=headers, method=METH_POST)
-        return LockModel.parse_obj(response)
 
-    async def unlock_car(self):
-        """Unlock the car."""
+SNAPSHOT_FIELDS = tuple(item.name for item in fields(ConnectedVehicleSnapshot) if item.name != "errors")
 
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/commands/unlock"
+# Requests of one get_snapshot in flight at once
+SNAPSHOT_CONCURRENCY = 4
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
 
-        response = await self._request(url=url, headers=headers, method=METH_POST)
-        return UnlockModel.parse_obj(response)
-
-
-    async def  set_climate_start(self):
-        """Start climatization"""
-
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/commands/climatization-start"
+@endpoint_methods(CONNECTED_VEHICLE_ENDPOINTS)
+@dataclass
+class ConnectedVehicle(VolvoApiClient):
+    """Handling Connected Vehicle API calls"""
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
+    async def get_snapshot(self, names: Iterable[str] = SNAPSHOT_FIELDS, concurrency: int = SNAPSHOT_CONCURRENCY) -> ConnectedVehicleSnapshot:
+        """Fetch the chosen ConnectedVehicleSnapshot fields concurrently.
 
-        response = await self._request(url=url, headers=headers, method=METH_POST)
-        return StartClimateModel.parse_obj(response)
+        At most `concurrency` requests run at once. Failed endpoints are
+        left None with their error in `errors`, CircuitOpenError included.
+        """
 
-    async def  set_climate_stop(self):
-        """Stop climatization"""
+        semaphore = asyncio.Semaphore(concurrency)
+        snapshot = ConnectedVehicleSnapshot()
 
-        url = f"https://api.volvocars.com/connected-vehicle/v2/vehicles/{self.vin}/commands/climatization-stop"
+        async def fetch(name: str) -> None:
+            async with semaphore:
+                try:
+                    setattr(snapshot, name, await self._call(self.endpoints[f"get_{name}"]))
+                except Exception as err:
+                    snapshot.errors[name] = err
 
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
+        await asyncio.gather(*(fetch(name) for name in dict.fromkeys(names)))
+        return snapshot
 
-        response = await self._request(url=url, headers=headers, method=METH_POST)
-        return StopClimateModel.parse_obj(response)
 
+@endpoint_methods(LOCATION_ENDPOINTS)
 @dataclass
-class Location(Volvo):
+class Location(VolvoApiClient):
     """Handling Location API calls"""
-
-    _: KW_ONLY
-    access_token: str = None
-    vcc_api_key: str = None
-    content_type: str = "application/json"
-    vin: str = None
-
-    async def get_location(self):
-        """Get location"""
-
-        url = f"https://api.volvocars.com/location/v1/vehicles/{self.vin}/location"
-        headers = {
-            "content-type": self.content_type,
-            "authorization": f"Bearer {self.access_token}",
-            "vcc-api-key": self.vcc_api_key,
-        }
-
-        response = await self._request(url=url, headers=headers)
-        return LocationModel.parse_obj(response)
\ No newline at end of file
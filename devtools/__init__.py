@@ -0,0 +1 @@
+"""Development tools for Volvo AAOS: sample payloads, a local API stand-in and benchmarks."""
@@ -0,0 +1,424 @@
+"""Benchmark suite: poll cycle, parsing, entity values and fleet scaling.
+
+Runs the coordinators against devtools/standin.py and writes machine
+readable results, so releases can be compared. Run from the repository root
+with Home Assistant installed:
+
+    python -m devtools.bench --json bench.json
+    python -m devtools.bench --json new.json --compare bench.json
+
+Every value under "metrics" is a cost, lower is better. --compare exits
+with status 1 if any metric grew by more than --tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pydantic
+from aiohttp import ClientSession, TraceConfig
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.volvoaaos import decode
+from custom_components.volvoaaos.binary_sensor import BINARY_SENSORS
+from custom_components.volvoaaos.cache import ResponseCache
+from custom_components.volvoaaos.const import CONF_API_URL, CONF_AUTH_URL, CONF_VCC_API_KEY, DOMAIN
+from custom_components.volvoaaos.compact import VehicleSnapshot
+from custom_components.volvoaaos.coordinator import VolvoData, VolvoUpdateCoordinator, compact_volvo_data
+from custom_components.volvoaaos.endpoints import ENDPOINTS
+from custom_components.volvoaaos.models import AuthModel
+from custom_components.volvoaaos.sensor import SENSORS
+from custom_components.volvoaaos.token_manager import TokenManager
+from custom_components.volvoaaos.volvo import Auth
+
+from . import payloads
+from .standin import VolvoStandin, vins_for
+
+ROOT = Path(__file__).resolve().parent.parent
+
+VIN = vins_for(1)[0]
+
+# Sample body of every response model, keyed by endpoint name
+RESPONSE_BODIES = {
+    "get_recharge_status": payloads.recharge_status(),
+    "get_battery_charge_level": payloads.battery_charge_level(),
+    "list_vehicles": payloads.vehicles(vins_for(3)),
+    "get_vehicle_data": payloads.vehicle_data(VIN),
+    "get_door_status": payloads.doors(),
+    "get_window_status": payloads.windows(),
+    "get_odometer": payloads.odometer(),
+    "get_tyre_status": payloads.tyres(),
+    "get_engine_status": payloads.engine_status(),
+    "get_engine_diagnostics": payloads.engine(),
+    "get_brake_status": payloads.brakes(),
+    "get_diagnostics": payloads.diagnostics(),
+    "get_warnings": payloads.warnings(),
+    "get_fuel_status": payloads.fuel(),
+    "get_statistics": payloads.statistics(),
+    "lock_car": payloads.command(VIN, "lock"),
+    "unlock_car": payloads.command(VIN, "unlock"),
+    "set_climate_start": payloads.command(VIN, "climatization-start"),
+    "set_climate_stop": payloads.command(VIN, "climatization-stop"),
+    "get_location": payloads.location(),
+}
+
+
+def time_per_call(func, number: int) -> float:
+    """Return the best per-call time in microseconds over 5 repeats."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Return the nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+
+def bench_parse(number: int) -> dict:
+    """Time decode_model for the response model of every endpoint and the token response."""
+
+    missing = set(ENDPOINTS) - set(RESPONSE_BODIES)
+    if missing:
+        raise SystemExit(f"No sample body for endpoints {sorted(missing)}, add them to RESPONSE_BODIES")
+
+    cases = {name: (endpoint.model, RESPONSE_BODIES[name]) for name, endpoint in ENDPOINTS.items()}
+    cases["auth"] = (AuthModel, payloads.auth())
+
+    results = {}
+    for name, (model, payload) in cases.items():
+        body = json.dumps(payload).encode()
+        us = time_per_call(lambda: decode.decode_model(model, body), number)
+        results[name] = {
+            "model": model.__name__,
+            "bytes": len(body),
+            "us_per_decode": us,
+            "decodes_per_s": 1e6 / us,
+            "mb_per_s": len(body) / us,
+        }
+    return results
+
+
+def sample_data() -> VehicleSnapshot:
+    """Return the compact snapshot of the sample bodies, as coordinators hold it."""
+
+    def decoded(name: str):
+        return decode.decode_model(ENDPOINTS[name].model, json.dumps(RESPONSE_BODIES[name]).encode())
+
+    return compact_volvo_data(
+        VolvoData(
+            energy=decoded("get_recharge_status"),
+            connected_vehicle_door_status=decoded("get_door_status"),
+            connected_vehicle_window_status=decoded("get_window_status"),
+            location=decoded("get_location"),
+        )
+    )
+
+
+def bench_entities(number: int) -> dict:
+    """Time value_fn (and attr_fn) of every sensor and binary sensor description."""
+
+    data = sample_data()
+    results = {}
+    for platform_name, descriptions in (("sensor", SENSORS), ("binary_sensor", BINARY_SENSORS)):
+        for description in descriptions:
+            funcs = [description.value_fn]
+            if getattr(description, "attr_fn", None) is not None:
+                funcs.append(description.attr_fn)
+            results[f"{platform_name}.{description.key}"] = time_per_call(lambda: [func(data) for func in funcs], number)
+    return {"us_per_entity": results, "us_per_vehicle_update": sum(results.values())}
+
+
+class StandinThread:
+    """Run a VolvoStandin on its own event loop, so it does not share the client's loop."""
+
+    def __init__(self, standin: VolvoStandin) -> None:
+        """Initialize runner."""
+
+        self.standin = standin
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> VolvoStandin:
+        """Start the thread and the server."""
+
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.standin.start(), self.loop).result()
+        return self.standin
+
+    def __exit__(self, *_exc_info) -> None:
+        """Stop the server and the thread."""
+
+        asyncio.run_coroutine_threadsafe(self.standin.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class Traffic:
+    """Count requests and response bytes seen by the client session."""
+
+    def __init__(self) -> None:
+        """Initialize counters and trace hooks."""
+
+        self.requests = 0
+        self.bytes = 0
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_end.append(self._on_request_end)
+
+    async def _on_request_end(self, _session, _context, params) -> None:
+        self.requests += 1
+        self.bytes += params.response.content_length or 0
+
+    def reset(self) -> None:
+        """Zero the counters."""
+        self.requests = self.bytes = 0
+
+
+class PollBench:
+    """Coordinators of a simulated fleet sharing one session, token manager and cache."""
+
+    def __init__(self, hass: HomeAssistant, standin: VolvoStandin, session: ClientSession) -> None:
+        """Initialize bench."""
+
+        self.hass = hass
+        self.standin = standin
+        self.session = session
+        self.cache = ResponseCache()
+        self.entry = ConfigEntry(
+            1,
+            DOMAIN,
+            "bench",
+            {
+                CONF_USERNAME: "bench",
+                CONF_PASSWORD: "bench",
+                CONF_VCC_API_KEY: "bench",
+                CONF_API_URL: standin.api_url,
+                CONF_AUTH_URL: standin.auth_url,
+            },
+            "user",
+        )
+        self.token_manager: TokenManager | None = None
+
+    async def async_login(self) -> None:
+        """Obtain a token from the stand-in."""
+
+        auth = Auth(session=self.session, auth_url=self.standin.auth_url)
+        tokens = await auth.authenticate("bench", "bench")
+        self.token_manager = TokenManager(auth, tokens.refresh_token)
+        self.token_manager.update(tokens)
+
+    def create_coordinators(self, vins: list[str]) -> list[VolvoUpdateCoordinator]:
+        """Return a coordinator per VIN, as VolvoFleet creates them."""
+        return [
+            VolvoUpdateCoordinator(self.hass, self.entry, self.session, self.token_manager, vin, vin, True, cache=self.cache)
+            for vin in vins
+        ]
+
+    async def async_poll(self, coordinators: list[VolvoUpdateCoordinator]) -> list[float]:
+        """Run one full update of every coordinator, return each latency in ms.
+
+        The cache is cleared first, as if the previous poll were an interval ago.
+        """
+
+        self.cache.clear()
+
+        async def timed(coordinator: VolvoUpdateCoordinator) -> float:
+            start = time.perf_counter()
+            await coordinator.update_coordinator_data(None)
+            return (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(timed(coordinator) for coordinator in coordinators))
+
+
+async def bench_poll(bench: PollBench, traffic: Traffic, rounds: int) -> dict:
+    """Measure update_coordinator_data latency and traffic of a single vehicle."""
+
+    coordinators = bench.create_coordinators(vins_for(1))
+    await bench.async_poll(coordinators)
+
+    latencies = []
+    traffic.reset()
+    for _ in range(rounds):
+        latencies.extend(await bench.async_poll(coordinators))
+    if coordinators[0].data is None:
+        raise SystemExit("Polling the stand-in failed")
+
+    return {
+        "ms_p50": statistics.median(latencies),
+        "ms_p95": percentile(latencies, 0.95),
+        "requests_per_poll": traffic.requests / rounds,
+        "bytes_per_poll": traffic.bytes / rounds,
+    }
+
+
+async def bench_scaling(bench: PollBench, traffic: Traffic, sizes: list[int], rounds: int) -> dict:
+    """Measure fleet poll latency and memory per vehicle for each fleet size."""
+
+    results = {}
+    for size in sizes:
+        vins = vins_for(size)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        coordinators = bench.create_coordinators(vins)
+        await bench.async_poll(coordinators)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        walls = []
+        latencies = []
+        traffic.reset()
+        for _ in range(rounds):
+            start = time.perf_counter()
+            latencies.extend(await bench.async_poll(coordinators))
+            walls.append((time.perf_counter() - start) * 1000)
+
+        results[str(size)] = {
+            "ms_fleet_poll": statistics.median(walls),
+            "ms_vehicle_p50": statistics.median(latencies),
+            "ms_vehicle_p95": percentile(latencies, 0.95),
+            "requests_per_vehicle": traffic.requests / rounds / size,
+            "bytes_per_vehicle": traffic.bytes / rounds / size,
+            "kib_per_vehicle": retained / 1024 / size,
+        }
+        del coordinators
+    return results
+
+
+async def bench_live(args: argparse.Namespace) -> dict:
+    """Run the benchmarks that need the stand-in."""
+
+    standin = VolvoStandin(vins_for(max(args.sizes)), latency=args.latency, seed=0)
+    with tempfile.TemporaryDirectory() as config_dir, StandinThread(standin):
+        hass = HomeAssistant(config_dir)
+        traffic = Traffic()
+        session = ClientSession(trace_configs=[traffic.trace_config])
+        try:
+            bench = PollBench(hass, standin, session)
+            await bench.async_login()
+            poll = await bench_poll(bench, traffic, args.rounds)
+            scaling = await bench_scaling(bench, traffic, args.sizes, args.rounds)
+            bench.token_manager.close()
+        finally:
+            await session.close()
+    return {"poll": poll, "scaling": scaling}
+
+
+def git_revision() -> str | None:
+    """Return the checked out commit, if any."""
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Return the numeric leaves of nested results keyed by dotted path."""
+
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, int | float):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(metrics: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Return a line for every metric that regressed by more than tolerance."""
+
+    regressions = []
+    for key, value in metrics.items():
+        old = baseline.get(key)
+        if old and value > old * (1 + tolerance):
+            regressions.append(f"{key}: {old:.3f} -> {value:.3f} (+{(value / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run every benchmark and return the results document."""
+
+    parse = bench_parse(args.number)
+    entities = bench_entities(args.number)
+    live = asyncio.run(bench_live(args))
+
+    with (ROOT / "custom_components" / DOMAIN / "manifest.json").open(encoding="utf-8") as file:
+        version = json.load(file)["version"]
+
+    metrics = flatten(
+        {
+            "parse_us": {name: result["us_per_decode"] for name, result in parse.items()},
+            "entity_us": entities,
+            "poll": live["poll"],
+            "scaling": live["scaling"],
+        }
+    )
+    return {
+        "meta": {
+            "version": version,
+            "git_revision": git_revision(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "json_backend": decode._backend,
+            "latency_s": args.latency,
+            "rounds": args.rounds,
+        },
+        "parse": parse,
+        "metrics": metrics,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run, print, write and compare the results."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing of parse and entity benchmarks")
+    parser.add_argument("--rounds", type=int, default=5, help="polls per measurement")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[1, 10, 50, 100, 500], help="comma separated fleet sizes")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response latency in seconds")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--compare", help="results file of a previous run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative growth of a metric")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    for key, value in results["metrics"].items():
+        print(f"{key:60} {value:12.3f}")  # noqa: T201
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results["metrics"], baseline["metrics"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")  # noqa: T201
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
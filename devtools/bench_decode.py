@@ -0,0 +1,92 @@
+"""Micro-benchmark of response decoding: dict + parse_obj versus decode_model.
+
+Run from the repository root:
+
+    python -m devtools.bench_decode --vehicles 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+import warnings
+
+from custom_components.volvoaaos import decode
+from custom_components.volvoaaos.models import GetDoorModel, GetWindowModel, LocationModel, RechargeModel
+
+from . import payloads
+
+CASES = [
+    (RechargeModel, payloads.recharge_status()),
+    (GetDoorModel, payloads.doors()),
+    (GetWindowModel, payloads.windows()),
+    (LocationModel, payloads.location()),
+]
+
+
+def legacy_decode(model, body: bytes):
+    """Decode the way the client did before: text, dict, parse_obj."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return model.parse_obj(json.loads(body.decode()))
+
+
+def time_per_call(func, number: int) -> float:
+    """Return the best per-call time in microseconds over 5 repeats."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(number: int, vehicles: int) -> dict:
+    """Time every case and backend, return the results."""
+
+    default_backend = decode._backend
+    results = {"number": number, "vehicles": vehicles, "default_backend": default_backend, "models": {}}
+    per_poll = {"legacy": 0.0}
+
+    for model, payload in CASES:
+        body = json.dumps(payload).encode()
+        assert decode.decode_model(model, body) == legacy_decode(model, body)
+
+        timings = {"legacy": time_per_call(lambda: legacy_decode(model, body), number)}
+        for backend in decode.available_backends():
+            decode.set_json_backend(backend)
+            timings[backend] = time_per_call(lambda: decode.decode_model(model, body), number)
+            per_poll[backend] = per_poll.get(backend, 0.0) + timings[backend]
+        decode.set_json_backend(default_backend)
+
+        per_poll["legacy"] += timings["legacy"]
+        results["models"][model.__name__] = {"bytes": len(body), "us_per_decode": timings}
+
+    results["ms_per_fleet_poll"] = {backend: value * vehicles / 1000 for backend, value in per_poll.items()}
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run and print the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="decodes per timing")
+    parser.add_argument("--vehicles", type=int, default=500, help="fleet size for the projection")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.number, args.vehicles)
+
+    for name, result in results["models"].items():
+        timings = result["us_per_decode"]
+        legacy = timings["legacy"]
+        line = ", ".join(f"{backend} {value:7.2f} us ({legacy / value:4.1f}x)" for backend, value in timings.items())
+        print(f"{name:16} {result['bytes']:5} B  {line}")  # noqa: T201
+
+    print(f"CPU per poll of {args.vehicles} vehicles (4 decodes each):")  # noqa: T201
+    for backend, value in results["ms_per_fleet_poll"].items():
+        print(f"  {backend:8} {value:8.2f} ms")  # noqa: T201
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Sample Volvo API response bodies matching custom_components/volvoaaos/models.py."""
+
+from __future__ import annotations
+
+TIMESTAMP = "2024-01-20T10:15:42.123Z"
+
+
+def status(value, timestamp: str = TIMESTAMP, unit: str | None = None) -> dict:
+    """Return a {value, timestamp[, unit]} status object."""
+
+    item = {"value": value, "timestamp": timestamp}
+    if unit is not None:
+        item["unit"] = unit
+    return item
+
+
+def auth(access_token: str = "access-token", refresh_token: str = "refresh-token", expires_in: int = 1799) -> dict:
+    """Return a token response."""
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "Bearer", "expires_in": expires_in}
+
+
+def recharge_status(battery: float = 80.0, charging: str = "CHARGING_SYSTEM_IDLE", connection: str = "CONNECTION_STATUS_DISCONNECTED", timestamp: str = TIMESTAMP) -> dict:
+    """Return an energy recharge-status response."""
+    return {
+        "status": 200,
+        "operationId": "3c6c8c0c-6b8e-4a0a-9e4b-2f1a0c8d7e6f",
+        "data": {
+            "batteryChargeLevel": status(battery, timestamp, unit="percentage"),
+            "electricRange": status(str(int(battery * 4)), timestamp, unit="kilometers"),
+            "estimatedChargingTime": status("0" if charging != "CHARGING_SYSTEM_CHARGING" else str(int((100 - battery) * 6)), timestamp, unit="minutes"),
+            "chargingConnectionStatus": status(connection, timestamp),
+            "chargingSystemStatus": status(charging, timestamp),
+        },
+    }
+
+
+def battery_charge_level(battery: float = 80.0, timestamp: str = TIMESTAMP) -> dict:
+    """Return a connected-vehicle v1 battery-charge-level response."""
+    return {
+        "status": 200,
+        "operationId": "3c6c8c0c-6b8e-4a0a-9e4b-2f1a0c8d7e6f",
+        "data": {"batteryChargeLevel": status(str(battery), timestamp, unit="percentage")},
+    }
+
+
+def vehicles(vins: list[str]) -> dict:
+    """Return a list-vehicles response."""
+    return {"data": [{"vin": vin} for vin in vins]}
+
+
+IMAGE_URL = "https://cas.volvocars.com/image"
+
+
+def vehicle_data(vin: str, image_url: str = IMAGE_URL) -> dict:
+    """Return a vehicle details response, its image URLs below image_url."""
+    return {
+        "status": 200,
+        "operationId": "3c6c8c0c-6b8e-4a0a-9e4b-2f1a0c8d7e6f",
+        "data": {
+            "modelYear": "2023",
+            "vin": vin,
+            "externalColour": "Sage Green",
+            "gearbox": "AUTOMATIC",
+            "fuelType": "ELECTRIC",
+            "images": {
+                "exteriorDefaultUrl": f"{image_url}/{vin}/exterior.png",
+                "interiorDefaultUrl": f"{image_url}/{vin}/interior.png",
+            },
+            "descriptions": {"model": "XC40", "upholstery": "Charcoal", "steering": "LEFT"},
+        },
+    }
+
+
+DOORS = ["frontLeftDoor", "frontRightDoor", "rearLeftDoor", "rearRightDoor", "hood", "tailgate", "tankLid"]
+WINDOWS = ["frontLeftWindow", "frontRightWindow", "rearLeftWindow", "rearRightWindow", "sunroof"]
+
+
+def doors(central_lock: str = "LOCKED", open_doors: tuple[str, ...] = ()) -> dict:
+    """Return a doors response."""
+    data = {"centralLock": status(central_lock)}
+    data.update({door: status("OPEN" if door in open_doors else "CLOSED") for door in DOORS})
+    return {"data": data}
+
+
+def windows(open_windows: tuple[str, ...] = ()) -> dict:
+    """Return a windows response."""
+    return {"data": {window: status("OPEN" if window in open_windows else "CLOSED") for window in WINDOWS}}
+
+
+def location(longitude: float = 11.9746, latitude: float = 57.7089, heading: int = 90, timestamp: str = TIMESTAMP) -> dict:
+    """Return a location response."""
+    return {
+        "status": 200,
+        "operationId": "3c6c8c0c-6b8e-4a0a-9e4b-2f1a0c8d7e6f",
+        "data": {
+            "type": "Feature",
+            "properties": {"heading": str(heading), "timestamp": timestamp},
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude, 0.0]},
+        },
+    }
+
+
+def command(vin: str, command: str) -> dict:
+    """Return a command response, unlock carries its extra fields."""
+    data = {"vin": vin, "invokeStatus": "COMPLETED", "message": ""}
+    if command == "unlock":
+        data.update({"readyToUnlock": True, "readyToUnlockUntil": 0})
+    return {"data": data}
+
+
+def odometer(km: int = 12345) -> dict:
+    """Return an odometer response."""
+    return {"data": {"odometer": status(km, unit="km")}}
+
+
+def tyres() -> dict:
+    """Return a tyres response."""
+    return {"data": {tyre: status("NO_WARNING") for tyre in ["frontLeft", "frontRight", "rearLeft", "rearRight"]}}
+
+
+def engine_status(running: bool = False) -> dict:
+    """Return an engine-status response."""
+    return {"data": {"engineStatus": status("RUNNING" if running else "STOPPED")}}
+
+
+def engine() -> dict:
+    """Return an engine diagnostics response."""
+    return {"data": {"oilLevelWarning": status("NO_WARNING"), "engineCoolantLevelWarning": status("NO_WARNING")}}
+
+
+def brakes() -> dict:
+    """Return a brakes response."""
+    return {"data": {"brakeFluidLevelWarning": status("NO_WARNING")}}
+
+
+def diagnostics() -> dict:
+    """Return a diagnostics response."""
+    return {
+        "data": {
+            "serviceWarning": status("NO_WARNING"),
+            "engineHoursToService": status(1200, unit="h"),
+            "distanceToService": status(25000, unit="km"),
+            "washerFluidLevelWarning": status("NO_WARNING"),
+            "timeToService": status(11, unit="months"),
+        }
+    }
+
+
+def warnings() -> dict:
+    """Return a warnings response."""
+    return {"data": {name: status("NO_WARNING") for name in ["brakeLightLeftWarning", "brakeLightRightWarning", "fogLightFrontWarning", "turnIndicationFrontLeftWarning"]}}
+
+
+def fuel() -> dict:
+    """Return a fuel response."""
+    return {"data": {"fuelAmount": status("0", unit="l")}}
+
+
+def statistics() -> dict:
+    """Return a statistics response."""
+    return {
+        "data": {
+            "averageEnergyConsumption": status(18.1, unit="kWh/100km"),
+            "averageSpeed": status(47, unit="km/h"),
+            "tripMeterManual": status(312.4, unit="km"),
+            "distanceToEmptyBattery": status(320, unit="km"),
+        }
+    }
+
+
+def image(vin: str, kind: str) -> bytes:
+    """Return a placeholder PNG of a vehicle image, the same bytes for the same VIN and kind."""
+    return b"\x89PNG\r\n\x1a\n" + f"{vin}/{kind}".encode()
@@ -0,0 +1,430 @@
+"""Local stand-in for the Volvo ID token and Volvo AAOS APIs.
+
+Serves the token, energy, connected-vehicle and location endpoints with
+bodies from devtools/payloads.py, so the integration can be run and
+load-tested offline. Latency, 429/5xx/401 errors, token expiry and vehicle
+state changes can be injected.
+
+Run from the repository root:
+
+    python -m devtools.standin --port 8765 --vehicles 3 --latency 0.2 --error-rate 0.05
+
+and add "api_url": "http://127.0.0.1:8765" and
+"auth_url": "http://127.0.0.1:8765/as/token.oauth2" to the config entry
+data. From Python:
+
+    async with VolvoStandin(["YV1STANDIN0000001"]) as standin:
+        energy = Energy(session=session, api_url=standin.api_url, ...)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from aiohttp import web
+from aiohttp.hdrs import AUTHORIZATION, ETAG, IF_NONE_MATCH, RETRY_AFTER
+
+from . import payloads
+
+TOKEN_PATH = "/as/token.oauth2"
+# Vehicle images, served like a CDN without a bearer token
+IMAGE_PATH = "/image"
+
+
+@dataclass
+class VehicleState:
+    """Mutable state of one simulated vehicle."""
+
+    vin: str
+    battery: float = 80.0
+    charging: bool = False
+    connected: bool = False
+    locked: bool = True
+    open_doors: set[str] = field(default_factory=set)
+    open_windows: set[str] = field(default_factory=set)
+    longitude: float = 11.9746
+    latitude: float = 57.7089
+    heading: int = 90
+    # When the position and the energy values last changed
+    location_timestamp: str = payloads.TIMESTAMP
+    energy_timestamp: str = payloads.TIMESTAMP
+    odometer: int = 12345
+    engine_running: bool = False
+    climatization: bool = False
+    # Endpoint names answered with 404, as for a car without the feature
+    unsupported: set[str] = field(default_factory=set)
+
+
+@dataclass
+class InjectedFault:
+    """An error returned for the next `count` matching requests."""
+
+    status: int
+    count: int
+    path: str | None = None
+
+
+class VolvoStandin:
+    """aiohttp server imitating the Volvo APIs for a set of VINs."""
+
+    def __init__(
+        self,
+        vins: list[str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: tuple[int, ...] = (429, 500, 502, 503),
+        token_expiry: int = 1799,
+        simulate_interval: float | None = None,
+        command_delay: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize stand-in, nothing listens until start()."""
+
+        self.vehicles = {vin: VehicleState(vin) for vin in vins}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.token_expiry = token_expiry
+        self.simulate_interval = simulate_interval
+        # Seconds until the car reports the effect of a command, as a real one lags
+        self.command_delay = command_delay
+        self.random = random.Random(seed)
+
+        self.faults: list[InjectedFault] = []
+        self.access_tokens: dict[str, float] = {}
+        self.refresh_tokens: set[str] = set()
+
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.bytes_sent = 0
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes(self._routes())
+        self._runner: web.AppRunner | None = None
+        self._simulation: asyncio.Task | None = None
+        self.url: str | None = None
+
+    @property
+    def api_url(self) -> str:
+        """Return the value for CONF_API_URL / VolvoApiClient.api_url."""
+        return self.url
+
+    @property
+    def auth_url(self) -> str:
+        """Return the value for CONF_AUTH_URL / Auth.auth_url."""
+        return self.url + TOKEN_PATH
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening, port 0 picks a free port. Returns the base URL."""
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        if self.simulate_interval:
+            self._simulation = asyncio.create_task(self._simulate())
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop the simulation and the server."""
+
+        if self._simulation is not None:
+            self._simulation.cancel()
+            self._simulation = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> VolvoStandin:
+        """Start on enter."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        """Stop on exit."""
+        await self.stop()
+
+    def fail_next(self, status: int, count: int = 1, path: str | None = None) -> None:
+        """Answer the next `count` requests, or those whose path contains `path`, with status.
+
+        401 revokes every access token instead, so clients must refresh.
+        """
+
+        if status == 401:
+            self.expire_tokens()
+            return
+        self.faults.append(InjectedFault(status, count, path))
+
+    def expire_tokens(self) -> None:
+        """Expire every issued access token."""
+        self.access_tokens.clear()
+
+    def reset_counters(self) -> None:
+        """Zero the request, status and byte counters."""
+
+        self.requests.clear()
+        self.statuses.clear()
+        self.bytes_sent = 0
+
+    def _routes(self) -> list[web.RouteDef]:
+        vehicle = "/connected-vehicle/v2/vehicles/{vin}"
+        return [
+            web.post(TOKEN_PATH, self._token),
+            web.get("/energy/v1/vehicles/{vin}/recharge-status", self._vehicle_get("recharge_status")),
+            web.get("/connected-vehicle/v1/vehicles/{vin}/battery-charge-level", self._vehicle_get("battery_charge_level")),
+            web.get("/connected-vehicle/v2/vehicles", self._vehicles),
+            web.get(vehicle, self._vehicle_get("vehicle_data")),
+            web.get(vehicle + "/doors", self._vehicle_get("doors")),
+            web.get(vehicle + "/windows", self._vehicle_get("windows")),
+            web.get(vehicle + "/odometer", self._vehicle_get("odometer")),
+            web.get(vehicle + "/tyres", self._vehicle_get("tyres")),
+            web.get(vehicle + "/engine-status", self._vehicle_get("engine_status")),
+            web.get(vehicle + "/engine", self._vehicle_get("engine")),
+            web.get(vehicle + "/brakes", self._vehicle_get("brakes")),
+            web.get(vehicle + "/diagnostics", self._vehicle_get("diagnostics")),
+            web.get(vehicle + "/warnings", self._vehicle_get("warnings")),
+            web.get(vehicle + "/fuel", self._vehicle_get("fuel")),
+            web.get(vehicle + "/statistics", self._vehicle_get("statistics")),
+            web.post(vehicle + "/commands/{command}", self._command),
+            web.get("/location/v1/vehicles/{vin}/location", self._vehicle_get("location")),
+            web.get(IMAGE_PATH + "/{vin}/{kind}.png", self._image),
+        ]
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count, delay, inject faults and check the bearer token."""
+
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        response = self._injected_error(request)
+        public = request.path == TOKEN_PATH or request.path.startswith(IMAGE_PATH + "/")
+        if response is None and not public and not self._authorized(request):
+            response = web.json_response({"error": "invalid_token"}, status=401)
+        if response is None:
+            response = await handler(request)
+
+        self.statuses[response.status] += 1
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    def _injected_error(self, request: web.Request) -> web.Response | None:
+        for fault in self.faults:
+            if fault.path is None or fault.path in request.path:
+                fault.count -= 1
+                if fault.count <= 0:
+                    self.faults.remove(fault)
+                return self._error(fault.status)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self._error(self.random.choice(self.error_statuses))
+        return None
+
+    def _error(self, status: int) -> web.Response:
+        headers = {RETRY_AFTER: "1"} if status == 429 else None
+        return web.json_response({"status": status, "error": {"message": "Injected by stand-in"}}, status=status, headers=headers)
+
+    def _authorized(self, request: web.Request) -> bool:
+        scheme, _, token = request.headers.get(AUTHORIZATION, "").partition(" ")
+        expires_at = self.access_tokens.get(token)
+        return scheme.lower() == "bearer" and expires_at is not None and time.monotonic() < expires_at
+
+    def _json(self, request: web.Request, body: dict) -> web.Response:
+        """Return body with an ETag, or 304 if the client already has it."""
+
+        data = json.dumps(body).encode()
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if request.headers.get(IF_NONE_MATCH) == etag:
+            return web.Response(status=304, headers={ETAG: etag})
+        return web.Response(body=data, content_type="application/json", headers={ETAG: etag})
+
+    async def _token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        grant_type = form.get("grant_type")
+        if grant_type == "refresh_token":
+            refresh_token = form.get("refresh_token")
+            if refresh_token not in self.refresh_tokens:
+                return web.json_response({"error": "invalid_grant"}, status=400)
+        elif grant_type == "password" and form.get("username") and form.get("password"):
+            refresh_token = secrets.token_urlsafe(16)
+            self.refresh_tokens.add(refresh_token)
+        else:
+            return web.json_response({"error": "invalid_request"}, status=400)
+
+        access_token = secrets.token_urlsafe(16)
+        self.access_tokens[access_token] = time.monotonic() + self.token_expiry
+        return web.json_response(payloads.auth(access_token, refresh_token, self.token_expiry))
+
+    async def _image(self, request: web.Request) -> web.Response:
+        """Return a placeholder PNG with an ETag, or 304 if the client already has it."""
+
+        if request.match_info["vin"] not in self.vehicles:
+            return self._error(404)
+        data = payloads.image(request.match_info["vin"], request.match_info["kind"])
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if request.headers.get(IF_NONE_MATCH) == etag:
+            return web.Response(status=304, headers={ETAG: etag})
+        return web.Response(body=data, content_type="image/png", headers={ETAG: etag})
+
+    async def _vehicles(self, request: web.Request) -> web.Response:
+        return self._json(request, payloads.vehicles(list(self.vehicles)))
+
+    def _vehicle_get(self, name: str):
+        async def handler(request: web.Request) -> web.Response:
+            state = self.vehicles.get(request.match_info["vin"])
+            if state is None or name in state.unsupported:
+                return web.json_response({"status": 404, "error": {"message": "Not found"}}, status=404)
+            return self._json(request, self._body(name, state))
+
+        return handler
+
+    def _body(self, name: str, state: VehicleState) -> dict:
+        """Return the response body of a GET endpoint for a vehicle."""
+
+        if name == "recharge_status":
+            return payloads.recharge_status(
+                round(state.battery, 1),
+                "CHARGING_SYSTEM_CHARGING" if state.charging else "CHARGING_SYSTEM_IDLE",
+                "CONNECTION_STATUS_CONNECTED_AC" if state.connected else "CONNECTION_STATUS_DISCONNECTED",
+                state.energy_timestamp,
+            )
+        if name == "battery_charge_level":
+            return payloads.battery_charge_level(round(state.battery, 1), state.energy_timestamp)
+        if name == "vehicle_data":
+            return payloads.vehicle_data(state.vin, self.url + IMAGE_PATH)
+        if name == "doors":
+            return payloads.doors("LOCKED" if state.locked else "UNLOCKED", tuple(state.open_doors))
+        if name == "windows":
+            return payloads.windows(tuple(state.open_windows))
+        if name == "location":
+            return payloads.location(state.longitude, state.latitude, state.heading, state.location_timestamp)
+        if name == "odometer":
+            return payloads.odometer(state.odometer)
+        if name == "engine_status":
+            return payloads.engine_status(state.engine_running)
+        return getattr(payloads, name)()
+
+    async def _command(self, request: web.Request) -> web.Response:
+        state = self.vehicles.get(request.match_info["vin"])
+        command = request.match_info["command"]
+        if state is None or command in state.unsupported:
+            return web.json_response({"status": 404, "error": {"message": "Not found"}}, status=404)
+
+        changes = {
+            "lock": ("locked", True),
+            "unlock": ("locked", False),
+            "climatization-start": ("climatization", True),
+            "climatization-stop": ("climatization", False),
+        }
+        if command not in changes:
+            return web.json_response({"status": 404, "error": {"message": "Unknown command"}}, status=404)
+        if self.command_delay:
+            asyncio.get_running_loop().call_later(self.command_delay, setattr, state, *changes[command])
+        else:
+            setattr(state, *changes[command])
+        return web.json_response(payloads.command(state.vin, command))
+
+    def step(self) -> None:
+        """Advance every vehicle by one simulation step."""
+
+        now = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        for state in self.vehicles.values():
+            roll = self.random.random()
+            if state.charging:
+                state.battery = min(state.battery + 1.5, 100.0)
+                state.energy_timestamp = now
+                if state.battery >= 100.0 or roll < 0.02:
+                    state.charging = False
+            elif state.engine_running:
+                state.heading = (state.heading + self.random.randint(-30, 30)) % 360
+                state.longitude += self.random.uniform(-0.002, 0.002)
+                state.latitude += self.random.uniform(-0.001, 0.001)
+                state.location_timestamp = state.energy_timestamp = now
+                state.odometer += 1
+                state.battery = max(state.battery - 0.3, 0.0)
+                if roll < 0.05:
+                    state.engine_running = False
+            elif roll < 0.03:
+                state.connected = state.charging = state.battery < 95.0
+                state.energy_timestamp = now
+            elif roll < 0.06:
+                state.connected = False
+                state.engine_running = True
+            elif roll < 0.08:
+                state.locked = not state.locked
+            elif roll < 0.09:
+                state.open_windows ^= {self.random.choice(payloads.WINDOWS)}
+
+    async def _simulate(self) -> None:
+        while True:
+            await asyncio.sleep(self.simulate_interval)
+            self.step()
+
+
+def vins_for(count: int) -> list[str]:
+    """Return count made-up 17 character VINs."""
+    return [f"YV1STANDIN{index:07d}" for index in range(1, count + 1)]
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Run the stand-in until cancelled, printing counters periodically."""
+
+    standin = VolvoStandin(
+        vins_for(args.vehicles),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_expiry=args.token_expiry,
+        simulate_interval=args.simulate,
+        command_delay=args.command_delay,
+        seed=args.seed,
+    )
+    await standin.start(args.host, args.port)
+    print(f"Serving {args.vehicles} vehicles at {standin.api_url}, token URL {standin.auth_url}")  # noqa: T201
+    try:
+        while True:
+            await asyncio.sleep(60)
+            print(f"{sum(standin.requests.values())} requests, {standin.bytes_sent} bytes, statuses {dict(standin.statuses)}")  # noqa: T201
+    finally:
+        await standin.stop()
+
+
+def main() -> None:
+    """Parse arguments and serve."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vehicles", type=int, default=1, help="number of simulated vehicles")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429 or 5xx")
+    parser.add_argument("--token-expiry", type=int, default=1799, help="access token lifetime in seconds")
+    parser.add_argument("--simulate", type=float, default=30.0, help="seconds between vehicle state changes, 0 to disable")
+    parser.add_argument("--command-delay", type=float, default=0.0, help="seconds until a command shows in the vehicle state")
+    parser.add_argument("--seed", type=int, help="random seed for errors and simulation")
+    args = parser.parse_args()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
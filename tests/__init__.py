@@ -0,0 +1 @@
+"""Tests for the Volvo AAOS integration."""
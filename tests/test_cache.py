@@ -0,0 +1,120 @@
+"""Tests for the response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from multidict import CIMultiDict
+
+from custom_components.volvoaaos import cache as cache_module
+from custom_components.volvoaaos.cache import ResponseCache, endpoint_ttl
+
+DOORS = "https://api.volvocars.com/connected-vehicle/v2/vehicles/YV1TEST/doors"
+ODOMETER = "https://api.volvocars.com/connected-vehicle/v2/vehicles/YV1TEST/odometer"
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the monotonic clock of the cache with one the test advances."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+class FakeBackend:
+    """Fetch answering with a body and validators, or 304 if they match."""
+
+    def __init__(self, etag: str | None = None) -> None:
+        """Initialize backend."""
+        self.etag = etag
+        self.requests: list[dict[str, str]] = []
+        self.body = 0
+        self.release: asyncio.Event | None = None
+
+    async def fetch(self, validators: dict[str, str]) -> tuple[int, object, CIMultiDict]:
+        """Answer one request."""
+        validators = {str(name): value for name, value in validators.items()}
+        self.requests.append(validators)
+        if self.release is not None:
+            await self.release.wait()
+        headers = CIMultiDict({"ETag": self.etag} if self.etag else {})
+        if self.etag and validators.get("If-None-Match") == self.etag:
+            return 304, None, headers
+        self.body += 1
+        return 200, {"body": self.body}, headers
+
+
+def test_endpoint_ttls() -> None:
+    """TTLs are looked up by path, unknown endpoints are not kept."""
+    assert endpoint_ttl(DOORS) == 10
+    assert endpoint_ttl(f"{DOORS}?x=1") == 10
+    assert endpoint_ttl(ODOMETER) == 0
+
+
+def test_ttl(clock: SimpleNamespace) -> None:
+    """A response is served from the cache until its TTL passed."""
+
+    async def run() -> list:
+        cache, backend = ResponseCache(), FakeBackend()
+        bodies = [await cache.async_get(DOORS, backend.fetch)]
+        clock.now += 9
+        bodies.append(await cache.async_get(DOORS, backend.fetch))
+        clock.now += 2
+        bodies.append(await cache.async_get(DOORS, backend.fetch))
+        bodies.append(await cache.async_get(ODOMETER, backend.fetch))
+        bodies.append(await cache.async_get(ODOMETER, backend.fetch))
+        return [bodies, len(backend.requests), cache.hits, cache.misses]
+
+    assert asyncio.run(run()) == [[{"body": 1}, {"body": 1}, {"body": 2}, {"body": 3}, {"body": 4}], 4, 1, 4]
+
+
+def test_etag_revalidation(clock: SimpleNamespace) -> None:
+    """An expired entry with an ETag is revalidated and a 304 reuses the cached body."""
+
+    async def run() -> list:
+        cache, backend = ResponseCache(), FakeBackend(etag='"v1"')
+        first = await cache.async_get(DOORS, backend.fetch)
+        clock.now += 11
+        second = await cache.async_get(DOORS, backend.fetch)
+        clock.now += 5
+        third = await cache.async_get(DOORS, backend.fetch)
+        return [first, second, third, backend.requests, cache.revalidated, cache.hits]
+
+    assert asyncio.run(run()) == [{"body": 1}, {"body": 1}, {"body": 1}, [{}, {"If-None-Match": '"v1"'}], 1, 1]
+
+
+def test_coalescing(clock: SimpleNamespace) -> None:
+    """Concurrent identical GETs share one request."""
+
+    async def run() -> list:
+        cache, backend = ResponseCache(), FakeBackend()
+        backend.release = asyncio.Event()
+        calls = [asyncio.create_task(cache.async_get(DOORS, backend.fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        backend.release.set()
+        return [await asyncio.gather(*calls), len(backend.requests), cache.coalesced]
+
+    assert asyncio.run(run()) == [[{"body": 1}] * 5, 1, 4]
+
+
+def test_command_invalidates_in_flight(clock: SimpleNamespace) -> None:
+    """A command drops the cached doors and detaches a doors request in flight."""
+
+    async def run() -> list:
+        cache, backend = ResponseCache(), FakeBackend()
+        await cache.async_get(DOORS, backend.fetch)
+        cache.invalidate_command("YV1TEST", "lock")
+        backend.release = asyncio.Event()
+        before = asyncio.create_task(cache.async_get(DOORS, backend.fetch))
+        await asyncio.sleep(0)
+        cache.invalidate_command("YV1TEST", "lock")
+        after = asyncio.create_task(cache.async_get(DOORS, backend.fetch))
+        await asyncio.sleep(0)
+        backend.release.set()
+        before, after = await asyncio.gather(before, after)
+        # The body of the request detached by the command is not cached
+        return [before != after, await cache.async_get(DOORS, backend.fetch) == after, len(backend.requests)]
+
+    assert asyncio.run(run()) == [True, True, 3]
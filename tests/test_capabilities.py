@@ -0,0 +1,57 @@
+"""Tests for the endpoint capability probing."""
+
+from __future__ import annotations
+
+import asyncio
+
+from aiohttp import ClientResponseError
+
+from custom_components.volvoaaos.capabilities import async_probe_capabilities
+
+
+class FakeClient:
+    """API client whose endpoints answer, raise a status or time out."""
+
+    vin = "YV1TEST"
+
+    def __init__(self, results: dict[str, int | None]) -> None:
+        """Initialize client, results maps endpoint names to a status, None times out."""
+        self.endpoints = results
+        for name, status in results.items():
+            setattr(self, name, self._endpoint(status))
+
+    @staticmethod
+    def _endpoint(status: int | None):
+        async def call() -> None:
+            if status is None:
+                raise asyncio.TimeoutError
+            if status >= 400:
+                raise ClientResponseError(None, (), status=status)
+        return call
+
+
+def _probe(results: dict[str, int | None], previous: dict[str, bool] | None = None) -> dict[str, bool]:
+    return asyncio.run(async_probe_capabilities([FakeClient(results)], previous))
+
+
+def test_unsupported_statuses() -> None:
+    """403 and 404 mark an endpoint unsupported, answers supported."""
+    assert _probe({"get_door_status": 200, "get_odometer": 404, "get_tyre_status": 403}) == {
+        "get_door_status": True,
+        "get_odometer": False,
+        "get_tyre_status": False,
+    }
+
+
+def test_unknown_fails_open() -> None:
+    """Endpoints that could not be probed count as supported or keep the previous result."""
+    assert _probe({"get_odometer": 500, "get_tyre_status": None}) == {"get_odometer": True, "get_tyre_status": True}
+    assert _probe({"get_odometer": 500}, {"get_odometer": False}) == {"get_odometer": False}
+
+
+def test_recharge_status_needs_an_answer() -> None:
+    """The full recharge status is only supported after it answered once."""
+    for status in (400, 401, 500, None):
+        assert _probe({"get_recharge_status": status}) == {"get_recharge_status": False}
+    assert _probe({"get_recharge_status": 200}) == {"get_recharge_status": True}
+    assert _probe({"get_recharge_status": 503}, {"get_recharge_status": True}) == {"get_recharge_status": True}
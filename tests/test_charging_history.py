@@ -0,0 +1,92 @@
+"""Tests for the charging history and the charge rate estimation."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.volvoaaos.charging_history import (
+    STATE_CHARGING,
+    STATE_NOT_CHARGING,
+    STATE_UNKNOWN,
+    ChargingHistory,
+)
+
+START = 1705745742000
+MINUTE = 60 * 1000
+
+
+def _history(tmp_path, readings: list[tuple[int, float, int]]) -> ChargingHistory:
+    # Readings kept in memory only, the estimation never touches hass
+    history = ChargingHistory(None, str(tmp_path / "charging"))
+    for timestamp, level, state in readings:
+        history._add(timestamp, level, state)
+    return history
+
+
+def test_charge_rate(tmp_path) -> None:
+    """The rate is the slope of the readings of the session, the battery is full when it reaches 100 percent."""
+    # Parked at 40 percent, then charging at 12 percent per hour
+    readings = [(START - 30 * MINUTE, 40.0, STATE_NOT_CHARGING)]
+    readings += [(START + minutes * MINUTE, 40.0 + minutes / 5, STATE_CHARGING) for minutes in range(0, 35, 5)]
+    history = _history(tmp_path, readings)
+    assert history.session_start() == 1
+    assert history.charge_rate() == pytest.approx(12.0)
+    # 46 percent after 30 minutes, 54 percent to go
+    expected = dt_util.utc_from_timestamp((START + 30 * MINUTE) / 1000 + 54 / 12 * 3600)
+    assert abs((history.estimated_full() - expected).total_seconds()) < 1
+
+
+def test_rate_uses_the_last_hour(tmp_path) -> None:
+    """Readings of the session older than RATE_WINDOW_MS do not count."""
+    # 30 percent per hour for an hour, then 6 percent per hour
+    readings = [(START + minutes * MINUTE, 20.0 + minutes / 2, STATE_CHARGING) for minutes in range(0, 61, 10)]
+    readings += [(START + minutes * MINUTE, 50.0 + (minutes - 60) / 10, STATE_CHARGING) for minutes in range(70, 181, 10)]
+    assert _history(tmp_path, readings).charge_rate() == pytest.approx(6.0)
+
+
+def test_no_rate(tmp_path) -> None:
+    """Without a running session or with too short a span there is no rate."""
+    assert _history(tmp_path, []).charge_rate() is None
+    stopped = [(START, 50.0, STATE_CHARGING), (START + 30 * MINUTE, 60.0, STATE_CHARGING), (START + 40 * MINUTE, 60.0, STATE_NOT_CHARGING)]
+    assert _history(tmp_path, stopped).charge_rate() is None
+    short = [(START, 50.0, STATE_CHARGING), (START + 2 * MINUTE, 51.0, STATE_CHARGING)]
+    assert _history(tmp_path, short).charge_rate() is None
+    assert _history(tmp_path, short).estimated_full() is None
+
+
+def test_inferred_session(tmp_path) -> None:
+    """Without a charging status, rising levels are a session until they stop rising for an hour."""
+    readings = [(START, 60.0, STATE_UNKNOWN), (START + 10 * MINUTE, 55.0, STATE_UNKNOWN)]
+    readings += [(START + minutes * MINUTE, 55.0 + (minutes - 10) / 6, STATE_UNKNOWN) for minutes in range(20, 61, 10)]
+    history = _history(tmp_path, readings)
+    assert history.session_start(now_ms=START + 70 * MINUTE) == 1
+    assert history.charge_rate(now_ms=START + 70 * MINUTE) == pytest.approx(10.0)
+    assert history.charge_rate(now_ms=START + 121 * MINUTE) is None
+
+
+def test_readings_persist(tmp_path) -> None:
+    """Readings appended to the file load back, unchanged readings are not recorded."""
+
+    async def run() -> tuple:
+        hass = HomeAssistant(str(tmp_path))
+        history = ChargingHistory(hass, str(tmp_path / "charging"))
+        added = [
+            history.add(START, 50.3, STATE_CHARGING),
+            history.add(START + MINUTE, 50.3, STATE_CHARGING),
+            history.add(START, 51.0, STATE_CHARGING),
+            history.add(START + 2 * MINUTE, 51.0, STATE_CHARGING),
+        ]
+        await history.async_flush()
+        loaded = ChargingHistory(hass, history.path)
+        await loaded.async_load()
+        await hass.async_stop(force=True)
+        return added, list(loaded.timestamps), list(loaded.levels)
+
+    added, timestamps, levels = asyncio.run(run())
+    assert added == [True, False, False, True]
+    assert timestamps == [START, START + 2 * MINUTE]
+    assert levels == pytest.approx([50.3, 51.0])
@@ -0,0 +1,108 @@
+"""Tests for the per-vehicle command queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.volvoaaos.command_queue import CommandQueue, CommandSupersededError
+
+
+class FakeVehicle:
+    """Sends commands that finish when released, recording the order they were sent in."""
+
+    def __init__(self) -> None:
+        """Initialize vehicle."""
+        self.sent: list[str] = []
+        self.release = asyncio.Event()
+
+    def command(self, name: str):
+        """Return the run callable of a command."""
+
+        async def run() -> str:
+            self.sent.append(name)
+            await self.release.wait()
+            return f"{name} done"
+
+        return run
+
+
+def test_identical_commands_coalesce() -> None:
+    """Repeats of a command in flight, waiting or just completed share its result."""
+
+    async def run() -> tuple:
+        queue, vehicle = CommandQueue(), FakeVehicle()
+        presses = [asyncio.create_task(queue.async_run("lock", vehicle.command("lock"))) for _ in range(3)]
+        await asyncio.sleep(0)
+        vehicle.release.set()
+        results = await asyncio.gather(*presses)
+        repeat = await queue.async_run("lock", vehicle.command("lock"))
+        return results, repeat, vehicle.sent, queue.as_dict()
+
+    assert asyncio.run(run()) == (
+        ["lock done"] * 3,
+        "lock done",
+        ["lock"],
+        {"sent": 1, "coalesced": 3, "superseded": 0},
+    )
+
+
+def test_waiting_command_is_superseded() -> None:
+    """A conflicting command replaces the waiting one, whose callers get CommandSupersededError."""
+
+    async def run() -> tuple:
+        queue, vehicle = CommandQueue(), FakeVehicle()
+        first = asyncio.create_task(queue.async_run("lock", vehicle.command("lock")))
+        await asyncio.sleep(0)
+        unlock = asyncio.create_task(queue.async_run("unlock", vehicle.command("unlock")))
+        await asyncio.sleep(0)
+        lock = asyncio.create_task(queue.async_run("lock", vehicle.command("lock")))
+        await asyncio.sleep(0)
+        vehicle.release.set()
+        results = await asyncio.gather(first, unlock, lock, return_exceptions=True)
+        return results, vehicle.sent, queue.superseded
+
+    (first, unlock, lock), sent, superseded = asyncio.run(run())
+    assert (first, lock) == ("lock done", "lock done")
+    assert isinstance(unlock, CommandSupersededError)
+    assert (unlock.command, unlock.superseded_by) == ("unlock", "lock")
+    # With the unlock gone the second lock shares the one in flight
+    assert sent == ["lock"]
+    assert superseded == 1
+
+
+def test_groups_run_independently() -> None:
+    """Commands of different groups do not wait for each other."""
+
+    async def run() -> list[str]:
+        queue, vehicle = CommandQueue(), FakeVehicle()
+        tasks = [
+            asyncio.create_task(queue.async_run("lock", vehicle.command("lock"))),
+            asyncio.create_task(queue.async_run("climatization-start", vehicle.command("climatization-start"))),
+        ]
+        await asyncio.sleep(0.01)
+        sent = list(vehicle.sent)
+        vehicle.release.set()
+        await asyncio.gather(*tasks)
+        return sent
+
+    assert asyncio.run(run()) == ["lock", "climatization-start"]
+
+
+def test_failure_is_not_coalesced() -> None:
+    """A failed command is sent again on the next press."""
+
+    async def run() -> int:
+        queue, attempts = CommandQueue(), []
+
+        async def failing() -> None:
+            attempts.append(1)
+            raise RuntimeError("rejected")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await queue.async_run("unlock", failing)
+        return len(attempts)
+
+    assert asyncio.run(run()) == 2
@@ -0,0 +1,69 @@
+"""Tests for the compact vehicle snapshots."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.volvoaaos.compact import VALUE_CODES, VehicleSnapshot, ms_to_timestamp, timestamp_to_ms
+from custom_components.volvoaaos.decode import decode_model
+from custom_components.volvoaaos.models import RechargeModel
+from devtools import payloads
+
+
+def _recharge(**kwargs) -> RechargeModel:
+    return decode_model(RechargeModel, json.dumps(payloads.recharge_status(**kwargs)).encode())
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2024-01-20T10:15:42.123Z",
+        "2024-01-20T10:15:00Z",
+        "2024-01-20T10:15:42.000Z",
+        "2024-01-20T10:15:42.123456Z",
+        "2024-01-20T10:15:42.12345Z",
+        "2024-01-20T12:15:42.123+02:00",
+        "2024-01-20T10:15:42",
+        "not a timestamp",
+    ],
+)
+def test_timestamps_round_trip(timestamp: str) -> None:
+    """Timestamps come back exactly as the API sent them."""
+    model = _recharge(timestamp=timestamp)
+    snapshot = VehicleSnapshot({"energy": model})
+    assert snapshot.energy.data.battery_charge_level.timestamp == timestamp
+    assert snapshot.energy.to_model() == model
+
+
+def test_timestamp_milliseconds() -> None:
+    """Epoch milliseconds are exact, whatever the format of the timestamp."""
+    assert timestamp_to_ms("2024-01-20T10:15:42.123Z") == 1705745742123
+    assert timestamp_to_ms("2024-01-20T12:15:42.123999+02:00") == 1705745742123
+    assert timestamp_to_ms("2024-01-20T10:15:42.12345Z") == 1705745742123
+    assert ms_to_timestamp(1705745742123) == "2024-01-20T10:15:42.123Z"
+    assert ms_to_timestamp(timestamp_to_ms("garbage")) is None
+
+
+def test_snapshot_round_trip() -> None:
+    """Values, units and models come back unchanged, equal snapshots compare equal."""
+    model = _recharge(battery=57.5, charging="CHARGING_SYSTEM_CHARGING")
+    snapshot = VehicleSnapshot({"energy": model, "location": None})
+    status = snapshot.energy.data.battery_charge_level
+    assert (status.value, status.unit) == (57.5, "percentage")
+    assert snapshot.energy.data.charging_system_status.value == "CHARGING_SYSTEM_CHARGING"
+    assert snapshot.energy.data.electric_range.value == "230"
+    assert snapshot.location is None
+    assert snapshot.energy.to_model() == model
+    assert VehicleSnapshot({"energy": model, "location": None}) == snapshot
+    assert VehicleSnapshot({"energy": _recharge(battery=58.0), "location": None}) != snapshot
+
+
+def test_readings_are_not_interned() -> None:
+    """Readings and free text do not grow the shared code table."""
+    VehicleSnapshot({"energy": _recharge()})
+    size = len(VALUE_CODES.values)
+    for battery in range(1, 50):
+        VehicleSnapshot({"energy": _recharge(battery=float(battery))})
+    assert len(VALUE_CODES.values) == size
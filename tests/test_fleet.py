@@ -0,0 +1,87 @@
+"""Tests for the fleet of a Volvo AAOS config entry, run against devtools/standin.py."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+
+from custom_components.volvoaaos.const import DOMAIN
+from custom_components.volvoaaos.fleet import VolvoFleet
+from custom_components.volvoaaos.volvo import Auth
+from devtools.standin import VolvoStandin, vins_for
+
+LOCATION_PATH = "/location/v1/vehicles/{vin}/location"
+
+
+async def _async_location_polls(config_dir: str, zones: bool) -> tuple[int, int]:
+    """Return the location requests of a poll with the fleet set up and after it was unloaded.
+
+    The entry has a single VIN and no entities, as with its device tracker
+    disabled, so nothing but the geofence demands the location.
+    """
+
+    hass = HomeAssistant(config_dir)
+    vin = vins_for(1)[0]
+    async with VolvoStandin([vin]) as standin:
+        entry = ConfigEntry(1, DOMAIN, "Volvo", {
+            "username": "u", "password": "p", "vcc_api_key": "k", "access_token": "a", "refresh_token": "r",
+            "vin": vin, "name": "Volvo", "all_recharge_available": True,
+            "api_url": standin.api_url, "auth_url": standin.auth_url,
+        }, "user")
+        if zones:
+            hass.states.async_set("zone.home", "0", {"latitude": 57.7089, "longitude": 11.9746, "radius": 100})
+
+        fleet = VolvoFleet(hass, entry)
+        # The entry is not added to Home Assistant, there is nothing to store the tokens in
+        fleet.token_manager.on_update = None
+        fleet.token_manager.update(await Auth(session=fleet.session, auth_url=standin.auth_url).authenticate(username="u", password="p"))
+        fleet.create_coordinators()
+        fleet.setup_geofence()
+        fleet.enable_fetch_planning()
+        coordinator = fleet.coordinators[vin]
+
+        await coordinator.update_coordinator_data(None)
+        polled = standin.requests[LOCATION_PATH]
+
+        fleet.remove_listeners()
+        standin.reset_counters()
+        fleet.cache.clear()
+        await coordinator.update_coordinator_data(None)
+        unloaded = standin.requests[LOCATION_PATH]
+
+        await fleet.session.close()
+    await hass.async_stop(force=True)
+    return polled, unloaded
+
+
+def test_geofence_polls_location_without_tracker(tmp_path) -> None:
+    """Zones keep the location polled with the device tracker disabled, until unload."""
+    assert asyncio.run(_async_location_polls(str(tmp_path), zones=True)) == (1, 0)
+
+
+def test_no_location_without_tracker_and_zones(tmp_path) -> None:
+    """Without zones and device tracker the location is not polled."""
+    assert asyncio.run(_async_location_polls(str(tmp_path), zones=False)) == (0, 0)
+
+
+def test_unload_closes_session_once(tmp_path) -> None:
+    """The session is closed by the unload hook alone, no close listener is left behind."""
+
+    async def run() -> tuple[bool, int]:
+        hass = HomeAssistant(str(tmp_path))
+        listeners = hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_CLOSE, 0)
+        entry = ConfigEntry(1, DOMAIN, "Volvo", {
+            "username": "u", "password": "p", "vcc_api_key": "k", "access_token": "a", "refresh_token": "r",
+            "vin": "YV1TEST", "name": "Volvo", "all_recharge_available": True,
+        }, "user")
+        fleet = VolvoFleet(hass, entry)
+        added = hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_CLOSE, 0) - listeners
+        await entry._async_process_on_unload(hass)
+        closed = fleet.session.closed
+        await hass.async_stop(force=True)
+        return closed, added
+
+    assert asyncio.run(run()) == (True, 0)
@@ -0,0 +1,66 @@
+"""Tests for the geofencing of vehicles against zones."""
+
+from __future__ import annotations
+
+import math
+
+from custom_components.volvoaaos.geofence import EARTH_RADIUS_M, ENTER, LEAVE, GeofenceEngine, Zone
+
+HOME = Zone("zone.home", "Home", 57.7089, 11.9746, 100)
+WORK = Zone("zone.work", "Work", 57.7200, 11.9900, 200)
+
+
+def north_of(zone: Zone, metres: float) -> tuple[float, float]:
+    """Return the position this many metres north of a zone centre."""
+    return zone.latitude + math.degrees(metres / EARTH_RADIUS_M), zone.longitude
+
+
+def test_zones_by_entity_id() -> None:
+    """The zones mapping is built by set_zones, not on every access."""
+    engine = GeofenceEngine()
+    assert engine.zones == {}
+    engine.set_zones([HOME, WORK])
+    assert engine.zones == {"zone.home": HOME, "zone.work": WORK}
+    assert engine.zones is engine.zones
+    engine.set_zones([WORK])
+    assert engine.zones == {"zone.work": WORK}
+
+
+def test_hysteresis() -> None:
+    """A vehicle enters within the radius and leaves only beyond radius + hysteresis."""
+    engine = GeofenceEngine(hysteresis=100)
+    engine.set_zones([HOME, WORK])
+    assert engine.update("car", *north_of(HOME, 500)) == ([], True)
+    assert engine.update("car", *north_of(HOME, 90))[0] == [(ENTER, "zone.home")]
+    # Jitter around the boundary does not leave
+    assert engine.update("car", *north_of(HOME, 150))[0] == []
+    assert engine.update("car", *north_of(HOME, 195))[0] == []
+    assert engine.occupants("zone.home") == ["car"]
+    assert engine.update("car", *north_of(HOME, 205))[0] == [(LEAVE, "zone.home")]
+    # Coming back between radius and radius + hysteresis is no enter
+    assert engine.update("car", *north_of(HOME, 150))[0] == []
+    assert engine.occupants("zone.home") == []
+
+
+def test_no_transitions_without_movement() -> None:
+    """The first position and changed zones place a vehicle without transitions."""
+    engine = GeofenceEngine()
+    engine.set_zones([HOME])
+    assert engine.update("car", *north_of(HOME, 10))[0] == []
+    assert engine.occupants("zone.home") == ["car"]
+    engine.set_zones([WORK])
+    assert engine.occupants("zone.home") == []
+    engine.set_zones([HOME, WORK])
+    assert engine.occupants("zone.home") == ["car"]
+    engine.remove("car")
+    assert engine.update("car", *north_of(WORK, 0))[0] == []
+
+
+def test_near_boundary() -> None:
+    """Positions within `near` of a boundary are flagged, inside or outside the zone."""
+    engine = GeofenceEngine(near=1000)
+    engine.set_zones([HOME])
+    assert engine.update("car", *north_of(HOME, 50))[1]
+    assert engine.update("car", *north_of(HOME, 1050))[1]
+    assert not engine.update("car", *north_of(HOME, 1200))[1]
+    assert not engine.update("far", *north_of(WORK, 0))[1]
@@ -0,0 +1,64 @@
+"""Tests for the location history and its track exports."""
+
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from array import array
+
+from custom_components.volvoaaos.location_history import LocationHistory, iter_geojson, iter_gpx, visvalingam
+
+GPX = "{http://www.topografix.com/GPX/1/1}"
+START = 1705745742000
+
+
+def test_visvalingam_keeps_corners() -> None:
+    """Points on a straight line go first, the ends and the corner stay."""
+    # East along a street, then north at the corner
+    latitudes = array("d", [57.70] * 5 + [57.701, 57.702, 57.703, 57.704])
+    longitudes = array("d", [11.970, 11.971, 11.972, 11.973, 11.974] + [11.974] * 4)
+    assert visvalingam(latitudes, longitudes, 3) == [0, 4, 8]
+    assert visvalingam(latitudes, longitudes, 20) == list(range(9))
+
+
+def test_full_history_is_thinned() -> None:
+    """A full history keeps its capacity, its ends and its shape."""
+    history = LocationHistory(capacity=8)
+    for index in range(12):
+        # A zigzag, every point is a corner
+        assert history.add(57.70 + index * 0.001, 11.97 + (index % 2) * 0.001, 90.0, START + index * 1000)
+    points = history.points()
+    assert len(history) <= 8
+    assert (points.timestamps[0], points.timestamps[-1]) == (START, START + 11000)
+    assert list(points.timestamps) == sorted(points.timestamps)
+    assert history.as_dict()["simplified"] == 12 - len(history)
+
+
+def test_unchanged_points_are_skipped() -> None:
+    """Points that are not newer or did not move are not added."""
+    history = LocationHistory(capacity=8)
+    assert history.add(57.70, 11.97, None, START)
+    assert not history.add(57.70, 11.97, None, START + 1000)
+    assert not history.add(57.71, 11.97, None, START)
+    assert len(history) == 1
+
+
+def test_exports() -> None:
+    """GPX and GeoJSON carry the points in order with their times."""
+    history = LocationHistory(capacity=8)
+    history.add(57.70, 11.97, 90.0, START)
+    history.add(57.71, 11.98, None, START + 1000)
+    points = history.points()
+
+    root = ET.fromstring("".join(iter_gpx(points, "Trip <1>")))
+    assert root.find(f"{GPX}trk/{GPX}name").text == "Trip <1>"
+    trackpoints = root.findall(f"{GPX}trk/{GPX}trkseg/{GPX}trkpt")
+    assert [(float(point.get("lat")), float(point.get("lon"))) for point in trackpoints] == [(57.70, 11.97), (57.71, 11.98)]
+    assert trackpoints[0].find(f"{GPX}time").text == "2024-01-20T10:15:42.000Z"
+
+    feature = json.loads("".join(iter_geojson(points, "Trip")))
+    assert feature["geometry"]["coordinates"] == [[11.97, 57.70], [11.98, 57.71]]
+    assert feature["properties"]["coordinateProperties"] == {
+        "times": ["2024-01-20T10:15:42.000Z", "2024-01-20T10:15:43.000Z"],
+        "headings": [90.0, None],
+    }
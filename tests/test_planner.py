@@ -0,0 +1,29 @@
+"""Tests for the demand-driven fetch planner."""
+
+from __future__ import annotations
+
+from custom_components.volvoaaos.planner import FetchPlanner
+
+
+def test_plans_every_field_until_ready() -> None:
+    """Before the platforms are set up every field is fetched, afterwards only demanded ones."""
+    planner = FetchPlanner()
+    planner.add("location")
+    assert planner.plan(["location", "energy"]) == {"location", "energy"}
+    planner.ready = True
+    assert planner.plan(["location", "energy"]) == {"location"}
+
+
+def test_remove_is_idempotent() -> None:
+    """Removing a demand twice keeps the demand of other holders."""
+    planner = FetchPlanner()
+    planner.ready = True
+    remove_tracker = planner.add("location")
+    remove_geofence = planner.add("location")
+
+    remove_tracker()
+    remove_tracker()
+    assert planner.plan(["location"]) == {"location"}
+
+    remove_geofence()
+    assert planner.plan(["location"]) == set()
@@ -0,0 +1,75 @@
+"""Tests for the state-adaptive poll policy."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+from custom_components.volvoaaos.const import POLL_INTERVAL
+from custom_components.volvoaaos.geofence import GEOFENCE_BOOST, GEOFENCE_BOOST_INTERVAL
+from custom_components.volvoaaos.polling import ENDPOINT_SCHEDULES, AdaptivePollPolicy, poll_cycle
+
+
+def _data(charging: bool = False, unlocked: bool = False) -> SimpleNamespace:
+    """Return the fields of a VolvoData the schedules read."""
+    energy = SimpleNamespace(data=SimpleNamespace(
+        charging_system_status=SimpleNamespace(value="CHARGING_SYSTEM_CHARGING" if charging else "CHARGING_SYSTEM_IDLE")
+    ))
+    doors = SimpleNamespace(data=SimpleNamespace(central_lock=SimpleNamespace(value="UNLOCKED" if unlocked else "LOCKED")))
+    return SimpleNamespace(energy=energy, connected_vehicle_door_status=doors, **{
+        key: None for key in ENDPOINT_SCHEDULES if key not in ("energy", "connected_vehicle_door_status")
+    })
+
+
+def _poll_times(data: SimpleNamespace, key: str, duration: float) -> list[float]:
+    """Return when a fleet ticking every poll cycle polls one endpoint of an unchanging car."""
+    policy = AdaptivePollPolicy()
+    tick = poll_cycle(POLL_INTERVAL, [policy]).total_seconds()
+    previous, polled, now = None, [], 0.0
+    while now < duration:
+        if key in policy.due([key], now):
+            polled.append(now)
+            policy.record(previous, data, [key], now)
+            previous = data
+        now += tick
+    return polled
+
+
+def test_active_car_polls_faster_than_poll_interval() -> None:
+    """Charging and unlocked cars are polled more often than every POLL_INTERVAL."""
+    charging = _poll_times(_data(charging=True), "energy", 600)
+    unlocked = _poll_times(_data(unlocked=True), "connected_vehicle_door_status", 600)
+    assert len(charging) == len(unlocked) == 20
+    assert max(b - a for a, b in zip(charging, charging[1:])) < POLL_INTERVAL.total_seconds()
+
+
+def test_idle_car_backs_off() -> None:
+    """An unchanged endpoint of a locked car slows down to its slow interval."""
+    polled = _poll_times(_data(), "energy", 3600)
+    # First poll, idle_cycles fast polls, then every 10 minutes
+    assert polled[:5] == [0.0, 30.0, 60.0, 90.0, 690.0]
+
+
+def test_poll_cycle() -> None:
+    """The cycle follows the fastest endpoint, never longer than the poll interval."""
+    assert poll_cycle(POLL_INTERVAL, [AdaptivePollPolicy()]) == timedelta(seconds=30)
+    assert poll_cycle(timedelta(seconds=20), [AdaptivePollPolicy()]) == timedelta(seconds=20)
+    assert poll_cycle(POLL_INTERVAL, []) == POLL_INTERVAL
+
+
+def test_boost_polls_faster_than_poll_interval() -> None:
+    """A geofence boost polls the location of an idle car every GEOFENCE_BOOST_INTERVAL until it ends."""
+    policy = AdaptivePollPolicy()
+    data = _data()
+    for now in (0.0, 30.0, 60.0, 90.0, 120.0, 150.0):
+        policy.record(data, data, ["location"], now)
+    assert policy.next_due["location"] == 450.0
+
+    policy.boost("location", GEOFENCE_BOOST, GEOFENCE_BOOST_INTERVAL, now=160.0)
+    assert GEOFENCE_BOOST_INTERVAL < POLL_INTERVAL
+    assert policy.next_due["location"] == 190.0
+    policy.record(data, data, ["location"], 190.0)
+    assert policy.next_due["location"] == 220.0
+    # The boost ended at 460 s
+    policy.record(data, data, ["location"], 460.0)
+    assert policy.next_due["location"] == 760.0
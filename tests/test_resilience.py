@@ -0,0 +1,106 @@
+"""Tests for the retry policies and circuit breakers."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import ClientConnectorError, ClientResponseError, ServerDisconnectedError
+from multidict import CIMultiDict
+
+from custom_components.volvoaaos import resilience
+from custom_components.volvoaaos.resilience import (
+    COMMAND_RETRY,
+    READ_RETRY,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def _status(status: int, retry_after: str | None = None) -> ClientResponseError:
+    headers = CIMultiDict({"Retry-After": retry_after} if retry_after is not None else {})
+    return ClientResponseError(None, (), status=status, headers=headers)
+
+
+def _connector_error() -> ClientConnectorError:
+    return ClientConnectorError(SimpleNamespace(ssl=None, host="api.volvocars.com", port=443), OSError("refused"))
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the monotonic clock of the breakers with one the test advances."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: clock.now, time=lambda: 0.0))
+    return clock
+
+
+def test_read_retries() -> None:
+    """Reads retry server errors, honour Retry-After and give up after max_tries."""
+    assert 0 <= READ_RETRY.retry_delay(_status(503), 1) <= 1
+    assert 0 <= READ_RETRY.retry_delay(_status(500), 2) <= 2
+    assert READ_RETRY.retry_delay(_status(503), 3) is None
+    assert READ_RETRY.retry_delay(_status(404), 1) is None
+    assert READ_RETRY.retry_delay(_status(429, "7"), 1) == 7
+    assert READ_RETRY.retry_delay(_status(429, "120"), 1) is None
+    assert READ_RETRY.retry_delay(ValueError(), 1) is None
+
+
+def test_read_timeouts_and_deadline() -> None:
+    """A read retries one timeout, and no wait may run past the deadline."""
+    assert READ_RETRY.retry_delay(asyncio.TimeoutError(), 1, timeouts=1) is not None
+    assert READ_RETRY.retry_delay(asyncio.TimeoutError(), 2, timeouts=2) is None
+    assert READ_RETRY.retry_delay(_status(429, "5"), 1, elapsed=20) == 5
+    assert READ_RETRY.retry_delay(_status(429, "5"), 1, elapsed=25) is None
+    assert READ_RETRY.remaining(12) == 18
+
+
+def test_command_retries() -> None:
+    """Commands are only resent when they never reached the host."""
+    assert COMMAND_RETRY.retry_delay(_status(503), 1) is not None
+    assert COMMAND_RETRY.retry_delay(_status(500), 1) is None
+    assert COMMAND_RETRY.retry_delay(asyncio.TimeoutError(), 1, timeouts=1) is None
+    assert COMMAND_RETRY.retry_delay(ServerDisconnectedError(), 1) is None
+    assert COMMAND_RETRY.retry_delay(_connector_error(), 1) is not None
+    assert COMMAND_RETRY.retry_delay(_status(503), 2) is None
+
+
+def test_breaker_opens_and_probes(clock: SimpleNamespace) -> None:
+    """The breaker opens at the threshold, lets one probe through after the reset timeout and closes on success."""
+    breaker = CircuitBreaker("api.volvocars.com", failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        assert breaker.state == STATE_CLOSED
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.open_count == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now += 60
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.before_request()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    breaker.before_request()
+
+
+def test_failed_probe_reopens(clock: SimpleNamespace) -> None:
+    """A failed probe opens the breaker for another reset timeout."""
+    breaker = CircuitBreaker("api.volvocars.com", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.open_count == 1
+    clock.now += 59
+    assert breaker.state == STATE_OPEN
+    clock.now += 1
+    assert breaker.state == STATE_HALF_OPEN
@@ -0,0 +1,91 @@
+"""Tests for the persisted snapshots the integration warm starts from."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.volvoaaos.const import DOMAIN
+from custom_components.volvoaaos.coordinator import VolvoData, compact_volvo_data
+from custom_components.volvoaaos.decode import decode_model
+from custom_components.volvoaaos.fleet import VolvoFleet
+from custom_components.volvoaaos.models import GetDoorModel, GetWindowModel, LocationModel, OdometerModel, RechargeModel
+from custom_components.volvoaaos.snapshot_store import VolvoSnapshotStore
+from devtools import payloads
+
+VINS = ["YV1TEST0000000001", "YV1TEST0000000002"]
+
+
+def _entry() -> ConfigEntry:
+    return ConfigEntry(1, DOMAIN, "Volvo", {
+        "username": "u", "password": "p", "vcc_api_key": "k", "access_token": "a", "refresh_token": "r",
+        "name": "Fleet", "fleet": True,
+        "vehicles": {vin: {"name": vin, "all_recharge_available": True} for vin in VINS},
+    }, "user", entry_id="entry")
+
+
+def _data(battery: float) -> VolvoData:
+    def decode(model, body: dict):
+        return decode_model(model, json.dumps(body).encode())
+
+    return VolvoData(
+        energy=decode(RechargeModel, payloads.recharge_status(battery=battery)),
+        connected_vehicle_door_status=decode(GetDoorModel, payloads.doors(central_lock="UNLOCKED", open_doors=("frontLeftDoor",))),
+        connected_vehicle_window_status=decode(GetWindowModel, payloads.windows()),
+        location=decode(LocationModel, payloads.location()),
+        connected_vehicle_odometer=decode(OdometerModel, payloads.odometer(km=4321)),
+    )
+
+
+def test_snapshots_round_trip(tmp_path) -> None:
+    """Saved snapshots load back equal, fields never fetched stay None."""
+
+    async def run() -> tuple:
+        hass = HomeAssistant(str(tmp_path))
+        entry = _entry()
+        snapshots = {vin: compact_volvo_data(_data(battery)) for vin, battery in zip(VINS, (55.0, 90.0))}
+        store = VolvoSnapshotStore(hass, entry)
+        for vin, snapshot in snapshots.items():
+            store.async_schedule_save(vin, snapshot)
+        await store.async_save()
+
+        loaded = await VolvoSnapshotStore(hass, entry).async_load()
+        await hass.async_stop(force=True)
+        return snapshots, loaded
+
+    snapshots, loaded = asyncio.run(run())
+    assert loaded == snapshots
+    assert loaded[VINS[1]].energy.data.battery_charge_level.value == 90.0
+    assert loaded[VINS[0]].connected_vehicle_tyre_status is None
+
+
+def test_warm_start_needs_every_vehicle(tmp_path) -> None:
+    """The fleet restores the snapshots, marked stale, only if every vehicle has one."""
+
+    async def restore(saved: list[str]) -> tuple[bool, list[bool], list]:
+        hass = HomeAssistant(str(tmp_path))
+        entry = _entry()
+        store = VolvoSnapshotStore(hass, entry)
+        await store.async_remove()
+        for vin in saved:
+            store.async_schedule_save(vin, compact_volvo_data(_data(70.0)))
+        await store.async_save()
+
+        fleet = VolvoFleet(hass, entry)
+        fleet.create_coordinators()
+        restored = await fleet.async_restore_snapshots()
+        coordinators = list(fleet.coordinators.values())
+        result = restored, [coordinator.stale for coordinator in coordinators], [coordinator.data for coordinator in coordinators]
+        await fleet.session.close()
+        await hass.async_stop(force=True)
+        return result
+
+    restored, stale, data = asyncio.run(restore(VINS[:1]))
+    assert (restored, stale, data) == (False, [False, False], [None, None])
+
+    restored, stale, data = asyncio.run(restore(VINS))
+    assert (restored, stale) == (True, [True, True])
+    assert data[0] == compact_volvo_data(_data(70.0))
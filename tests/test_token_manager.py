@@ -0,0 +1,63 @@
+"""Tests for the access token manager."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.volvoaaos.models import AuthModel
+from custom_components.volvoaaos.token_manager import TokenManager
+
+
+class FakeAuth:
+    """Auth whose reauth waits until released, then answers or fails."""
+
+    def __init__(self, fail: bool = False) -> None:
+        """Initialize auth."""
+        self.fail = fail
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def reauth(self, refresh_token: str) -> AuthModel:
+        """Return new tokens once released."""
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("refresh failed")
+        return AuthModel(access_token=f"access{self.calls}", refresh_token=f"refresh{self.calls}", token_type="Bearer", expires_in=1800)
+
+
+def test_concurrent_refreshes_collapse() -> None:
+    """Callers refreshing at once share one reauth call."""
+
+    async def run() -> tuple[list[str], int]:
+        auth = FakeAuth()
+        manager = TokenManager(auth, refresh_token="refresh")
+        refreshes = [asyncio.create_task(manager.async_refresh()) for _ in range(5)]
+        await asyncio.sleep(0)
+        auth.release.set()
+        tokens = await asyncio.gather(*refreshes)
+        manager.close()
+        return tokens, auth.calls
+
+    assert asyncio.run(run()) == (["access1"] * 5, 1)
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_close_during_refresh_schedules_nothing(fail: bool) -> None:
+    """A refresh in flight when closing is cancelled and arms no timer, whether it would succeed or fail."""
+
+    async def run() -> tuple[bool, asyncio.TimerHandle | None, str | None]:
+        auth = FakeAuth(fail)
+        manager = TokenManager(auth, refresh_token="refresh", access_token="access0")
+        refresh = asyncio.create_task(manager.async_refresh())
+        await asyncio.sleep(0)
+        manager.close()
+        auth.release.set()
+        await asyncio.gather(refresh, return_exceptions=True)
+        # An update arriving after close does not schedule a refresh either
+        manager.update(AuthModel(access_token="late", refresh_token="late", token_type="Bearer", expires_in=1800))
+        return refresh.cancelled(), manager._scheduled, manager.access_token
+
+    assert asyncio.run(run()) == (True, None, "late")